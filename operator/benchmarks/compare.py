@@ -0,0 +1,73 @@
+"""Compare two benchmark reports and flag regressions.
+
+Every numeric result is treated as lower-is-better (latencies, API calls,
+CPU, memory, lag). Exits non-zero when any metric regresses by more than
+``--threshold`` percent.
+
+    python benchmarks/compare.py base.json head.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+
+def flatten(value: Any, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested report results into dotted keys with numeric values."""
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: float(value)}
+    if isinstance(value, dict):
+        flat: Dict[str, float] = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+        return flat
+    return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("base", help="Report from the baseline commit")
+    parser.add_argument("head", help="Report from the commit under test")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed regression in percent"
+    )
+    parser.add_argument(
+        "--min-delta", type=float, default=0.005, help="Ignore absolute changes below this"
+    )
+    args = parser.parse_args()
+
+    base_report = json.loads(Path(args.base).read_text())
+    head_report = json.loads(Path(args.head).read_text())
+    if base_report.get("parameters") != head_report.get("parameters"):
+        print("warning: reports were produced with different parameters", file=sys.stderr)
+
+    base = flatten(base_report["results"])
+    head = flatten(head_report["results"])
+
+    print(f"base {base_report.get('commit', '?')[:12]}  head {head_report.get('commit', '?')[:12]}")
+    print(f"{'metric':<70} {'base':>12} {'head':>12} {'change':>9}")
+
+    regressions = []
+    for key in sorted(base.keys() & head.keys()):
+        old, new = base[key], head[key]
+        delta = new - old
+        change = (delta / old * 100) if old else (0.0 if not delta else float("inf"))
+        marker = ""
+        if abs(delta) >= args.min_delta and change > args.threshold:
+            regressions.append(key)
+            marker = "  REGRESSION"
+        print(f"{key:<70} {old:>12.4g} {new:>12.4g} {change:>8.1f}%{marker}")
+
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,729 @@
+"""In-process fake Kubernetes API server for benchmarks.
+
+Serves just enough of the Kubernetes API for kopf and the kubernetes client:
+discovery, list/watch/get/create/patch/delete for the Kapsa CRDs, kpack
+Images and the core kinds the operator touches, and status subresources.
+It also plays the controllers the operator depends on (kpack marks Images
+as built, the Deployment and DaemonSet controllers mark their workloads as
+available, with optional image pull time) and a minimal OCI registry on
+``/v2/`` (see ``fakeregistry``) that stores what kpack pushes.
+
+Every request is counted per verb and resource so a benchmark can report
+how many API calls the operator makes.
+"""
+
+import asyncio
+import copy
+import json
+import math
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+from fakeregistry import FakeRegistry
+
+
+@dataclass(frozen=True)
+class ResourceType:
+    """A kind served by the fake API server."""
+
+    group: str
+    version: str
+    plural: str
+    kind: str
+    namespaced: bool
+    status: bool = False
+
+    @property
+    def api_version(self) -> str:
+        return f"{self.group}/{self.version}" if self.group else self.version
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.group, self.plural)
+
+
+RESOURCES = [
+    ResourceType("", "v1", "namespaces", "Namespace", False, status=True),
+    ResourceType("", "v1", "serviceaccounts", "ServiceAccount", True),
+    ResourceType("", "v1", "secrets", "Secret", True),
+    ResourceType("", "v1", "configmaps", "ConfigMap", True),
+    ResourceType("", "v1", "events", "Event", True),
+    ResourceType("", "v1", "pods", "Pod", True, status=True),
+    ResourceType("", "v1", "nodes", "Node", False, status=True),
+    ResourceType("apps", "v1", "deployments", "Deployment", True, status=True),
+    ResourceType("apps", "v1", "replicasets", "ReplicaSet", True, status=True),
+    ResourceType("apps", "v1", "daemonsets", "DaemonSet", True, status=True),
+    ResourceType("kapsa-project.io", "v1alpha1", "projects", "Project", True, status=True),
+    ResourceType("kapsa-project.io", "v1alpha1", "environments", "Environment", True, status=True),
+    ResourceType("kapsa-project.io", "v1alpha1", "domainpools", "DomainPool", False, status=True),
+    ResourceType("kapsa-project.io", "v1alpha1", "registries", "Registry", False, status=True),
+    ResourceType("kpack.io", "v1alpha2", "images", "Image", True, status=True),
+    ResourceType("kpack.io", "v1alpha2", "builds", "Build", True, status=True),
+    ResourceType("coordination.k8s.io", "v1", "leases", "Lease", True),
+]
+
+WriteHook = Callable[[str, ResourceType, Dict[str, Any]], None]
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply an RFC 7386 JSON merge patch.
+
+    Strategic merge patches are applied the same way: lists are replaced as
+    a whole, and ``$patch`` directives in them are dropped.
+    """
+    if isinstance(patch, list):
+        return [copy.deepcopy(v) for v in patch if not (isinstance(v, dict) and "$patch" in v)]
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def json_patch(target: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply the add/replace/remove subset of RFC 6902 JSON patch."""
+    result = copy.deepcopy(target)
+    for op in operations:
+        parts = [p.replace("~1", "/").replace("~0", "~") for p in op["path"].split("/")[1:]]
+        parent: Any = result
+        for part in parts[:-1]:
+            parent = parent[int(part)] if isinstance(parent, list) else parent.setdefault(part, {})
+        last = parts[-1]
+        if op["op"] == "remove":
+            if isinstance(parent, list):
+                parent.pop(int(last))
+            else:
+                parent.pop(last, None)
+        elif isinstance(parent, list):
+            if last == "-":
+                parent.append(op["value"])
+            elif op["op"] == "add":
+                parent.insert(int(last), op["value"])
+            else:
+                parent[int(last)] = op["value"]
+        else:
+            parent[last] = op["value"]
+    return result
+
+
+def _matches(obj: Dict[str, Any], label_selector: str, field_selector: str) -> bool:
+    """Evaluate the equality subset of label and field selectors."""
+    labels = obj["metadata"].get("labels") or {}
+    for term in filter(None, label_selector.split(",")):
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            if labels.get(key) == value:
+                return False
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            if labels.get(key) != value:
+                return False
+        elif term not in labels:
+            return False
+
+    for term in filter(None, field_selector.split(",")):
+        key, value = term.replace("==", "=").split("=", 1)
+        current: Any = obj
+        for part in key.split("."):
+            current = current.get(part) if isinstance(current, dict) else None
+        if current != value:
+            return False
+    return True
+
+
+class _Watcher:
+    def __init__(self, namespace: Optional[str], label_selector: str, field_selector: str):
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.field_selector = field_selector
+        self.queue: "asyncio.Queue[Tuple[str, Dict[str, Any]]]" = asyncio.Queue()
+
+    def wants(self, obj: Dict[str, Any]) -> bool:
+        if self.namespace and obj["metadata"].get("namespace") != self.namespace:
+            return False
+        return _matches(obj, self.label_selector, self.field_selector)
+
+
+class FakeKubeAPI:
+    """
+    Object store plus HTTP front-end emulating a Kubernetes API server.
+
+    Args:
+        build_delay: Seconds before a created kpack Image reports a built image
+        deployment_ready_delay: Seconds before a Deployment reports all replicas ready
+        image_pull_delay: Seconds a node needs to pull an image it does not have yet.
+            A rolling update brings up new replicas in batches of 25% (the
+            default ``maxSurge``), and each batch waits for the pull on its
+            nodes; a DaemonSet pulls onto all nodes at once.
+        nodes: Nodes DaemonSets are scheduled on
+        history: Watch events kept for resuming watches from an older resourceVersion
+    """
+
+    def __init__(
+        self,
+        build_delay: float = 1.0,
+        deployment_ready_delay: float = 1.0,
+        image_pull_delay: float = 0.0,
+        nodes: int = 3,
+        history: int = 100_000,
+    ) -> None:
+        self.build_delay = build_delay
+        self.deployment_ready_delay = deployment_ready_delay
+        self.image_pull_delay = image_pull_delay
+        self.nodes = nodes
+        self.pulled: Set[str] = set()  # Images present on every node
+        self.resources = {r.key: r for r in RESOURCES}
+        self.objects: Dict[Tuple[str, str], Dict[Tuple[str, str], Dict[str, Any]]] = {
+            r.key: {} for r in RESOURCES
+        }
+        self.requests: Counter[str] = Counter()
+        self.registry = FakeRegistry(self.requests)
+        self.write_hooks: List[WriteHook] = []
+        self.port = 0
+        self._rv = 0
+        self._history: Dict[Tuple[str, str], Deque[Tuple[int, str, Dict[str, Any]]]] = {
+            r.key: deque(maxlen=history) for r in RESOURCES
+        }
+        self._watchers: Dict[Tuple[str, str], List[_Watcher]] = {r.key: [] for r in RESOURCES}
+        self._runner: Optional[web.AppRunner] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving; return the bound port."""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("*", "/{tail:.*}", self._dispatch)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop serving and end all watches."""
+        for task in self._tasks:
+            task.cancel()
+        for watchers in self._watchers.values():
+            for watcher in watchers:
+                watcher.queue.put_nowait(("STOP", {}))
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def kubeconfig(self) -> Dict[str, Any]:
+        """A kubeconfig pointing at this server."""
+        server = f"http://127.0.0.1:{self.port}"
+        return {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": "fake", "cluster": {"server": server}}],
+            "users": [{"name": "fake", "user": {"token": "benchmark"}}],
+            "contexts": [{"name": "fake", "context": {"cluster": "fake", "user": "fake"}}],
+            "current-context": "fake",
+        }
+
+    # -- store -------------------------------------------------------------
+
+    def resource(self, group: str, plural: str) -> ResourceType:
+        return self.resources[(group, plural)]
+
+    def list(self, group: str, plural: str) -> List[Dict[str, Any]]:
+        """All stored objects of a kind."""
+        return list(self.objects[(group, plural)].values())
+
+    def get(
+        self, group: str, plural: str, name: str, namespace: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return self.objects[(group, plural)].get((namespace or "", name))
+
+    def create(self, group: str, plural: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert an object, as if created through the API; raises KeyError on conflict."""
+        rtype = self.resource(group, plural)
+        obj = copy.deepcopy(body)
+        meta = obj.setdefault("metadata", {})
+        if not meta.get("name") and meta.get("generateName"):
+            meta["name"] = meta["generateName"] + uuid.uuid4().hex[:5]
+        namespace = meta.get("namespace", "") if rtype.namespaced else ""
+        key = (namespace, meta["name"])
+        store = self.objects[rtype.key]
+        if key in store:
+            raise KeyError(key)
+
+        obj["apiVersion"] = rtype.api_version
+        obj["kind"] = rtype.kind
+        meta.setdefault("uid", str(uuid.uuid4()))
+        meta.setdefault("creationTimestamp", _now())
+        meta["generation"] = 1
+        if not rtype.namespaced:
+            meta.pop("namespace", None)
+        store[key] = obj
+        self._emit("ADDED", rtype, obj)
+        self._simulate_controllers(rtype, obj)
+        return obj
+
+    def update(self, rtype: ResourceType, obj: Dict[str, Any], previous: Dict[str, Any]) -> None:
+        """Store a modified object, finishing deletion if its finalizers are gone."""
+        meta = obj["metadata"]
+        if obj.get("spec") != previous.get("spec"):
+            meta["generation"] = previous["metadata"].get("generation", 1) + 1
+        key = (meta.get("namespace", ""), meta["name"])
+
+        if meta.get("deletionTimestamp") and not meta.get("finalizers"):
+            self.objects[rtype.key].pop(key, None)
+            self._emit("DELETED", rtype, obj)
+            return
+
+        self.objects[rtype.key][key] = obj
+        self._emit("MODIFIED", rtype, obj)
+        self._simulate_controllers(rtype, obj)
+
+    def patch(
+        self,
+        group: str,
+        plural: str,
+        name: str,
+        patch: Dict[str, Any],
+        namespace: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Merge-patch a stored object from the benchmark side."""
+        rtype = self.resource(group, plural)
+        current = self.get(group, plural, name, namespace)
+        if current is None:
+            return None
+        obj = merge_patch(current, patch)
+        self.update(rtype, obj, current)
+        return obj
+
+    def delete(
+        self, group: str, plural: str, name: str, namespace: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Delete an object, honouring finalizers; cascade namespace contents."""
+        rtype = self.resource(group, plural)
+        key = (namespace or "", name)
+        current = self.objects[rtype.key].get(key)
+        if current is None:
+            return None
+
+        if current["metadata"].get("finalizers"):
+            if not current["metadata"].get("deletionTimestamp"):
+                obj = copy.deepcopy(current)
+                obj["metadata"]["deletionTimestamp"] = _now()
+                self.objects[rtype.key][key] = obj
+                self._emit("MODIFIED", rtype, obj)
+                return obj
+            return current
+
+        self.objects[rtype.key].pop(key)
+        self._emit("DELETED", rtype, current)
+
+        if rtype.plural == "namespaces" and not rtype.group:
+            for other in RESOURCES:
+                if other.namespaced:
+                    for obj_ns, obj_name in list(self.objects[other.key]):
+                        if obj_ns == name:
+                            self.delete(other.group, other.plural, obj_name, obj_ns)
+        return current
+
+    def _emit(self, event_type: str, rtype: ResourceType, obj: Dict[str, Any]) -> None:
+        self._rv += 1
+        obj["metadata"]["resourceVersion"] = str(self._rv)
+        snapshot = copy.deepcopy(obj)
+        self._history[rtype.key].append((self._rv, event_type, snapshot))
+        for watcher in self._watchers[rtype.key]:
+            if watcher.wants(snapshot):
+                watcher.queue.put_nowait((event_type, snapshot))
+        for hook in self.write_hooks:
+            hook(event_type, rtype, snapshot)
+
+    # -- simulated controllers --------------------------------------------
+
+    def _simulate_controllers(self, rtype: ResourceType, obj: Dict[str, Any]) -> None:
+        meta = obj["metadata"]
+        if rtype.group == "kpack.io" and rtype.plural == "images":
+            if not obj.get("status", {}).get("latestBuildRef"):
+                self._later(0, self._start_build, meta.get("namespace"), meta["name"])
+                self._later(
+                    self.build_delay, self._finish_build, meta.get("namespace"), meta["name"]
+                )
+        elif rtype.group == "apps" and rtype.plural == "deployments":
+            if obj.get("status", {}).get("observedGeneration") != meta.get("generation"):
+                replicas = obj.get("spec", {}).get("replicas", 1)
+                batches = math.ceil(replicas / max(math.ceil(replicas * 0.25), 1))
+                cold = [i for i in _images(obj) if i not in self.pulled]
+                self._later(
+                    self.deployment_ready_delay + (self.image_pull_delay * batches if cold else 0),
+                    self._finish_rollout,
+                    meta.get("namespace"),
+                    meta["name"],
+                    meta.get("generation"),
+                )
+        elif rtype.group == "apps" and rtype.plural == "daemonsets":
+            if obj.get("status", {}).get("observedGeneration") != meta.get("generation"):
+                self._later(
+                    self.image_pull_delay,
+                    self._finish_daemonset,
+                    meta.get("namespace"),
+                    meta["name"],
+                    meta.get("generation"),
+                )
+
+    def _later(self, delay: float, func: Callable[..., None], *args: Any) -> None:
+        async def run() -> None:
+            await asyncio.sleep(delay)
+            func(*args)
+
+        self._tasks.append(asyncio.ensure_future(run()))
+
+    def _start_build(self, namespace: str, name: str) -> None:
+        if self.get("kpack.io", "images", name, namespace) is None:
+            return
+        self.patch(
+            "kpack.io",
+            "images",
+            name,
+            {
+                "status": {
+                    "latestBuildRef": f"{name}-build-1",
+                    "conditions": [{"type": "Ready", "status": "Unknown"}],
+                }
+            },
+            namespace,
+        )
+
+    def _finish_build(self, namespace: str, name: str) -> None:
+        image = self.get("kpack.io", "images", name, namespace)
+        if image is None:
+            return
+        tag = image.get("spec", {}).get("tag", f"registry.local/{name}:latest")
+        repository, _, tag_name = tag.rpartition(":")
+        if "/" in tag_name or not repository:
+            repository, tag_name = tag, "latest"
+        # Like kpack: the Image's tag plus a build-number tag
+        digest = self.registry.push(
+            repository.partition("/")[2],
+            [tag_name, time.strftime("b1.%Y%m%d.%H%M%S", time.gmtime())],
+        )
+        self.patch(
+            "kpack.io",
+            "images",
+            name,
+            {
+                "status": {
+                    "latestImage": f"{repository}@{digest}",
+                    "latestBuildRef": f"{name}-build-1",
+                    "conditions": [
+                        {
+                            "type": "Ready",
+                            "status": "True",
+                            "lastTransitionTime": time.strftime(
+                                "%Y-%m-%dT%H:%M:%SZ", time.gmtime()
+                            ),
+                        }
+                    ],
+                }
+            },
+            namespace,
+        )
+
+    def _finish_rollout(self, namespace: str, name: str, generation: int) -> None:
+        deployment = self.get("apps", "deployments", name, namespace)
+        if deployment is None or deployment["metadata"].get("generation") != generation:
+            return
+        replicas = deployment.get("spec", {}).get("replicas", 1)
+        self.pulled.update(_images(deployment))
+        self.patch(
+            "apps",
+            "deployments",
+            name,
+            {
+                "status": {
+                    "observedGeneration": generation,
+                    "replicas": replicas,
+                    "updatedReplicas": replicas,
+                    "readyReplicas": replicas,
+                    "availableReplicas": replicas,
+                    "conditions": [
+                        {
+                            "type": "Available",
+                            "status": "True",
+                            "reason": "MinimumReplicasAvailable",
+                        },
+                        {
+                            "type": "Progressing",
+                            "status": "True",
+                            "reason": "NewReplicaSetAvailable",
+                        },
+                    ],
+                }
+            },
+            namespace,
+        )
+
+    def _finish_daemonset(self, namespace: str, name: str, generation: int) -> None:
+        daemonset = self.get("apps", "daemonsets", name, namespace)
+        if daemonset is None or daemonset["metadata"].get("generation") != generation:
+            return
+        self.pulled.update(_images(daemonset))
+        self.patch(
+            "apps",
+            "daemonsets",
+            name,
+            {
+                "status": {
+                    "observedGeneration": generation,
+                    "desiredNumberScheduled": self.nodes,
+                    "currentNumberScheduled": self.nodes,
+                    "updatedNumberScheduled": self.nodes,
+                    "numberMisscheduled": 0,
+                    "numberReady": self.nodes,
+                    "numberAvailable": self.nodes,
+                }
+            },
+            namespace,
+        )
+
+    # -- HTTP --------------------------------------------------------------
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        parts = [p for p in request.path.split("/") if p]
+        if parts[:1] == ["v2"]:
+            return await self.registry.handle(request, parts[1:])
+        if parts == ["version"]:
+            self.requests["discovery /version"] += 1
+            return web.json_response({"major": "1", "minor": "30", "gitVersion": "v1.30.0-fake"})
+        if parts in (["api"], ["apis"]):
+            self.requests[f"discovery /{parts[0]}"] += 1
+            return web.json_response(self._discovery_root(parts[0]))
+
+        if parts[:1] == ["api"] and len(parts) >= 2:
+            group, version, rest = "", parts[1], parts[2:]
+        elif parts[:1] == ["apis"] and len(parts) >= 3:
+            group, version, rest = parts[1], parts[2], parts[3:]
+        else:
+            return _status(404, "NotFound", f"unknown path {request.path}")
+
+        if not rest:
+            self.requests[f"discovery {group or 'core'}/{version}"] += 1
+            return web.json_response(self._discovery_group(group, version))
+
+        namespace: Optional[str] = None
+        if (
+            rest[0] == "namespaces"
+            and len(rest) >= 3
+            and (group, rest[2]) in self.resources
+            and self.resources[(group, rest[2])].namespaced
+        ):
+            namespace, rest = rest[1], rest[2:]
+
+        rtype = self.resources.get((group, rest[0]))
+        if rtype is None or rtype.version != version:
+            return _status(404, "NotFound", f"unknown resource {request.path}")
+
+        name = rest[1] if len(rest) > 1 else None
+        subresource = rest[2] if len(rest) > 2 else None
+
+        if request.method == "GET" and name is None:
+            if request.query.get("watch") in ("1", "true"):
+                self.requests[f"watch {_label(rtype)}"] += 1
+                return await self._watch(request, rtype, namespace)
+            self.requests[f"list {_label(rtype)}"] += 1
+            return self._list(request, rtype, namespace)
+
+        verb = {
+            "GET": "get",
+            "POST": "create",
+            "PUT": "update",
+            "PATCH": "patch",
+            "DELETE": "delete",
+        }[request.method]
+        self.requests[f"{verb} {_label(rtype, subresource)}"] += 1
+
+        if request.method == "POST":
+            return await self._create(request, rtype, namespace)
+
+        assert name is not None
+        current = self.get(group, rtype.plural, name, namespace)
+        if current is None:
+            return _status(404, "NotFound", f'{rtype.plural} "{name}" not found')
+
+        if request.method == "GET":
+            return web.json_response(current)
+        if request.method == "DELETE":
+            return web.json_response(self.delete(group, rtype.plural, name, namespace))
+
+        body = await request.json()
+        if request.method == "PUT":
+            obj = copy.deepcopy(body)
+        elif request.content_type == "application/json-patch+json":
+            obj = json_patch(current, body)
+        else:
+            obj = merge_patch(current, body)
+
+        if rtype.status:
+            if subresource == "status":
+                obj = {**copy.deepcopy(current), "status": obj.get("status")}
+            else:
+                obj["status"] = copy.deepcopy(current.get("status"))
+            if obj.get("status") is None:
+                obj.pop("status")
+
+        self.update(rtype, obj, current)
+        return web.json_response(obj)
+
+    def _list(
+        self, request: web.Request, rtype: ResourceType, namespace: Optional[str]
+    ) -> web.Response:
+        labels = request.query.get("labelSelector", "")
+        fields = request.query.get("fieldSelector", "")
+        items = [
+            obj
+            for (obj_ns, _), obj in self.objects[rtype.key].items()
+            if (namespace is None or obj_ns == namespace) and _matches(obj, labels, fields)
+        ]
+        return web.json_response(
+            {
+                "apiVersion": rtype.api_version,
+                "kind": f"{rtype.kind}List",
+                "metadata": {"resourceVersion": str(self._rv)},
+                "items": items,
+            }
+        )
+
+    async def _watch(
+        self, request: web.Request, rtype: ResourceType, namespace: Optional[str]
+    ) -> web.StreamResponse:
+        watcher = _Watcher(
+            namespace,
+            request.query.get("labelSelector", ""),
+            request.query.get("fieldSelector", ""),
+        )
+        since = int(request.query.get("resourceVersion") or self._rv)
+        for rv, event_type, obj in self._history[rtype.key]:
+            if rv > since and watcher.wants(obj):
+                watcher.queue.put_nowait((event_type, obj))
+
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        self._watchers[rtype.key].append(watcher)
+        deadline = time.monotonic() + float(request.query.get("timeoutSeconds", 3600))
+        try:
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event_type, obj = await asyncio.wait_for(watcher.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if event_type == "STOP":
+                    break
+                line = json.dumps({"type": event_type, "object": obj}) + "\n"
+                await response.write(line.encode())
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._watchers[rtype.key].remove(watcher)
+        return response
+
+    async def _create(
+        self, request: web.Request, rtype: ResourceType, namespace: Optional[str]
+    ) -> web.Response:
+        body = await request.json()
+        if namespace:
+            body.setdefault("metadata", {})["namespace"] = namespace
+        try:
+            obj = self.create(rtype.group, rtype.plural, body)
+        except KeyError:
+            name = body.get("metadata", {}).get("name")
+            return _status(409, "AlreadyExists", f'{rtype.plural} "{name}" already exists')
+        return web.json_response(obj, status=201)
+
+    def _discovery_root(self, prefix: str) -> Dict[str, Any]:
+        if prefix == "api":
+            return {"kind": "APIVersions", "versions": ["v1"], "serverAddressByClientCIDRs": []}
+        groups: Dict[str, str] = {r.group: r.version for r in RESOURCES if r.group}
+        return {
+            "kind": "APIGroupList",
+            "apiVersion": "v1",
+            "groups": [
+                {
+                    "name": group,
+                    "versions": [{"groupVersion": f"{group}/{version}", "version": version}],
+                    "preferredVersion": {
+                        "groupVersion": f"{group}/{version}",
+                        "version": version,
+                    },
+                }
+                for group, version in groups.items()
+            ],
+        }
+
+    def _discovery_group(self, group: str, version: str) -> Dict[str, Any]:
+        verbs = ["create", "delete", "deletecollection", "get", "list", "patch", "update", "watch"]
+        resources: List[Dict[str, Any]] = []
+        for r in RESOURCES:
+            if r.group != group or r.version != version:
+                continue
+            resources.append(
+                {
+                    "name": r.plural,
+                    "singularName": r.kind.lower(),
+                    "namespaced": r.namespaced,
+                    "kind": r.kind,
+                    "verbs": verbs,
+                    "shortNames": [],
+                }
+            )
+            if r.status:
+                resources.append(
+                    {
+                        "name": f"{r.plural}/status",
+                        "singularName": "",
+                        "namespaced": r.namespaced,
+                        "kind": r.kind,
+                        "verbs": ["get", "patch", "update"],
+                    }
+                )
+        return {
+            "kind": "APIResourceList",
+            "apiVersion": "v1",
+            "groupVersion": f"{group}/{version}" if group else version,
+            "resources": resources,
+        }
+
+
+def _images(obj: Dict[str, Any]) -> List[str]:
+    """Images of a workload's pod template."""
+    pod = obj.get("spec", {}).get("template", {}).get("spec", {})
+    return [c["image"] for c in pod.get("initContainers", []) + pod.get("containers", [])]
+
+
+def _label(rtype: ResourceType, subresource: Optional[str] = None) -> str:
+    label = f"{rtype.group or 'core'}/{rtype.plural}"
+    return f"{label}/{subresource}" if subresource else label
+
+
+def _status(code: int, reason: str, message: str) -> web.Response:
+    return web.json_response(
+        {
+            "kind": "Status",
+            "apiVersion": "v1",
+            "status": "Failure",
+            "reason": reason,
+            "message": message,
+            "code": code,
+        },
+        status=code,
+    )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,127 @@
+"""Minimal OCI registry served by the fake API server on ``/v2/``.
+
+Stores what the fake kpack pushes and what benchmarks seed, so Registry
+verification, digest lookups, tagging and retention stay local. Requests
+are counted in the API server's counter, labelled ``registry <call>``.
+"""
+
+import hashlib
+import json
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+OCI_MANIFEST = "application/vnd.oci.image.manifest.v1+json"
+
+
+class FakeRegistry:
+    """
+    Tags and manifests per repository, behind the OCI distribution endpoints.
+
+    Args:
+        requests: Counter the served requests are added to
+    """
+
+    def __init__(self, requests: "Counter[str]") -> None:
+        self.requests = requests
+        # repository -> tag -> digest, and repository -> digest -> (manifest, media type)
+        self.tags: Dict[str, Dict[str, str]] = {}
+        self.manifests: Dict[str, Dict[str, Tuple[bytes, str]]] = {}
+        self.delete_enabled = True
+
+    def push(self, repository: str, tags: List[str], body: Optional[bytes] = None) -> str:
+        """Store a manifest under ``tags``; return its digest."""
+        if body is None:
+            body = json.dumps(
+                {
+                    "schemaVersion": 2,
+                    "mediaType": OCI_MANIFEST,
+                    "annotations": {"org.opencontainers.image.ref.name": str(uuid.uuid4())},
+                }
+            ).encode()
+        digest = "sha256:" + hashlib.sha256(body).hexdigest()
+        self.manifests.setdefault(repository, {})[digest] = (body, OCI_MANIFEST)
+        for tag in tags:
+            self.tags.setdefault(repository, {})[tag] = digest
+        return digest
+
+    def images(self) -> int:
+        """Manifests stored across all repositories."""
+        return sum(len(m) for m in self.manifests.values())
+
+    async def handle(self, request: web.Request, parts: List[str]) -> web.Response:
+        """
+        Serve ping, manifests and tag listing; ``parts`` is the path after ``/v2``.
+
+        Repositories holding pushed images behave like a registry with
+        deletion enabled. Any other repository answers manifest lookups with
+        a digest derived from the reference and lists only ``latest``.
+        """
+        if not parts:
+            self.requests["registry ping"] += 1
+            return web.json_response({})
+
+        repository = "/".join(parts[:-2])
+        if parts[-2:-1] == ["manifests"]:
+            self.requests[f"registry {request.method.lower()} manifest"] += 1
+            return await self._manifest(request, repository, parts[-1])
+        if parts[-2:] == ["tags", "list"]:
+            self.requests["registry list tags"] += 1
+            return self._tags(request, repository)
+        return web.json_response({"errors": [{"code": "NAME_UNKNOWN"}]}, status=404)
+
+    def _tags(self, request: web.Request, repository: str) -> web.Response:
+        if repository not in self.tags:
+            return web.json_response({"name": repository, "tags": ["latest"]})
+        tags = sorted(self.tags[repository])
+        last = request.query.get("last")
+        if last:
+            tags = [t for t in tags if t > last]
+        size = int(request.query.get("n") or len(tags) or 1)
+        page, rest = tags[:size], tags[size:]
+        headers = {}
+        if rest:
+            headers["Link"] = f'</v2/{repository}/tags/list?n={size}&last={page[-1]}>; rel="next"'
+        return web.json_response({"name": repository, "tags": page}, headers=headers)
+
+    async def _manifest(
+        self, request: web.Request, repository: str, reference: str
+    ) -> web.Response:
+        manifests = self.manifests.get(repository)
+        if request.method == "PUT":
+            body = await request.read()
+            tags = [] if reference.startswith("sha256:") else [reference]
+            digest = self.push(repository, tags, body)
+            return web.Response(status=201, headers={"Docker-Content-Digest": digest})
+
+        if manifests is None:
+            digest = (
+                reference
+                if reference.startswith("sha256:")
+                else "sha256:" + hashlib.sha256(f"{repository}:{reference}".encode()).hexdigest()
+            )
+            return web.Response(
+                headers={"Docker-Content-Digest": digest, "Content-Type": OCI_MANIFEST}
+            )
+
+        digest = self.tags.get(repository, {}).get(reference, reference)
+        if digest not in manifests:
+            return web.json_response({"errors": [{"code": "MANIFEST_UNKNOWN"}]}, status=404)
+        if request.method == "DELETE":
+            if not self.delete_enabled:
+                return web.json_response({"errors": [{"code": "UNSUPPORTED"}]}, status=405)
+            if not reference.startswith("sha256:"):
+                return web.json_response({"errors": [{"code": "UNSUPPORTED"}]}, status=400)
+            del manifests[digest]
+            tags = self.tags.get(repository, {})
+            for tag in [t for t, d in tags.items() if d == digest]:
+                del tags[tag]
+            return web.Response(status=202)
+
+        body, media_type = manifests[digest]
+        # aiohttp leaves the body out of HEAD responses but keeps its length
+        return web.Response(
+            body=body, headers={"Docker-Content-Digest": digest, "Content-Type": media_type}
+        )
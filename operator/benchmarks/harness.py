@@ -0,0 +1,316 @@
+"""Scaffolding shared by the benchmarks.
+
+Seeding the fake API server with a Registry, DomainPools, Projects and
+Environments, tracking when objects become ready, running the real operator
+in a child process against the fake server, and writing reports.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+from fakeapi import FakeKubeAPI, ResourceType
+
+BENCHMARKS = Path(__file__).resolve().parent
+OPERATOR_ROOT = BENCHMARKS.parent
+NAMESPACE = "kapsa-system"
+HANDLED = "kopf.zalando.org/last-handled-configuration"
+
+ReadyCheck = Callable[[Dict[str, Any]], bool]
+
+
+def _handled(obj: Dict[str, Any]) -> bool:
+    return HANDLED in (obj["metadata"].get("annotations") or {})
+
+
+def _deployed(obj: Dict[str, Any]) -> bool:
+    return bool((obj.get("status") or {}).get("image"))
+
+
+# What "ready" means for each kind the benchmarks create
+READY: Dict[Tuple[str, str], ReadyCheck] = {
+    ("kapsa-project.io", "projects"): _handled,
+    ("kapsa-project.io", "environments"): _deployed,
+    ("kapsa-project.io", "domainpools"): _handled,
+}
+
+
+class ReadinessTracker:
+    """Records when each created object first satisfies its ready check."""
+
+    def __init__(self) -> None:
+        self.created: Dict[Tuple[str, str, str, str], float] = {}
+        self.ready: Dict[Tuple[str, str, str, str], float] = {}
+        self.all_ready = asyncio.Event()
+
+    def expect(self, group: str, plural: str, namespace: str, name: str) -> None:
+        self.created[(group, plural, namespace, name)] = time.time()
+
+    def observe(self, event_type: str, rtype: ResourceType, obj: Dict[str, Any]) -> None:
+        key = (
+            rtype.group,
+            rtype.plural,
+            obj["metadata"].get("namespace", ""),
+            obj["metadata"]["name"],
+        )
+        if key not in self.created or key in self.ready:
+            return
+        check = READY.get((rtype.group, rtype.plural))
+        if check is not None and check(obj):
+            self.ready[key] = time.time()
+            if len(self.ready) == len(self.created):
+                self.all_ready.set()
+
+    def summary(self) -> Dict[str, Any]:
+        by_kind: Dict[str, List[float]] = {}
+        for key, created in self.created.items():
+            by_kind.setdefault(key[1], [])
+            if key in self.ready:
+                by_kind[key[1]].append(self.ready[key] - created)
+
+        totals = {kind: sum(1 for k in self.created if k[1] == kind) for kind in by_kind}
+        return {
+            kind: {"count": totals[kind], "ready": len(durations), **percentiles(durations)}
+            for kind, durations in by_kind.items()
+        }
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50, p90, p99 and max of a sample, rounded for reports."""
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 4)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(ordered[-1], 4)}
+
+
+def seed_cluster(api: FakeKubeAPI, domain_pools: int) -> List[str]:
+    """Create the admin-managed objects every Project depends on."""
+    api.create("", "namespaces", {"metadata": {"name": NAMESPACE}})
+    api.create(
+        "",
+        "secrets",
+        {
+            "metadata": {"name": "bench-registry", "namespace": NAMESPACE},
+            "data": {
+                "username": base64.b64encode(b"bench").decode(),
+                "password": base64.b64encode(b"bench").decode(),
+            },
+        },
+    )
+    api.create(
+        "kapsa-project.io",
+        "registries",
+        {
+            "metadata": {"name": "bench"},
+            "spec": {
+                "type": "docker",
+                "endpoint": f"127.0.0.1:{api.port}",
+                "auth": {"secretRef": {"name": "bench-registry"}},
+                "options": {"insecure": "true"},
+            },
+        },
+    )
+    return [f"pool-{i}" for i in range(max(domain_pools, 1))]
+
+
+def create_workload(
+    api: FakeKubeAPI,
+    tracker: ReadinessTracker,
+    projects: int,
+    environments: int,
+    pools: List[str],
+    replicas: Optional[int] = None,
+) -> None:
+    """Create DomainPools, Projects and their Environments."""
+    for pool in pools:
+        tracker.expect("kapsa-project.io", "domainpools", "", pool)
+        api.create(
+            "kapsa-project.io",
+            "domainpools",
+            {"metadata": {"name": pool}, "spec": {"baseDomains": [f"{pool}.example.com"]}},
+        )
+
+    for i in range(projects):
+        namespace = f"team-{i % 50}"
+        name = f"app-{i}"
+        if api.get("", "namespaces", namespace) is None:
+            api.create("", "namespaces", {"metadata": {"name": namespace}})
+
+        tracker.expect("kapsa-project.io", "projects", namespace, name)
+        api.create(
+            "kapsa-project.io",
+            "projects",
+            {
+                "metadata": {"name": name, "namespace": namespace},
+                "spec": {
+                    "repository": {"url": f"https://git.example.com/{name}.git", "branch": "main"},
+                    "build": {"strategy": "buildpack"},
+                    "registry": {"name": "bench", "imageRepository": f"bench/{name}"},
+                    "domain": {"subdomain": name, "domainPoolRef": pools[i % len(pools)]},
+                    "environments": [
+                        {"name": f"env-{j}", "branch": "main"} for j in range(environments)
+                    ],
+                },
+            },
+        )
+        for j in range(environments):
+            env_name = f"{name}-env-{j}"
+            env_spec: Dict[str, Any] = {
+                "projectRef": {"name": name},
+                "type": "permanent",
+                "branch": "main",
+            }
+            if replicas is not None:
+                env_spec["runtime"] = {"replicas": replicas}
+            tracker.expect("kapsa-project.io", "environments", namespace, env_name)
+            api.create(
+                "kapsa-project.io",
+                "environments",
+                {"metadata": {"name": env_name, "namespace": namespace}, "spec": env_spec},
+            )
+
+
+async def wait_for(
+    condition: Callable[[], bool], timeout: float, interval: float = 0.005
+) -> Optional[float]:
+    """Poll ``condition`` until it is true; return the time it became true, or None."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return None
+        await asyncio.sleep(interval)
+    return time.time()
+
+
+class OperatorProcess:
+    """
+    The real operator (``operator_runner.py``) in a child process, against a fake API server.
+
+    Used as an async context manager: entering spawns the operator, leaving
+    stops it with SIGTERM and collects the samples ``operator_runner`` wrote
+    into ``stats``.
+
+    Args:
+        api: Started fake API server the operator talks to
+        settings: Extra environment variables, e.g. ``{"KAPSA_LOG_LEVEL": "INFO"}``
+        capture_stdout: Pipe the operator's stdout to ``stdout`` instead of dropping it
+        verbose: Show the operator's output
+    """
+
+    def __init__(
+        self,
+        api: FakeKubeAPI,
+        settings: Optional[Mapping[str, str]] = None,
+        capture_stdout: bool = False,
+        verbose: bool = False,
+    ) -> None:
+        self.api = api
+        self.settings = dict(settings or {})
+        self.capture_stdout = capture_stdout
+        self.verbose = verbose
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.spawned = 0.0
+        self.stats: Dict[str, Any] = {}
+        self._workdir: Optional[Path] = None
+
+    @property
+    def stdout(self) -> asyncio.StreamReader:
+        assert self.process is not None and self.process.stdout is not None
+        return self.process.stdout
+
+    async def __aenter__(self) -> "OperatorProcess":
+        self._workdir = Path(tempfile.mkdtemp(prefix="kapsa-bench-"))
+        kubeconfig = self._workdir / "kubeconfig"
+        kubeconfig.write_text(json.dumps(self.api.kubeconfig()))
+        env = {
+            **os.environ,
+            "KUBECONFIG": str(kubeconfig),
+            "PYTHONPATH": os.pathsep.join(
+                [str(OPERATOR_ROOT / "src"), os.environ.get("PYTHONPATH", "")]
+            ),
+            "KAPSA_NAMESPACE": NAMESPACE,
+            "KAPSA_LOG_LEVEL": "WARNING",
+            "KAPSA_METRICS_ENABLED": "false",
+            **self.settings,
+        }
+        if self.capture_stdout:
+            stdout: Optional[int] = asyncio.subprocess.PIPE
+        else:
+            stdout = None if self.verbose else asyncio.subprocess.DEVNULL
+
+        self.spawned = time.time()
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(BENCHMARKS / "operator_runner.py"),
+            "--stats",
+            str(self._workdir / "operator-stats.json"),
+            env=env,
+            stdout=stdout,
+            stderr=None if self.verbose else asyncio.subprocess.DEVNULL,
+        )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.stop()
+
+    async def stop(self) -> None:
+        """Stop the operator and collect its samples."""
+        if self.process is not None and self.process.returncode is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self.process.wait(), 30)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self._workdir is not None:
+            stats_path = self._workdir / "operator-stats.json"
+            if stats_path.exists():
+                self.stats = json.loads(stats_path.read_text())
+            shutil.rmtree(self._workdir, ignore_errors=True)
+            self._workdir = None
+
+
+def report_header() -> Dict[str, Any]:
+    """Fields every report starts with: schema, git revision, time and Python version."""
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=OPERATOR_ROOT, capture_output=True, text=True, check=False
+        ).stdout.strip()
+
+    return {
+        "schema": 1,
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+    }
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]) -> None:
+    """Write a report as JSON to ``output``, or to stdout."""
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,209 @@
+"""Microbenchmark for the operator's logging pipeline.
+
+Compares the previous pipeline (stdlib ``json`` rendering written
+synchronously through ``PrintLogger``) with the current one (``orjson``
+rendering handed to the background ``QueueWriter``), with and without
+per-event rate limits:
+
+- **throughput** — log lines per second a single caller can emit
+- **event loop** — timer lag on an event loop running 10k simulated git
+  polls per minute, each logging like ``project_poll_git`` does
+
+Output goes to ``/dev/null`` by default. ``--sink-latency`` adds a delay to
+every write to model a slow stdout (a full pipe to the container runtime).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from kapsa.logging import EventRateLimiter, QueueLogger, QueueWriter, _orjson_dumps
+
+Pipeline = Tuple[Any, Callable[[], None]]
+
+
+class SlowSink:
+    """Binary file-like object that sleeps on every write."""
+
+    def __init__(self, target: IO[bytes], latency: float) -> None:
+        self._target = target
+        self._latency = latency
+
+    def write(self, data: bytes) -> int:
+        if self._latency:
+            time.sleep(self._latency)
+        return self._target.write(data)
+
+    def flush(self) -> None:
+        self._target.flush()
+
+
+class TextSink:
+    """Text view over a ``SlowSink`` for ``PrintLogger``."""
+
+    def __init__(self, sink: SlowSink) -> None:
+        self._sink = sink
+
+    def write(self, data: str) -> int:
+        return self._sink.write(data.encode())
+
+    def flush(self) -> None:
+        self._sink.flush()
+
+
+def base_processors(rate_limits: Optional[Dict[str, float]]) -> List[Any]:
+    processors: List[Any] = [structlog.contextvars.merge_contextvars]
+    if rate_limits is not None:
+        processors.append(EventRateLimiter(rate_limits))
+    processors += [
+        structlog.processors.add_log_level,
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+    return processors
+
+
+def make_sync_logger(sink: SlowSink) -> Any:
+    """The pipeline as configured before: stdlib JSON, synchronous writes."""
+    return structlog.wrap_logger(
+        structlog.PrintLogger(file=TextSink(sink)),
+        processors=base_processors(None) + [structlog.processors.JSONRenderer()],
+        wrapper_class=structlog.make_filtering_bound_logger(0),
+    )
+
+
+def make_queue_logger(writer: QueueWriter, rate_limits: Optional[Dict[str, float]]) -> Any:
+    """The current pipeline: orjson rendering, background writes."""
+    return structlog.wrap_logger(
+        QueueLogger(writer),
+        processors=base_processors(rate_limits)
+        + [structlog.processors.JSONRenderer(serializer=_orjson_dumps)],
+        wrapper_class=structlog.make_filtering_bound_logger(0),
+    )
+
+
+def log_poll(logger: Any, i: int) -> None:
+    """Log the lines one ``project_poll_git`` tick produces."""
+    logger.debug(
+        "git_poll_triggered",
+        project=f"project-{i % 3000}",
+        namespace="default",
+        repo="https://git.example.com/team/app.git",
+    )
+    logger.info("git_poll_checked", project=f"project-{i % 3000}", commit="0" * 40, changed=False)
+
+
+def measure_throughput(logger: Any, lines: int) -> float:
+    start = time.perf_counter()
+    for i in range(lines // 2):
+        log_poll(logger, i)
+    return lines / (time.perf_counter() - start)
+
+
+async def measure_loop_lag(logger: Any, polls_per_minute: int, duration: float) -> Dict[str, float]:
+    """Run simulated polls and sample how late a 10ms timer fires."""
+    loop = asyncio.get_running_loop()
+    interval = 60.0 / polls_per_minute
+    lags: List[float] = []
+    stop = loop.time() + duration
+
+    async def poller() -> None:
+        i = 0
+        next_tick = loop.time()
+        while loop.time() < stop:
+            log_poll(logger, i)
+            i += 1
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def sampler() -> None:
+        while loop.time() < stop:
+            start = loop.time()
+            await asyncio.sleep(0.01)
+            lags.append(loop.time() - start - 0.01)
+
+    await asyncio.gather(poller(), sampler())
+    lags.sort()
+    return {
+        "p50_ms": round(statistics.median(lags) * 1000, 3),
+        "p99_ms": round(lags[int(len(lags) * 0.99) - 1] * 1000, 3),
+        "max_ms": round(lags[-1] * 1000, 3),
+    }
+
+
+def run_scenario(
+    name: str,
+    factory: Callable[[SlowSink], Pipeline],
+    args: argparse.Namespace,
+    devnull: IO[bytes],
+) -> Dict[str, Any]:
+    sink = SlowSink(devnull, args.sink_latency)
+    logger, close = factory(sink)
+    try:
+        throughput = measure_throughput(logger, args.lines)
+        lag = asyncio.run(measure_loop_lag(logger, args.polls_per_minute, args.duration))
+    finally:
+        close()
+    return {"scenario": name, "lines_per_second": round(throughput), "event_loop_lag": lag}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000, help="Lines for the throughput run")
+    parser.add_argument("--polls-per-minute", type=int, default=10_000)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per lag run")
+    parser.add_argument(
+        "--sink-latency", type=float, default=0.0, help="Seconds added to every write"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=1.0,
+        help="Lines per second allowed for git_poll_triggered in the rate-limited run",
+    )
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    def sync_factory(sink: SlowSink) -> Pipeline:
+        return make_sync_logger(sink), lambda: None
+
+    def queue_factory(rate_limits: Optional[Dict[str, float]]) -> Callable[[SlowSink], Pipeline]:
+        def factory(sink: SlowSink) -> Pipeline:
+            writer = QueueWriter(sink)
+            return make_queue_logger(writer, rate_limits), writer.close
+
+        return factory
+
+    with open(os.devnull, "wb") as devnull:
+        results = [
+            run_scenario("sync_stdlib_json", sync_factory, args, devnull),
+            run_scenario("queue_orjson", queue_factory(None), args, devnull),
+            run_scenario(
+                "queue_orjson_rate_limited",
+                queue_factory({"git_poll_triggered": args.rate_limit}),
+                args,
+                devnull,
+            ),
+        ]
+
+    report = {
+        "lines": args.lines,
+        "polls_per_minute": args.polls_per_minute,
+        "sink_latency_seconds": args.sink_latency,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
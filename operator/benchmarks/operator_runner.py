@@ -0,0 +1,81 @@
+"""Run the real Kapsa operator and record its own resource usage.
+
+Started as a child process by the benchmark harness so that CPU, memory and
+event-loop measurements cover the operator alone, not the fake API server.
+On SIGTERM/SIGINT the operator is stopped and a JSON file of samples is
+written to ``--stats``.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import signal
+import time
+from typing import List, Tuple
+
+import kopf
+
+import kapsa.main  # noqa: F401  (registers the operator's handlers)
+
+Sample = Tuple[float, float]
+
+
+async def sample_event_loop_lag(samples: List[Sample], interval: float) -> None:
+    """Record how late a fixed-interval sleep wakes up, as (wall time, lag seconds)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((time.time(), loop.time() - start - interval))
+
+
+async def sample_cpu(samples: List[Sample], interval: float) -> None:
+    """Record cumulative process CPU time, as (wall time, CPU seconds)."""
+    while True:
+        samples.append((time.time(), time.process_time()))
+        await asyncio.sleep(interval)
+
+
+async def run(stats_path: str, lag_interval: float) -> None:
+    started = time.time()
+    stop_flag = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_flag.set)
+
+    lag: List[Sample] = []
+    cpu: List[Sample] = []
+    samplers = [
+        asyncio.create_task(sample_event_loop_lag(lag, lag_interval)),
+        asyncio.create_task(sample_cpu(cpu, 0.25)),
+    ]
+
+    try:
+        await kopf.operator(clusterwide=True, standalone=True, stop_flag=stop_flag)
+    finally:
+        for task in samplers:
+            task.cancel()
+        cpu.append((time.time(), time.process_time()))
+        with open(stats_path, "w") as f:
+            json.dump(
+                {
+                    "started": started,
+                    "event_loop_lag": lag,
+                    "cpu": cpu,
+                    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                },
+                f,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stats", required=True, help="Where to write the samples")
+    parser.add_argument("--lag-interval", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args.stats, args.lag_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Pre-pull benchmark: time from build to ready Environment, with and without warming.
+
+Runs the operator against the fake API server twice, once with
+``KAPSA_IMAGE_PREPULL_ENABLED=false`` and once with ``true``. The fake
+charges ``--pull-delay`` for every rolling-update batch that lands on nodes
+without the image, and once for a pre-pull DaemonSet, which pulls onto all
+nodes in parallel. For every Environment the report holds the time from its
+Project's build finishing (kpack reporting ``latestImage``) until
+``status.rollout.state`` is ``Ready``.
+
+    python benchmarks/prepull.py --replicas 4 --pull-delay 5 --output prepull.json
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fakeapi import FakeKubeAPI, ResourceType  # noqa: E402
+from harness import (  # noqa: E402
+    OperatorProcess,
+    ReadinessTracker,
+    create_workload,
+    percentiles,
+    report_header,
+    seed_cluster,
+    wait_for,
+    write_report,
+)
+
+
+class DeployTimer:
+    """Records when each Project's build finished and each Environment became ready."""
+
+    def __init__(self) -> None:
+        self.built: Dict[Tuple[str, str], float] = {}
+        self.ready: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    def observe(self, event_type: str, rtype: ResourceType, obj: Dict[str, Any]) -> None:
+        meta = obj["metadata"]
+        status = obj.get("status") or {}
+        if rtype.group == "kpack.io" and rtype.plural == "images":
+            labels = meta.get("labels") or {}
+            project = labels.get("kapsa-project.io/project")
+            namespace = labels.get("kapsa-project.io/project-namespace", "")
+            if project and status.get("latestImage"):
+                self.built.setdefault((namespace, project), time.time())
+        elif rtype.group == "kapsa-project.io" and rtype.plural == "environments":
+            if (status.get("rollout") or {}).get("state") == "Ready":
+                project = obj.get("spec", {}).get("projectRef", {}).get("name", "")
+                key = (meta.get("namespace", ""), meta["name"])
+                self.ready.setdefault(key, (project, time.time()))
+
+    def durations(self) -> Dict[Tuple[str, str], float]:
+        result = {}
+        for key, (project, ready_at) in self.ready.items():
+            built_at = self.built.get((key[0], project))
+            if built_at is not None:
+                result[key] = ready_at - built_at
+        return result
+
+
+async def run_once(args: argparse.Namespace, prepull: bool) -> Dict[str, Any]:
+    api = FakeKubeAPI(
+        build_delay=args.build_delay,
+        deployment_ready_delay=args.rollout_delay,
+        image_pull_delay=args.pull_delay,
+        nodes=args.nodes,
+    )
+    timer = DeployTimer()
+    api.write_hooks.append(timer.observe)
+    await api.start()
+    pools = seed_cluster(api, 1)
+    create_workload(
+        api, ReadinessTracker(), args.projects, args.environments, pools, replicas=args.replicas
+    )
+
+    settings = {
+        "KAPSA_IMAGE_PREPULL_ENABLED": str(prepull).lower(),
+        "KAPSA_IMAGE_PREPULL_CONCURRENCY": str(args.concurrency),
+    }
+    expected = args.projects * args.environments
+    try:
+        async with OperatorProcess(api, settings, verbose=args.verbose):
+            await wait_for(lambda: len(timer.ready) >= expected, args.timeout, interval=0.05)
+    finally:
+        await api.stop()
+
+    durations = list(timer.durations().values())
+    return {
+        "environments": expected,
+        "ready": len(durations),
+        "build_to_ready_seconds": percentiles(durations),
+        "daemonsets_created": api.requests["create apps/daemonsets"],
+    }
+
+
+def _p50(result: Dict[str, Any]) -> Optional[float]:
+    value: Optional[float] = result["build_to_ready_seconds"]["p50"]
+    return value
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    cold = await run_once(args, prepull=False)
+    warm = await run_once(args, prepull=True)
+    cold_p50, warm_p50 = _p50(cold), _p50(warm)
+    return {
+        **report_header(),
+        "parameters": {
+            "projects": args.projects,
+            "environments_per_project": args.environments,
+            "replicas": args.replicas,
+            "nodes": args.nodes,
+            "pull_delay": args.pull_delay,
+            "rollout_delay": args.rollout_delay,
+            "concurrency": args.concurrency,
+        },
+        "results": {
+            "without_prepull": cold,
+            "with_prepull": warm,
+            "p50_speedup": (
+                round(cold_p50 / warm_p50, 2) if cold_p50 is not None and warm_p50 else None
+            ),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--environments", type=int, default=1, help="Environments per Project")
+    parser.add_argument("--replicas", type=int, default=4, help="Replicas per Environment")
+    parser.add_argument("--nodes", type=int, default=5, help="Nodes a DaemonSet runs on")
+    parser.add_argument("--pull-delay", type=float, default=5.0, help="Simulated cold pull time")
+    parser.add_argument("--build-delay", type=float, default=0.5)
+    parser.add_argument("--rollout-delay", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=2, help="Images warmed at once")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Show operator output")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Retention benchmark: prune image repositories held by the fake registry.
+
+Seeds the fake API server's registry with ``--repositories`` repositories,
+each holding ``--builds`` builds on each of ``--branches`` branches, tagged
+the way kpack (``b<N>.<date>.<time>``) and the build tracker
+(``build-<branch>-<hash>-<time>``) tag them, plus ``latest`` on the newest build of
+the first branch and a deployed copy of its oldest build. The first branch
+is the Project's; the others stand for preview branches, of which
+``--reaped`` no longer have an Environment. Retention then runs in-process,
+first as a dry run and then for real, and the report holds registry calls,
+images deleted and run time. The run fails if any image the policy must
+keep was deleted, or any it must delete survived.
+
+    python benchmarks/retention.py --repositories 20 --builds 30 --output retention.json
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fakeapi import FakeKubeAPI  # noqa: E402
+from harness import report_header, write_report  # noqa: E402
+
+BASE_TIME = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+# Digests that must survive and digests that must be deleted, per repository
+Expectation = Tuple[Set[str], Set[str]]
+
+
+def seed_registry(api: FakeKubeAPI, args: argparse.Namespace) -> Dict[str, Expectation]:
+    """Push the builds of every repository; return what retention should keep and delete."""
+    from kapsa.registry import build_tag
+
+    expected: Dict[str, Expectation] = {}
+    branches = ["main"] + [f"preview-{i}" for i in range(1, args.branches)]
+    reaped = set(branches[len(branches) - args.reaped :]) if args.reaped else set()
+    for r in range(args.repositories):
+        repository = f"bench/app-{r}"
+        keep: Set[str] = set()
+        delete: Set[str] = set()
+        for branch in branches:
+            digests = []
+            for i in range(args.builds):
+                built = datetime.fromtimestamp(BASE_TIME + i * 600, timezone.utc)
+                tags = [built.strftime(f"b{i + 1}.%Y%m%d.%H%M%S"), build_tag(branch, built)]
+                digests.append(api.registry.push(repository, tags))
+            live = args.keep_last if branch not in reaped else 0
+            keep.update(digests[len(digests) - live :] if live else [])
+            delete.update(digests[: len(digests) - live])
+            if branch == "main":
+                api.registry.tags[repository]["latest"] = digests[-1]
+                keep.update({digests[0], digests[-1]})  # deployed, latest
+                delete -= {digests[0], digests[-1]}
+        expected[repository] = (keep, delete)
+    return expected
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    from kapsa.logging import configure_logging
+    from kapsa.models.registry import RegistryEndpoint
+    from kapsa.registry import (
+        RetentionPolicy,
+        build_tag,
+        close_registry_clients,
+        prune_repository,
+    )
+
+    configure_logging()
+    api = FakeKubeAPI()
+    await api.start()
+    expected = seed_registry(api, args)
+    endpoint = RegistryEndpoint(
+        name="bench",
+        type="docker",
+        base_url=f"http://127.0.0.1:{api.port}",
+        host=f"127.0.0.1:{api.port}",
+    )
+    branches = ["main"] + [f"preview-{i}" for i in range(1, args.branches - args.reaped)]
+    oldest = build_tag("main", datetime.fromtimestamp(BASE_TIME, timezone.utc))
+    deployed = {repo: {api.registry.tags[repo][oldest]} for repo in expected}
+    images_before = api.registry.images()
+
+    async def run(dry_run: bool) -> Dict[str, Any]:
+        policy = RetentionPolicy(keep_last=args.keep_last, dry_run=dry_run)
+        api.requests.clear()
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(
+                prune_repository(endpoint, repo, policy, "main", set(branches), deployed[repo])
+                for repo in expected
+            )
+        )
+        candidates = sum(r.images - r.kept for r in results)
+        return {
+            "seconds": round(time.monotonic() - started, 3),
+            "candidates": candidates,
+            "deleted": sum(r.deleted for r in results),
+            "failed": sum(r.failed for r in results),
+            "registry_calls": sum(api.requests.values()),
+            "registry_calls_by_endpoint": dict(sorted(api.requests.items())),
+        }
+
+    try:
+        dry_run = await run(dry_run=True)
+        prune = await run(dry_run=False)
+    finally:
+        await close_registry_clients()
+        await api.stop()
+
+    violations: List[str] = []
+    for repo, (keep, delete) in expected.items():
+        present = set(api.registry.manifests.get(repo, {}))
+        violations += [f"{repo}@{d} deleted but protected" for d in keep - present]
+        violations += [f"{repo}@{d} survived but expired" for d in delete & present]
+
+    return {
+        **report_header(),
+        "parameters": {
+            "repositories": args.repositories,
+            "branches": args.branches,
+            "reaped": args.reaped,
+            "builds": args.builds,
+            "keep_last": args.keep_last,
+            "page_size": args.page_size,
+            "delete_batch": args.delete_batch,
+            "concurrency": args.concurrency,
+        },
+        "results": {
+            "images_before": images_before,
+            "images_after": api.registry.images(),
+            "dry_run": dry_run,
+            "prune": prune,
+            "policy_violations": violations[:20],
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repositories", type=int, default=20)
+    parser.add_argument("--branches", type=int, default=4, help="Branches per repository")
+    parser.add_argument("--reaped", type=int, default=2, help="Branches without an Environment")
+    parser.add_argument("--builds", type=int, default=30, help="Builds per branch")
+    parser.add_argument("--keep-last", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100, help="Tags per listing page")
+    parser.add_argument("--delete-batch", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=2, help="Repositories pruned at once")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    if not 0 <= args.reaped < args.branches:
+        parser.error("--reaped must leave the first branch live")
+
+    os.environ.update(
+        KAPSA_LOG_LEVEL="WARNING",
+        KAPSA_RETENTION_PAGE_SIZE=str(args.page_size),
+        KAPSA_RETENTION_DELETE_BATCH=str(args.delete_batch),
+        KAPSA_RETENTION_CONCURRENCY=str(args.concurrency),
+    )
+    report = asyncio.run(run_benchmark(args))
+    write_report(report, args.output)
+    if report["results"]["policy_violations"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Scale benchmark: run the operator against a fake API server with N objects.
+
+Creates Projects, Environments and DomainPools on an in-process fake API
+server, runs the real operator (``kapsa.main``) in a child process against
+it, and writes a JSON report with time-to-ready, API calls, event-loop lag,
+peak RSS and steady-state CPU. Compare reports with ``compare.py``.
+
+    python benchmarks/scale.py --projects 500 --output report.json
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fakeapi import FakeKubeAPI  # noqa: E402
+from harness import (  # noqa: E402
+    OperatorProcess,
+    ReadinessTracker,
+    create_workload,
+    percentiles,
+    report_header,
+    seed_cluster,
+    write_report,
+)
+
+
+def touch_workload(api: FakeKubeAPI, tracker: ReadinessTracker, round_number: int) -> None:
+    """Change an annotation on every created object, triggering update handlers."""
+    for group, plural, namespace, name in tracker.created:
+        api.patch(
+            group,
+            plural,
+            name,
+            {"metadata": {"annotations": {"benchmark/round": str(round_number)}}},
+            namespace or None,
+        )
+
+
+def _window(samples: List[List[float]], start: float, end: float) -> List[List[float]]:
+    return [s for s in samples if start <= s[0] <= end]
+
+
+def _cpu_percent(samples: List[List[float]], start: float, end: float) -> Optional[float]:
+    """CPU utilisation between the samples bracketing [start, end]."""
+    before = [s for s in samples if s[0] <= start]
+    after = [s for s in samples if s[0] >= end]
+    if not before or not after:
+        return None
+    first, last = before[-1], after[0]
+    wall = last[0] - first[0]
+    return round(100 * (last[1] - first[1]) / wall, 2) if wall > 0 else None
+
+
+async def wait_for_watches(api: FakeKubeAPI, timeout: float) -> None:
+    """Wait until the operator has started watching every Kapsa kind."""
+    wanted = [f"watch kapsa-project.io/{p}" for p in ("projects", "environments", "domainpools")]
+    deadline = time.monotonic() + timeout
+    while not all(api.requests[w] for w in wanted):
+        if time.monotonic() > deadline:
+            raise TimeoutError("operator did not start watching in time")
+        await asyncio.sleep(0.1)
+
+
+def _event_writes(requests: Dict[str, int]) -> int:
+    """Kubernetes Event writes (new Events plus count updates) in a phase."""
+    return requests.get("create core/events", 0) + requests.get("patch core/events", 0)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeKubeAPI(build_delay=args.build_delay, deployment_ready_delay=args.rollout_delay)
+    tracker = ReadinessTracker()
+    api.write_hooks.append(tracker.observe)
+    await api.start()
+    pools = seed_cluster(api, args.domain_pools)
+
+    operator = OperatorProcess(api, {"KAPSA_LOG_LEVEL": args.log_level}, verbose=args.verbose)
+    try:
+        async with operator:
+            await wait_for_watches(api, args.timeout)
+            startup_requests = sum(api.requests.values())
+            api.requests.clear()
+
+            load_start = time.time()
+            create_workload(api, tracker, args.projects, args.environments, pools)
+            try:
+                await asyncio.wait_for(tracker.all_ready.wait(), args.timeout)
+            except asyncio.TimeoutError:
+                pass
+            load_end = time.time()
+            load_requests = dict(api.requests)
+
+            api.requests.clear()
+            await asyncio.sleep(args.steady_window)
+            steady_end = time.time()
+            steady_requests = dict(api.requests)
+
+            api.requests.clear()
+            for round_number in range(args.update_rounds):
+                touch_workload(api, tracker, round_number)
+                await asyncio.sleep(args.update_settle)
+            update_requests = dict(api.requests)
+    finally:
+        await api.stop()
+
+    stats = operator.stats
+    objects = len(tracker.created)
+    load_total = sum(load_requests.values())
+    lag_all = [s[1] for s in stats.get("event_loop_lag", [])]
+    lag_load = [s[1] for s in _window(stats.get("event_loop_lag", []), load_start, load_end)]
+
+    return {
+        **report_header(),
+        "parameters": {
+            "projects": args.projects,
+            "environments_per_project": args.environments,
+            "domain_pools": len(pools),
+            "build_delay": args.build_delay,
+            "rollout_delay": args.rollout_delay,
+            "steady_window": args.steady_window,
+            "update_rounds": args.update_rounds,
+        },
+        "results": {
+            "all_ready": len(tracker.ready) == objects,
+            "time_to_all_ready_seconds": round(load_end - load_start, 3),
+            "time_to_ready_seconds": tracker.summary(),
+            "api_calls": {
+                "startup": startup_requests,
+                "load_total": load_total,
+                "per_object": round(load_total / objects, 3) if objects else None,
+                "load_by_endpoint": dict(sorted(load_requests.items())),
+            },
+            "steady_state": {
+                "api_calls_per_second": round(
+                    sum(steady_requests.values()) / args.steady_window, 3
+                ),
+                "api_calls_by_endpoint": dict(sorted(steady_requests.items())),
+                "cpu_percent": _cpu_percent(stats.get("cpu", []), load_end, steady_end),
+            },
+            "updates": {
+                "rounds": args.update_rounds,
+                "api_calls_per_object_per_round": (
+                    round(sum(update_requests.values()) / (objects * args.update_rounds), 3)
+                    if objects and args.update_rounds
+                    else None
+                ),
+                "api_calls_by_endpoint": dict(sorted(update_requests.items())),
+            },
+            "events": {
+                phase: {
+                    "created": requests.get("create core/events", 0),
+                    "patched": requests.get("patch core/events", 0),
+                    "per_object": (
+                        round(_event_writes(requests) / objects, 3) if objects else None
+                    ),
+                }
+                for phase, requests in (
+                    ("load", load_requests),
+                    ("steady_state", steady_requests),
+                    ("updates", update_requests),
+                )
+            },
+            "load_cpu_percent": _cpu_percent(stats.get("cpu", []), load_start, load_end),
+            "event_loop_lag_seconds": {
+                "load": percentiles(lag_load),
+                "overall": percentiles(lag_all),
+            },
+            "peak_rss_mb": round(stats["peak_rss_kb"] / 1024, 1) if stats else None,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--environments", type=int, default=2, help="Environments per Project")
+    parser.add_argument("--domain-pools", type=int, default=5)
+    parser.add_argument("--build-delay", type=float, default=1.0, help="Simulated kpack build time")
+    parser.add_argument("--rollout-delay", type=float, default=1.0, help="Simulated rollout time")
+    parser.add_argument("--steady-window", type=float, default=15.0, help="Idle measurement window")
+    parser.add_argument(
+        "--update-rounds", type=int, default=3, help="Times every object is touched after load"
+    )
+    parser.add_argument(
+        "--update-settle", type=float, default=3.0, help="Seconds to wait after each update round"
+    )
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Show operator output")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
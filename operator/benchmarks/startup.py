@@ -0,0 +1,163 @@
+"""Startup benchmark: wall-clock time from process start to first reconcile.
+
+Seeds the fake API server with a Registry, DomainPools, Projects and
+Environments, then starts the operator and measures, from the moment the
+process is spawned:
+
+- ``first_watch`` — the operator's first watch request reaches the API
+- ``first_reconcile`` — kopf marks the first object as handled
+- ``all_reconciled`` — every seeded object is handled or deployed
+
+The operator's own ``startup_phase`` log lines (import, config, client init,
+first watch event, first reconcile) are collected alongside. Each run uses a
+fresh process; the report holds the median over ``--runs``. Compare reports
+with ``compare.py``.
+
+    python benchmarks/startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fakeapi import FakeKubeAPI, ResourceType  # noqa: E402
+from harness import (  # noqa: E402
+    HANDLED,
+    OperatorProcess,
+    ReadinessTracker,
+    create_workload,
+    report_header,
+    seed_cluster,
+    wait_for,
+    write_report,
+)
+
+PHASES = ("import", "config", "client_init", "first_watch", "first_reconcile")
+
+
+class FirstReconcile:
+    """Records when kopf first marks any Kapsa object as handled."""
+
+    def __init__(self) -> None:
+        self.at: Optional[float] = None
+
+    def observe(self, event_type: str, rtype: ResourceType, obj: Dict[str, Any]) -> None:
+        if self.at is None and rtype.group == "kapsa-project.io":
+            if HANDLED in (obj["metadata"].get("annotations") or {}):
+                self.at = time.time()
+
+
+async def read_phases(stream: asyncio.StreamReader, phases: Dict[str, float]) -> None:
+    """Collect ``startup_phase`` lines from the operator's JSON log output."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and record.get("event") == "startup_phase":
+            phases[record["phase"]] = record["seconds"]
+
+
+async def run_once(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeKubeAPI(build_delay=args.build_delay, deployment_ready_delay=args.rollout_delay)
+    tracker = ReadinessTracker()
+    first = FirstReconcile()
+    api.write_hooks += [tracker.observe, first.observe]
+    await api.start()
+    pools = seed_cluster(api, args.domain_pools)
+    create_workload(api, tracker, args.projects, args.environments, pools)
+    api.requests.clear()
+
+    phases: Dict[str, float] = {}
+    operator = OperatorProcess(
+        api,
+        {"KAPSA_LOG_LEVEL": "INFO", "KAPSA_LOG_FORMAT": "json"},
+        capture_stdout=True,
+        verbose=args.verbose,
+    )
+    try:
+        async with operator:
+            reader = asyncio.create_task(read_phases(operator.stdout, phases))
+            watch_at = await wait_for(
+                lambda: any(k.startswith("watch ") and v for k, v in api.requests.items()),
+                args.timeout,
+            )
+            reconcile_at = await wait_for(lambda: first.at is not None, args.timeout)
+            try:
+                await asyncio.wait_for(tracker.all_ready.wait(), args.timeout)
+                all_at: Optional[float] = time.time()
+            except asyncio.TimeoutError:
+                all_at = None
+            await wait_for(lambda: "first_reconcile" in phases, 5)
+            reader.cancel()
+    finally:
+        await api.stop()
+
+    def since_spawn(at: Optional[float]) -> Optional[float]:
+        return round(at - operator.spawned, 3) if at is not None else None
+
+    return {
+        "first_watch": since_spawn(watch_at),
+        "first_reconcile": since_spawn(first.at if reconcile_at else None),
+        "all_reconciled": since_spawn(all_at),
+        "phases": {phase: phases.get(phase) for phase in PHASES},
+    }
+
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return round(statistics.median(present), 3) if present else None
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    runs = [await run_once(args) for _ in range(args.runs)]
+    return {
+        **report_header(),
+        "parameters": {
+            "runs": args.runs,
+            "projects": args.projects,
+            "environments_per_project": args.environments,
+            "domain_pools": args.domain_pools,
+        },
+        "results": {
+            "time_to_first_watch_seconds": _median([r["first_watch"] for r in runs]),
+            "time_to_first_reconcile_seconds": _median([r["first_reconcile"] for r in runs]),
+            "time_to_all_reconciled_seconds": _median([r["all_reconciled"] for r in runs]),
+            "operator_phases_seconds": {
+                phase: _median([r["phases"][phase] for r in runs]) for phase in PHASES
+            },
+        },
+        "runs": runs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Operator starts to take the median of")
+    parser.add_argument("--projects", type=int, default=20, help="Projects existing at startup")
+    parser.add_argument("--environments", type=int, default=1, help="Environments per Project")
+    parser.add_argument("--domain-pools", type=int, default=2)
+    parser.add_argument("--build-delay", type=float, default=0.5)
+    parser.add_argument("--rollout-delay", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Show operator stderr")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,12 @@ setup(
     package_dir={"": "src"},
     python_requires=">=3.12",
     install_requires=[
-        "kopf>=1.37.2",
+        "kopf>=1.45.1",
         "kubernetes>=29.0.0",
         "aiohttp>=3.9.5",
         "GitPython>=3.1.43",
         "structlog>=24.1.0",
+        "orjson>=3.10.0",
         "prometheus-client>=0.20.0",
         "pydantic>=2.7.1",
         "pydantic-settings>=2.2.1",
@@ -24,6 +25,14 @@ setup(
             "black>=24.4.2",
             "ruff>=0.4.3",
             "mypy>=1.10.0",
+            "pytest>=8.2.0",
+            "pytest-asyncio>=0.23.6",
+            "pytest-cov>=5.0.0",
+        ],
+        "tracing": [
+            "opentelemetry-api>=1.25.0",
+            "opentelemetry-sdk>=1.25.0",
+            "opentelemetry-exporter-otlp-proto-http>=1.25.0",
         ],
     },
     entry_points={
@@ -1,8 +1,10 @@
 """Configuration for Kapsa operator."""
 
-import os
-from typing import Optional
+import json
+import threading
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Set
 
+from pydantic import ValidationError
 from pydantic_settings import BaseSettings
 
 
@@ -12,22 +14,85 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_format: str = "json"  # json or console
+    log_async: bool = True  # write log lines from a background thread
+    log_queue_size: int = 10000  # lines buffered before new lines are dropped
+    log_rate_limits: Dict[str, float] = {}  # event name -> max lines per second
 
     # Reconciliation
     default_poll_interval: int = 300  # seconds
     reconciliation_timeout: int = 600  # seconds
 
+    # Git mirror cache
+    git_mirror_dir: str = "/var/cache/kapsa/git"  # on a persistent volume to survive restarts
+    git_mirror_budget_mb: int = 2048  # disk budget; least recently used mirrors are evicted
+    git_mirror_filter: str = "blob:none"  # partial clone filter; empty for full clones
+    git_mirror_depth: int = 0  # commits of history to fetch; 0 for full history
+    git_timeout: int = 120  # seconds per git command
+
+    # Rollouts
+    rollout_progress_deadline: int = 600  # seconds without progress before a rollout fails
+    rollout_auto_rollback: bool = False  # redeploy the last ready image on failure
+
+    # Image pre-pull
+    image_prepull_enabled: bool = False  # warm new images on nodes before rolling out
+    image_prepull_concurrency: int = 2  # images warmed at once, operator-wide
+    image_prepull_timeout: int = 300  # seconds to wait for nodes to pull an image
+    image_prepull_node_selector: Dict[str, str] = {}  # nodes to warm (all if empty)
+    image_prepull_command: List[str] = ["/bin/sh", "-c", "true"]  # exits at once in the image
+    image_prepull_pause_image: str = "registry.k8s.io/pause:3.9"
+
+    # Status
+    status_debounce: float = 1.0  # seconds to coalesce status writes per object
+
+    # Events
+    events_enabled: bool = True  # post Kubernetes Events for build and rollout transitions
+    events_aggregation_window: float = 10.0  # seconds between writes of a repeated event
+    events_burst: int = 5  # Event writes per object before throttling
+    events_per_minute: float = 1.0  # sustained Event writes per object
+
+    # Teardown
+    teardown_concurrency: int = 10  # namespace deletions issued at once, operator-wide
+    teardown_wait_timeout: int = 60  # seconds to wait for a namespace per attempt
+    teardown_poll_interval: float = 2.0  # seconds between checks while waiting
+    teardown_deadline: int = 900  # seconds a Project finalizer waits for cleanup
+    teardown_retry_delay: int = 30  # seconds between teardown attempts
+
+    # Tracing (needs the optional opentelemetry packages, see setup.py)
+    tracing_enabled: bool = False
+    tracing_exporter: str = "otlp"  # otlp (OTLP over HTTP) or file (JSON lines)
+    tracing_endpoint: Optional[str] = None  # OTLP traces URL; OTEL_EXPORTER_OTLP_* if unset
+    tracing_file: str = "/tmp/kapsa-traces.jsonl"  # written by the file exporter
+    tracing_sample_ratio: float = 1.0  # share of source changes traced
+
     # Metrics
     metrics_port: int = 8080
     metrics_enabled: bool = True
 
     # Kubernetes
     namespace: str = "kapsa-system"
+    config_map: Optional[str] = None  # ConfigMap in ``namespace`` with live overrides
 
     # kpack integration
     kpack_builder_image: str = "paketobuildpacks/builder:base"
     kpack_service_account: str = "kapsa-build"
 
+    # Registry client
+    registry_pool_size: int = 10  # connections per registry endpoint
+    registry_request_timeout: float = 30.0  # seconds
+    registry_health_interval: int = 300  # seconds
+    registry_credentials_ttl: int = 300  # seconds before a Registry's auth Secret is re-read
+    registry_token_leeway: int = 30  # seconds before expiry to refresh a token
+    manifest_cache_size: int = 1024  # entries
+    manifest_cache_ttl: int = 300  # seconds a tag-to-digest lookup stays valid
+
+    # Registry retention (policies are set on Registry and Project CRDs)
+    retention_interval: int = 3600  # seconds between retention runs per Project
+    retention_concurrency: int = 2  # Projects pruned at once, operator-wide
+    retention_lookup_concurrency: int = 8  # manifest lookups in flight per run
+    retention_delete_batch: int = 10  # manifests deleted per batch
+    retention_page_size: int = 100  # tags per listing page
+    retention_dry_run: bool = False  # report deletions without deleting, for every Registry
+
     class Config:
         """Pydantic config."""
 
@@ -35,6 +100,129 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
+# Settings that are read once at startup; changing them needs a restart.
+RESTART_REQUIRED: FrozenSet[str] = frozenset(
+    {
+        "log_format",
+        "log_async",
+        "log_queue_size",
+        "metrics_port",
+        "metrics_enabled",
+        "tracing_enabled",
+        "tracing_exporter",
+        "tracing_endpoint",
+        "tracing_file",
+        "tracing_sample_ratio",
+        "namespace",
+        "config_map",
+        "git_mirror_dir",
+    }
+)
+
+SettingsCallback = Callable[[Settings, Set[str]], None]
+
+_settings: Optional[Settings] = None
+_subscribers: List[SettingsCallback] = []
+_lock = threading.RLock()
+
+
 def get_settings() -> Settings:
-    """Get operator settings."""
-    return Settings()
+    """
+    Get operator settings.
+
+    The environment is parsed once; later calls return the same snapshot
+    until ConfigMap overrides are applied with ``apply_overrides``.
+    """
+    global _settings
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+
+def subscribe(callback: SettingsCallback) -> None:
+    """
+    Register a callback for settings changes.
+
+    Callbacks receive the new settings and the names of the fields that
+    changed. They run on the thread that applied the change (the event loop
+    for ConfigMap updates) and must not block.
+    """
+    _subscribers.append(callback)
+
+
+def parse_overrides(data: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Convert ConfigMap data into ``Settings`` field values.
+
+    Keys may be field names (``log_level``) or environment variable names
+    (``KAPSA_LOG_LEVEL``). Values of dict and list fields are JSON.
+
+    Raises:
+        ValueError: If a key is not a setting or a JSON value is malformed
+    """
+    fields = Settings.model_fields
+    overrides: Dict[str, Any] = {}
+    for key, value in data.items():
+        name = key.lower()
+        if name.startswith("kapsa_"):
+            name = name[len("kapsa_") :]
+        if name not in fields:
+            raise ValueError(f"unknown setting {key!r}")
+
+        annotation = getattr(fields[name].annotation, "__origin__", fields[name].annotation)
+        if annotation in (dict, list):
+            try:
+                overrides[name] = json.loads(value)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"setting {key!r} is not valid JSON: {e}") from e
+        else:
+            overrides[name] = value
+    return overrides
+
+
+def apply_overrides(data: Mapping[str, str]) -> Set[str]:
+    """
+    Replace the live overrides and notify subscribers of what changed.
+
+    Overrides take precedence over the environment. Removing a key from the
+    ConfigMap restores the environment value. Fields in ``RESTART_REQUIRED``
+    keep their current value.
+
+    Args:
+        data: ConfigMap data (an empty mapping clears all overrides)
+
+    Returns:
+        Names of the fields whose value changed
+
+    Raises:
+        ValueError: If the data does not describe valid settings; the current
+            settings are kept
+    """
+    global _settings
+    overrides = parse_overrides(data)
+
+    with _lock:
+        current = get_settings()
+        try:
+            candidate = Settings(**overrides)
+        except ValidationError as e:
+            raise ValueError(str(e)) from e
+
+        pinned = {name: getattr(current, name) for name in RESTART_REQUIRED}
+        new = candidate.model_copy(update=pinned)
+        changed = {
+            name for name in Settings.model_fields if getattr(new, name) != getattr(current, name)
+        }
+        _settings = new
+
+    if changed:
+        for callback in list(_subscribers):
+            callback(new, changed)
+    return changed
+
+
+def ignored_overrides(data: Mapping[str, str]) -> Set[str]:
+    """Return override keys that only take effect after a restart."""
+    return set(parse_overrides(data)) & RESTART_REQUIRED
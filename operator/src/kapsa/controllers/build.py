@@ -0,0 +1,311 @@
+"""Build tracker: pins finished kpack builds by digest and rolls them out."""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import kopf
+from kubernetes import client
+
+from kapsa import tracing
+from kapsa.config import get_settings
+from kapsa.controllers.environment import deploy_environment
+from kapsa.events import get_event_recorder
+from kapsa.logging import get_logger
+from kapsa.registry import RegistryError, pin_image, resolve_registry, tag_build
+from kapsa.status import fetch_status, get_status_manager
+from kapsa.utils.deployment import MANAGED_LABELS, node_placement
+from kapsa.utils.kpack import SOURCE_DETECTED_ANNOTATION
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+# Last image handled per kpack Image, so repeated watch events are no-ops
+_handled: Dict[Tuple[str, str], str] = {}
+
+# Last build and its Ready status seen per kpack Image, to report transitions once
+_builds: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+# When the tracker saw the running build of each kpack Image start (Unix time)
+_build_started: Dict[Tuple[str, str], float] = {}
+
+
+@kopf.on.event(
+    "kpack.io",
+    "v1alpha2",
+    "images",
+    labels=MANAGED_LABELS,
+)
+async def build_image_event(
+    type: str,
+    body: kopf.Body,
+    name: str,
+    namespace: str,
+    labels: kopf.Labels,
+    **kwargs: object,
+) -> None:
+    """Track kpack Image builds and deploy each new image by digest."""
+    key = (namespace, name)
+    if type == "DELETED":
+        _handled.pop(key, None)
+        _builds.pop(key, None)
+        _build_started.pop(key, None)
+        return
+
+    project_name = labels.get("kapsa-project.io/project")
+    project_namespace = labels.get("kapsa-project.io/project-namespace")
+    registry_name = labels.get("kapsa-project.io/registry")
+    if not project_name or not project_namespace or not registry_name:
+        return
+
+    owners = [
+        ref
+        for ref in body.get("metadata", {}).get("ownerReferences", [])
+        if ref.get("kind") == "Project"
+    ]
+    project_uid = owners[0].get("uid") if owners else None
+    # Builds that finished before the tracker saw them (e.g. before an
+    # operator restart) are rolled out but not announced again.
+    announce = key in _builds
+    parent = _traceparent(body)
+    _record_build_transition(key, body, project_name, project_namespace, project_uid, parent)
+
+    latest_image = body.get("status", {}).get("latestImage")
+    if not latest_image or _handled.get(key) == latest_image:
+        return
+
+    registry = await resolve_registry(registry_name)
+    if registry is None:
+        return
+
+    try:
+        with tracing.child_span("registry.resolve_digest", parent=parent, image=latest_image):
+            image = await pin_image(registry, latest_image)
+    except RegistryError as e:
+        logger.warning(
+            "image_pin_failed",
+            project=project_name,
+            image=latest_image,
+            error=str(e),
+        )
+        get_event_recorder().record(
+            "Project",
+            project_name,
+            project_namespace,
+            "ImagePinFailed",
+            f"Could not resolve {latest_image} to a digest: {e}",
+            type="Warning",
+            uid=project_uid,
+        )
+        return
+
+    logger.info(
+        "build_image_ready",
+        project=project_name,
+        namespace=project_namespace,
+        image=image,
+    )
+
+    status = await fetch_status("projects", project_name, project_namespace)
+    if status is not None:
+        get_status_manager().update(
+            "projects", project_name, project_namespace, status, latestImage=image
+        )
+    if announce:
+        get_event_recorder().record(
+            "Project",
+            project_name,
+            project_namespace,
+            "BuildFinished",
+            f"Built {image}",
+            uid=project_uid,
+        )
+
+    revision = body.get("spec", {}).get("source", {}).get("git", {}).get("revision")
+    built_at = next(
+        (
+            c.get("lastTransitionTime")
+            for c in body.get("status", {}).get("conditions", [])
+            if c.get("type") == "Ready" and c.get("status") == "True"
+        ),
+        None,
+    )
+    if revision and registry.retention.get("enabled"):
+        # Lets retention tell the builds of each branch apart
+        with tracing.child_span("registry.tag_build", parent=parent, image=image, branch=revision):
+            await tag_build(registry, image, revision, built_at)
+    with tracing.child_span("build.rollout", parent=parent, project=project_name, image=image):
+        await rollout_image(project_name, project_namespace, image, revision, built_at, owners)
+    _handled[key] = latest_image
+
+
+def _record_build_transition(
+    key: Tuple[str, str],
+    body: kopf.Body,
+    project_name: str,
+    project_namespace: str,
+    project_uid: Optional[str],
+    parent: Optional[str],
+) -> None:
+    """
+    Post an Event when a kpack build starts or fails; finished builds are posted on pinning.
+
+    With tracing enabled, the wait for the build to start and the build
+    itself are recorded as spans of the source change's trace.
+    """
+    status = body.get("status", {})
+    build_ref = status.get("latestBuildRef")
+    if not build_ref:
+        return
+    ready: Dict[str, Any] = next(
+        (c for c in status.get("conditions", []) if c.get("type") == "Ready"),
+        {},
+    )
+    state = (build_ref, ready.get("status", "Unknown"))
+    previous = _builds.get(key)
+    _builds[key] = state
+    if previous == state:
+        return
+
+    recorder = get_event_recorder()
+    if state[1] == "Unknown" and (previous is None or previous[0] != build_ref):
+        started = time.time()
+        _build_started[key] = started
+        detected = tracing.parse_timestamp(
+            body.get("metadata", {}).get("annotations", {}).get(SOURCE_DETECTED_ANNOTATION)
+        )
+        if detected is not None and detected <= started:
+            tracing.record_span(
+                "build.admission", detected, started, parent=parent, build=build_ref
+            )
+        recorder.record(
+            "Project",
+            project_name,
+            project_namespace,
+            "BuildStarted",
+            f"Build {build_ref} started",
+            uid=project_uid,
+        )
+    elif state[1] == "False":
+        recorder.record(
+            "Project",
+            project_name,
+            project_namespace,
+            "BuildFailed",
+            f"Build {build_ref} failed: {ready.get('message') or ready.get('reason', '')}",
+            type="Warning",
+            uid=project_uid,
+        )
+
+    if state[1] in ("True", "False"):
+        tracing.record_span(
+            "kpack.build",
+            _build_started.pop(key, None),
+            parent=parent,
+            error=(
+                (ready.get("message") or ready.get("reason", "")) if state[1] == "False" else None
+            ),
+            build=build_ref,
+        )
+
+
+def _traceparent(body: kopf.Body) -> Optional[str]:
+    """
+    Trace of the source change the Image's latest build is for.
+
+    Builds kpack starts for other reasons, such as a builder update, are
+    not part of it and start their own trace.
+    """
+    reason = body.get("status", {}).get("latestBuildReason")
+    if reason and "COMMIT" not in reason.split(","):
+        return None
+    traceparent: Optional[str] = (
+        body.get("metadata", {}).get("annotations", {}).get(tracing.TRACEPARENT_ANNOTATION)
+    )
+    return traceparent
+
+
+async def rollout_image(
+    project_name: str,
+    namespace: str,
+    image: str,
+    branch: Optional[str],
+    built_at: Optional[str] = None,
+    project_owner: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+    """
+    Deploy a new image to the Project's Environments tracking ``branch``.
+
+    With ``image_prepull_enabled``, the image is first pulled onto the nodes
+    so that new replicas start without waiting for a cold pull.
+
+    Args:
+        project_name: Project name
+        namespace: Namespace of the Project and its Environments
+        image: Digest-pinned image reference
+        branch: Git branch the image was built from
+        built_at: When the build finished, the start of the deploy duration
+        project_owner: Owner references to the Project, for pre-pull resources
+    """
+    api = client.CustomObjectsApi()
+    environments = cast(
+        Dict[str, Any],
+        await run_sync(
+            api.list_namespaced_custom_object,
+            "kapsa-project.io",
+            "v1alpha1",
+            namespace,
+            "environments",
+        ),
+    )
+
+    targets = []
+    for env in environments.get("items", []):
+        env_spec: Dict[str, Any] = env.get("spec", {})
+        if env_spec.get("projectRef", {}).get("name") != project_name:
+            continue
+        if branch and env_spec.get("branch") not in (None, branch):
+            continue
+        if _already_deployed(env.get("status", {}), image):
+            continue
+        targets.append(env)
+
+    if targets and project_owner and get_settings().image_prepull_enabled:
+        from kapsa.prepull import prepull_image
+
+        placements = [node_placement(env.get("spec", {}).get("runtime") or {}) for env in targets]
+        # One DaemonSet can only follow the Environments if they agree on their nodes
+        placement = placements[0] if all(p == placements[0] for p in placements) else None
+        with tracing.child_span("image.prepull", image=image, environments=len(targets)):
+            await prepull_image(project_name, namespace, image, project_owner, placement)
+
+    for env in targets:
+        env_spec = env.get("spec", {})
+        env_name = env["metadata"]["name"]
+        with tracing.child_span("environment.deploy", environment=env_name, namespace=namespace):
+            await deploy_environment(
+                env_name, namespace, env_spec, image, env["metadata"], started_at=built_at
+            )
+        get_status_manager().update(
+            "environments",
+            env_name,
+            namespace,
+            env.get("status", {}),
+            image=image,
+            resources={"deploymentName": env_name},
+        )
+
+
+def _already_deployed(status: Dict[str, Any], image: str) -> bool:
+    """
+    Whether an Environment runs ``image`` or has already failed to roll it out.
+
+    A rolled-back Environment runs its last ready image again, so its status
+    alone would have the failed build redeployed (and rolled back) after an
+    operator restart; ``status.rollout`` remembers the failure.
+    """
+    rollout = status.get("rollout") or {}
+    return (
+        status.get("image") == image
+        or rollout.get("rolledBackFrom") == image
+        or (rollout.get("state") == "Failed" and rollout.get("image") == image)
+    )
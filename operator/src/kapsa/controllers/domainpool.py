@@ -5,6 +5,8 @@ from typing import Any, Dict
 import kopf
 
 from kapsa.logging import get_logger
+from kapsa.startup import get_startup_timer
+from kapsa.status import get_status_manager
 
 logger = get_logger(__name__)
 
@@ -14,8 +16,9 @@ async def domainpool_created(
     spec: Dict[str, Any],
     name: str,
     meta: kopf.Meta,
+    status: Dict[str, Any],
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle DomainPool creation."""
     base_domains = spec.get("baseDomains", [])
     logger.info(
@@ -27,8 +30,12 @@ async def domainpool_created(
     # TODO: Validate cert-manager ClusterIssuer/Issuer exists
     # TODO: Initialize domain allocation tracking
 
-    return {
-        "conditions": [
+    get_status_manager().update(
+        "domainpools",
+        name,
+        None,
+        status,
+        conditions=[
             {
                 "type": "Ready",
                 "status": "True",
@@ -36,9 +43,11 @@ async def domainpool_created(
                 "message": f"DomainPool {name} is configured with {len(base_domains)} base domain(s)",
             }
         ],
-        "allocatedDomains": [],
-        "availableDomains": base_domains,
-    }
+        generation=meta.get("generation"),
+        allocatedDomains=status.get("allocatedDomains", []),
+        availableDomains=base_domains,
+    )
+    get_startup_timer().mark("first_reconcile")
 
 
 @kopf.on.update("kapsa-project.io", "v1alpha1", "domainpools")
@@ -48,8 +57,9 @@ async def domainpool_updated(
     old: Dict[str, Any],
     new: Dict[str, Any],
     status: Dict[str, Any],
+    meta: kopf.Meta,
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle DomainPool updates."""
     base_domains = spec.get("baseDomains", [])
     logger.info(
@@ -61,8 +71,12 @@ async def domainpool_updated(
     # TODO: Handle base domain additions/removals
     # TODO: Update allocated domains if base domains changed
 
-    return {
-        "conditions": [
+    get_status_manager().update(
+        "domainpools",
+        name,
+        None,
+        status,
+        conditions=[
             {
                 "type": "Ready",
                 "status": "True",
@@ -70,8 +84,9 @@ async def domainpool_updated(
                 "message": f"DomainPool {name} updated",
             }
         ],
-        "availableDomains": base_domains,
-    }
+        generation=meta.get("generation"),
+        availableDomains=base_domains,
+    )
 
 
 @kopf.on.delete("kapsa-project.io", "v1alpha1", "domainpools")
@@ -83,5 +98,7 @@ async def domainpool_deleted(
     """Handle DomainPool deletion."""
     logger.info("domainpool_deleted", domainpool=name)
 
+    get_status_manager().forget("domainpools", name, None)
+
     # TODO: Check if any projects are still using this domain pool
     # TODO: Emit warning event if domains are still allocated
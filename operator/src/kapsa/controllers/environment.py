@@ -1,13 +1,26 @@
 """Environment CRD controller."""
 
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional, cast
 
 import kopf
+from kubernetes import client
+from kubernetes.client.rest import ApiException
 
+from kapsa import tracing
+from kapsa.config import get_settings
+from kapsa.events import get_event_recorder
 from kapsa.logging import get_logger
+from kapsa.startup import get_startup_timer
+from kapsa.status import get_status_manager
+from kapsa.utils.deployment import create_deployment_spec
+from kapsa.utils.kube import run_sync
 
 logger = get_logger(__name__)
 
+# Spec fields the Deployment is built from
+DEPLOYMENT_FIELDS = ("projectRef", "runtime", "env")
+
 
 @kopf.on.create("kapsa-project.io", "v1alpha1", "environments")
 async def environment_created(
@@ -15,8 +28,9 @@ async def environment_created(
     name: str,
     namespace: str,
     meta: kopf.Meta,
+    status: Dict[str, Any],
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle Environment creation."""
     project_ref = spec.get("projectRef", {})
     env_type = spec.get("type")
@@ -31,14 +45,22 @@ async def environment_created(
         branch=branch,
     )
 
-    # TODO: Fetch Project CRD to get image tag and configuration
-    # TODO: Create Deployment
     # TODO: Create Service
     # TODO: Create Ingress with cert-manager annotations
     # TODO: Create HPA if autoscaling is enabled
 
-    return {
-        "conditions": [
+    fields: Dict[str, Any] = {}
+    image = await get_project_image(project_ref.get("name"), namespace)
+    if image:
+        await deploy_environment(name, namespace, spec, image, meta)
+        fields = {"image": image, "resources": {"deploymentName": name}}
+
+    get_status_manager().update(
+        "environments",
+        name,
+        namespace,
+        status,
+        conditions=[
             {
                 "type": "Ready",
                 "status": "False",
@@ -46,7 +68,16 @@ async def environment_created(
                 "message": "Environment is being initialized",
             }
         ],
-    }
+        generation=meta.get("generation"),
+        **fields,
+    )
+    get_startup_timer().mark("first_reconcile")
+
+
+@kopf.on.resume("kapsa-project.io", "v1alpha1", "environments")
+async def environment_resumed(**kwargs: object) -> None:
+    """Existing Environments need no work on operator start; record the first reconcile."""
+    get_startup_timer().mark("first_reconcile")
 
 
 @kopf.on.update("kapsa-project.io", "v1alpha1", "environments")
@@ -56,30 +87,49 @@ async def environment_updated(
     namespace: str,
     old: Dict[str, Any],
     new: Dict[str, Any],
+    meta: kopf.Meta,
+    status: Dict[str, Any],
     **kwargs: object,
-) -> Dict[str, Any]:
-    """Handle Environment updates."""
+) -> None:
+    """
+    Handle Environment updates.
+
+    The Deployment is only rebuilt when a spec field it is built from
+    changed; other updates leave a running rollout (and its start time) alone.
+    """
     logger.info(
         "environment_updated",
         environment=name,
         namespace=namespace,
     )
 
-    # TODO: Update Deployment if runtime config changed
+    image = status.get("image")
+    if image and _deployment_changed(old, new):
+        await deploy_environment(name, namespace, spec, image, meta)
+
     # TODO: Update Service if needed
     # TODO: Update Ingress if domain changed
     # TODO: Update HPA if autoscaling config changed
 
-    return {
-        "conditions": [
+    # With a Deployment, Ready follows the rollout (see controllers.rollout)
+    conditions = None
+    if not image:
+        conditions = [
             {
                 "type": "Ready",
                 "status": "True",
                 "reason": "Updated",
                 "message": "Environment updated successfully",
             }
-        ],
-    }
+        ]
+    get_status_manager().update(
+        "environments",
+        name,
+        namespace,
+        status,
+        conditions=conditions,
+        generation=meta.get("generation"),
+    )
 
 
 @kopf.on.delete("kapsa-project.io", "v1alpha1", "environments")
@@ -96,5 +146,114 @@ async def environment_deleted(
         namespace=namespace,
     )
 
+    get_status_manager().forget("environments", name, namespace)
+    get_event_recorder().forget("Environment", name, namespace)
+
     # Kubernetes garbage collection will clean up owned resources
     # (Deployment, Service, Ingress, HPA) via ownerReferences
+
+
+async def get_project_image(project_name: Optional[str], namespace: str) -> Optional[str]:
+    """Return the Project's latest digest-pinned image, if it has been built."""
+    if not project_name:
+        return None
+
+    api = client.CustomObjectsApi()
+    try:
+        project = cast(
+            Dict[str, Any],
+            await run_sync(
+                api.get_namespaced_custom_object,
+                "kapsa-project.io",
+                "v1alpha1",
+                namespace,
+                "projects",
+                project_name,
+            ),
+        )
+    except ApiException as e:
+        if e.status == 404:
+            logger.warning("project_not_found", project=project_name, namespace=namespace)
+            return None
+        raise
+
+    image: Optional[str] = project.get("status", {}).get("latestImage")
+    return image
+
+
+async def deploy_environment(
+    env_name: str,
+    namespace: str,
+    spec: Dict[str, Any],
+    image: str,
+    owner_meta: Mapping[str, Any],
+    started_at: Optional[str] = None,
+) -> None:
+    """
+    Create or update the Environment's Deployment.
+
+    Within a trace, the Deployment is annotated with it so the rollout
+    tracker can record the rollout in the same trace.
+
+    Args:
+        env_name: Environment name
+        namespace: Environment namespace
+        spec: Environment spec
+        image: Image reference to deploy, pinned by digest
+        owner_meta: Environment metadata, for the owner reference
+        started_at: When the deploy started, for deploy duration (defaults to now)
+    """
+    apps_v1 = client.AppsV1Api()
+
+    deployment = create_deployment_spec(
+        name=env_name,
+        namespace=namespace,
+        image=image,
+        project=spec.get("projectRef", {}).get("name", ""),
+        runtime=spec.get("runtime", {}),
+        env=spec.get("env", []),
+        progress_deadline=get_settings().rollout_progress_deadline,
+        started_at=started_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        traceparent=tracing.current_traceparent(),
+    )
+    deployment["metadata"]["ownerReferences"] = [
+        {
+            "apiVersion": "kapsa-project.io/v1alpha1",
+            "kind": "Environment",
+            "name": owner_meta["name"],
+            "uid": owner_meta["uid"],
+            "controller": True,
+            "blockOwnerDeletion": True,
+        }
+    ]
+
+    try:
+        await run_sync(apps_v1.create_namespaced_deployment, namespace, deployment)
+        logger.info(
+            "deployment_created",
+            environment=env_name,
+            namespace=namespace,
+            image=image,
+        )
+    except ApiException as e:
+        if e.status != 409:  # Already exists
+            raise
+        # A strategic merge keeps list entries missing from the patch, so env
+        # vars and ports removed from the spec are replaced explicitly
+        for container in deployment["spec"]["template"]["spec"]["containers"]:
+            for key in ("env", "ports"):
+                container[key] = [*container.get(key, []), {"$patch": "replace"}]
+        await run_sync(apps_v1.patch_namespaced_deployment, env_name, namespace, deployment)
+        logger.info(
+            "deployment_updated",
+            environment=env_name,
+            namespace=namespace,
+            image=image,
+        )
+
+
+def _deployment_changed(old: Mapping[str, Any], new: Mapping[str, Any]) -> bool:
+    """Whether an update touched the spec fields the Deployment is built from."""
+    old_spec = old.get("spec") or {}
+    new_spec = new.get("spec") or {}
+    return any(old_spec.get(f) != new_spec.get(f) for f in DEPLOYMENT_FIELDS)
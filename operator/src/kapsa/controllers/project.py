@@ -1,18 +1,39 @@
 """Project CRD controller."""
 
 import asyncio
-from typing import Any, Dict, Optional
+import datetime
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, cast
 
 import kopf
 from kubernetes import client
 from kubernetes.client.rest import ApiException
-from kubernetes.dynamic import DynamicClient
 
+from kapsa import metrics, tracing
+from kapsa.config import get_settings
+from kapsa.events import get_event_recorder
 from kapsa.logging import get_logger
-from kapsa.utils.kpack import create_kpack_image_spec, create_service_account_spec
+from kapsa.registry import resolve_registry
+from kapsa.startup import get_startup_timer
+from kapsa.status import get_status_manager
+from kapsa.utils.kpack import (
+    SOURCE_DETECTED_ANNOTATION,
+    create_kpack_image_spec,
+    create_service_account_spec,
+)
+from kapsa.utils.kube import get_dynamic_client, run_sync
+
+if TYPE_CHECKING:
+    from kapsa.teardown import TeardownResult
 
 logger = get_logger(__name__)
 
+# Changed paths recorded in status.source per commit
+MAX_CHANGED_PATHS = 50
+
+# When each Project last polled its repository (monotonic clock)
+_last_polled: Dict[Tuple[str, str], float] = {}
+
 
 @kopf.on.create("kapsa-project.io", "v1alpha1", "projects")
 async def project_created(
@@ -20,8 +41,9 @@ async def project_created(
     name: str,
     namespace: str,
     meta: kopf.Meta,
+    status: Dict[str, Any],
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle Project creation."""
     logger.info(
         "project_created",
@@ -37,8 +59,12 @@ async def project_created(
     await create_kpack_resources(spec, name, project_namespace, meta)
 
     # Initial status
-    return {
-        "conditions": [
+    get_status_manager().update(
+        "projects",
+        name,
+        namespace,
+        status,
+        conditions=[
             {
                 "type": "Ready",
                 "status": "False",
@@ -46,8 +72,16 @@ async def project_created(
                 "message": "Project is being initialized",
             }
         ],
-        "environments": [],
-    }
+        generation=meta.get("generation"),
+        environments=status.get("environments", []),
+    )
+    get_startup_timer().mark("first_reconcile")
+
+
+@kopf.on.resume("kapsa-project.io", "v1alpha1", "projects")
+async def project_resumed(**kwargs: object) -> None:
+    """Existing Projects need no work on operator start; record the first reconcile."""
+    get_startup_timer().mark("first_reconcile")
 
 
 @kopf.on.update("kapsa-project.io", "v1alpha1", "projects")
@@ -56,8 +90,9 @@ async def project_updated(
     status: Dict[str, Any],
     name: str,
     namespace: str,
+    meta: kopf.Meta,
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle Project updates."""
     logger.info(
         "project_updated",
@@ -73,15 +108,11 @@ async def project_updated(
         project_namespace = f"{name}-ns"
         await reconcile_kpack_resources(spec, name, project_namespace)
 
-        return {
-            "conditions": [
-                {
-                    "type": "Ready",
-                    "status": "True",
-                    "reason": "Reconciled",
-                    "message": "Project successfully reconciled",
-                }
-            ],
+        ready = {
+            "type": "Ready",
+            "status": "True",
+            "reason": "Reconciled",
+            "message": "Project successfully reconciled",
         }
 
     except Exception as e:
@@ -92,69 +123,280 @@ async def project_updated(
             error=str(e),
         )
 
-        return {
-            "conditions": [
-                {
-                    "type": "Ready",
-                    "status": "False",
-                    "reason": "ReconciliationFailed",
-                    "message": f"Reconciliation failed: {str(e)}",
-                }
-            ],
+        ready = {
+            "type": "Ready",
+            "status": "False",
+            "reason": "ReconciliationFailed",
+            "message": f"Reconciliation failed: {str(e)}",
         }
+        get_event_recorder().record(
+            "Project",
+            name,
+            namespace,
+            "ReconciliationFailed",
+            str(e),
+            type="Warning",
+            uid=meta.get("uid"),
+        )
+
+    get_status_manager().update(
+        "projects",
+        name,
+        namespace,
+        status,
+        conditions=[ready],
+        generation=meta.get("generation"),
+    )
 
 
 @kopf.on.delete("kapsa-project.io", "v1alpha1", "projects")
 async def project_deleted(
     name: str,
     namespace: str,
+    meta: kopf.Meta,
+    runtime: datetime.timedelta,
     **kwargs: object,
 ) -> None:
-    """Handle Project deletion."""
+    """
+    Handle Project deletion.
+
+    The Project's finalizer is held until its namespaces are actually gone,
+    or until ``teardown_deadline`` passes, after which the Project is
+    released and the stuck namespaces are left for an administrator, with
+    a Warning Event naming them.
+    """
     logger.info(
         "project_deleted",
         project=name,
         namespace=namespace,
     )
 
-    # Cleanup project namespace
-    await delete_project_namespace(name, namespace)
+    settings = get_settings()
+    _last_polled.pop((namespace, name), None)
+
+    await delete_project_environments(name, namespace)
+
+    # Cleanup project namespaces
+    result = await delete_project_namespace(name, namespace)
+    elapsed = runtime.total_seconds()
+
+    if result.complete:
+        get_status_manager().forget("projects", name, namespace)
+        get_event_recorder().forget("Project", name, namespace)
+        metrics.project_teardown_duration.labels(outcome="completed").observe(elapsed)
+        logger.info(
+            "project_teardown_completed",
+            project=name,
+            namespace=namespace,
+            namespaces=len(result.deleted),
+            duration=elapsed,
+        )
+        return
+
+    if elapsed < settings.teardown_deadline:
+        raise kopf.TemporaryError(
+            f"Waiting for namespaces to terminate: {', '.join(sorted(result.pending))}",
+            delay=settings.teardown_retry_delay,
+        )
+
+    metrics.project_teardown_duration.labels(outcome="deadline_exceeded").observe(elapsed)
+    logger.error(
+        "project_teardown_deadline_exceeded",
+        project=name,
+        namespace=namespace,
+        pending=result.pending,
+        duration=elapsed,
+    )
+    # Not forgotten: the Event is written in the background after release
+    get_event_recorder().record(
+        "Project",
+        name,
+        namespace,
+        "TeardownDeadlineExceeded",
+        f"Released after {int(elapsed)}s with namespaces still terminating: "
+        + "; ".join(f"{ns} ({', '.join(b)})" for ns, b in sorted(result.pending.items())),
+        type="Warning",
+        uid=meta.get("uid"),
+    )
 
 
-@kopf.timer("kapsa-project.io", "v1alpha1", "projects", interval=300, idle=60)
+@kopf.timer("kapsa-project.io", "v1alpha1", "projects", interval=60, idle=60)
 async def project_poll_git(
     spec: Dict[str, Any],
     status: Dict[str, Any],
     name: str,
     namespace: str,
-    patch: kopf.Patch,
+    meta: kopf.Meta,
     **kwargs: object,
 ) -> None:
-    """Periodically poll git repository for changes."""
+    """
+    Periodically poll the git repository and record its latest commit.
+
+    The timer ticks every minute; each Project polls once per
+    ``spec.repository.pollInterval``. Repositories are fetched into the
+    shared mirror cache, so a poll is an incremental fetch and Projects
+    using the same repository share it. kpack rebuilds the tracked branch
+    on its own; the poll records the commit, what it changed and which
+    build strategy it needs in ``status.source``. With tracing enabled, a
+    new commit starts a trace that the build and rollout trackers continue.
+    """
     repository_spec = spec.get("repository", {})
-    poll_interval = repository_spec.get("pollInterval", 300)
+    url = repository_spec.get("url")
+    if not url:
+        return
 
-    # Adjust timer interval based on spec
-    if poll_interval != 300:
-        logger.debug(
-            "git_poll_interval_adjusted",
-            project=name,
-            namespace=namespace,
-            interval=poll_interval,
-        )
+    key = (namespace, name)
+    poll_interval = repository_spec.get("pollInterval") or get_settings().default_poll_interval
+    now = time.monotonic()
+    if key in _last_polled and now - _last_polled[key] < poll_interval - 1:
+        return
+    _last_polled[key] = now
+    started_at = time.time()
+
+    from kapsa.git import GitError, credentials_env, get_mirror_cache
 
+    branch = repository_spec.get("branch", "main")
+    build_spec = spec.get("build", {})
+    previous = status.get("latestCommit")
     logger.debug(
         "git_poll_triggered",
         project=name,
         namespace=namespace,
-        repository=repository_spec.get("url"),
+        repository=url,
     )
 
-    # TODO: Implement git polling logic
-    # 1. Clone/fetch repository
-    # 2. Check for new commits on tracked branches
-    # 3. If new commit found, trigger build
-    # 4. Update status.latestCommit
+    try:
+        env = await credentials_env(repository_spec.get("credentials"), namespace)
+        async with get_mirror_cache().open(url) as mirror:
+            await mirror.fetch(env)
+            commit = await mirror.resolve(branch)
+            if commit is None:
+                raise GitError(f"branch {branch} not found in {url}")
+            if commit != previous:
+                info = await mirror.commit_info(commit)
+                changed = await mirror.changed_paths(previous, commit) if previous else None
+                strategy = await mirror.detect_build_strategy(
+                    commit,
+                    build_spec.get("context", "."),
+                    build_spec.get("dockerfile") or "Dockerfile",
+                )
+        fetched_at = time.time()
+    except GitError as e:
+        metrics.git_poll_total.labels(namespace=namespace, project=name, status="failed").inc()
+        logger.warning(
+            "git_poll_failed",
+            project=name,
+            namespace=namespace,
+            repository=url,
+            error=str(e),
+        )
+        get_event_recorder().record(
+            "Project",
+            name,
+            namespace,
+            "GitPollFailed",
+            str(e),
+            type="Warning",
+            uid=meta.get("uid"),
+        )
+        return
+    finally:
+        metrics.git_poll_duration.labels(namespace=namespace, project=name).observe(
+            time.monotonic() - now
+        )
+
+    if commit == previous:
+        metrics.git_poll_total.labels(namespace=namespace, project=name, status="unchanged").inc()
+        logger.debug("git_poll_checked", project=name, commit=commit, changed=False)
+        return
+
+    metrics.git_poll_total.labels(namespace=namespace, project=name, status="changed").inc()
+    with tracing.span(
+        "project.poll_git",
+        start_time=started_at,
+        project=name,
+        namespace=namespace,
+        repository=url,
+        branch=branch,
+        commit=commit,
+        previous=previous,
+    ):
+        tracing.record_span("git.fetch", started_at, fetched_at, strategy=strategy)
+        logger.info(
+            "git_commit_detected",
+            project=name,
+            namespace=namespace,
+            branch=branch,
+            commit=commit,
+            previous=previous,
+            changed_paths=len(changed) if changed is not None else None,
+        )
+        if build_spec.get("strategy") and build_spec["strategy"] != strategy:
+            logger.warning(
+                "build_strategy_mismatch",
+                project=name,
+                namespace=namespace,
+                commit=commit,
+                configured=build_spec["strategy"],
+                detected=strategy,
+            )
+            get_event_recorder().record(
+                "Project",
+                name,
+                namespace,
+                "BuildStrategyMismatch",
+                f"Commit {commit[:12]} looks like a {strategy} build, "
+                f"but spec.build.strategy is {build_spec['strategy']}",
+                type="Warning",
+                uid=meta.get("uid"),
+            )
+
+        get_status_manager().update(
+            "projects",
+            name,
+            namespace,
+            status,
+            latestCommit=commit,
+            source={
+                "branch": branch,
+                "commit": commit,
+                "author": info.author,
+                "committedAt": info.committed_at,
+                "message": info.subject,
+                "changedPaths": changed[:MAX_CHANGED_PATHS] if changed is not None else None,
+                "changedPathCount": len(changed) if changed is not None else None,
+                "buildStrategy": strategy,
+            },
+        )
+
+        await _hand_on_trace(name)
+
+
+async def _hand_on_trace(project_name: str) -> None:
+    """Annotate the Project's kpack Image with the current trace, for the build tracker."""
+    traceparent = tracing.current_traceparent()
+    if not traceparent:
+        return
+
+    api = client.CustomObjectsApi()
+    annotations = {
+        tracing.TRACEPARENT_ANNOTATION: traceparent,
+        SOURCE_DETECTED_ANNOTATION: datetime.datetime.now(datetime.timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%S.%fZ"
+        ),
+    }
+    try:
+        await run_sync(
+            api.patch_namespaced_custom_object,
+            "kpack.io",
+            "v1alpha2",
+            f"{project_name}-ns",  # see create_project_namespace
+            "images",
+            project_name,
+            {"metadata": {"annotations": annotations}},
+        )
+    except ApiException as e:
+        logger.debug("trace_handoff_failed", project=project_name, error=str(e))
 
 
 async def create_project_namespace(
@@ -197,37 +439,63 @@ async def create_project_namespace(
     return namespace_name
 
 
-async def delete_project_namespace(project_name: str, parent_namespace: str) -> None:
-    """Delete the project's dedicated namespace."""
-    v1 = client.CoreV1Api()
-    namespace_name = f"{project_name}-ns"
+async def delete_project_namespace(project_name: str, parent_namespace: str) -> "TeardownResult":
+    """
+    Delete the project's namespaces (its own and any preview namespaces).
 
-    try:
-        v1.delete_namespace(namespace_name)
-        logger.info(
-            "namespace_deleted",
-            namespace=namespace_name,
-            project=project_name,
-        )
-    except ApiException as e:
-        if e.status == 404:  # Not found
-            logger.debug(
-                "namespace_not_found",
-                namespace=namespace_name,
-                project=project_name,
-            )
-        else:
-            logger.error(
-                "namespace_deletion_failed",
-                namespace=namespace_name,
-                project=project_name,
-                error=str(e),
+    Returns:
+        Which namespaces are gone and which are still terminating
+    """
+    from kapsa.teardown import list_project_namespaces, teardown_namespaces
+
+    namespaces = set(await list_project_namespaces(project_name, parent_namespace))
+    namespaces.add(f"{project_name}-ns")
+
+    return await teardown_namespaces(sorted(namespaces), project=project_name)
+
+
+async def delete_project_environments(project_name: str, namespace: str) -> None:
+    """
+    Delete the project's Environments with foreground propagation.
+
+    Foreground deletion keeps each Environment around until its Deployment,
+    Service and Ingress are gone, so nothing keeps serving after the Project
+    has been removed.
+    """
+    api = client.CustomObjectsApi()
+    environments = cast(
+        Dict[str, Any],
+        await run_sync(
+            api.list_namespaced_custom_object,
+            "kapsa-project.io",
+            "v1alpha1",
+            namespace,
+            "environments",
+        ),
+    )
+
+    for env in environments.get("items", []):
+        if env.get("spec", {}).get("projectRef", {}).get("name") != project_name:
+            continue
+        if env["metadata"].get("deletionTimestamp"):
+            continue
+
+        try:
+            await run_sync(
+                api.delete_namespaced_custom_object,
+                "kapsa-project.io",
+                "v1alpha1",
+                namespace,
+                "environments",
+                env["metadata"]["name"],
+                propagation_policy="Foreground",
             )
+        except ApiException as e:
+            if e.status != 404:  # Not found
+                raise
 
 
-async def reconcile_environments(
-    spec: Dict[str, Any], project_name: str, namespace: str
-) -> None:
+async def reconcile_environments(spec: Dict[str, Any], project_name: str, namespace: str) -> None:
     """Reconcile Environment CRDs based on Project spec."""
     environments = spec.get("environments", [])
 
@@ -261,8 +529,6 @@ async def create_kpack_resources(
 ) -> None:
     """Create kpack Image and ServiceAccount resources."""
     v1 = client.CoreV1Api()
-    api_client = client.ApiClient()
-    dyn_client = DynamicClient(api_client)
 
     # Get repository configuration
     repository = spec.get("repository", {})
@@ -290,22 +556,22 @@ async def create_kpack_resources(
         )
         return
 
-    # TODO: Fetch Registry CRD to get actual registry endpoint
-    # For now, use a placeholder
-    image_tag = f"registry.example.com/{image_repository}:latest"
+    registry = await resolve_registry(registry_name)
+    if registry is None:
+        raise kopf.TemporaryError(f"Registry {registry_name} not found", delay=60)
+
+    image_tag = registry.image_reference(image_repository)
 
     # Create ServiceAccount with registry credentials
     service_account_name = f"{project_name}-kpack-sa"
-
-    # TODO: Get docker secret from Registry CRD
-    docker_secret_name = f"{registry_name}-credentials"
+    docker_secret_name = registry.pull_secret_name or f"{registry_name}-credentials"
 
     sa_spec = create_service_account_spec(
         service_account_name, project_namespace, docker_secret_name
     )
 
     try:
-        v1.create_namespaced_service_account(project_namespace, sa_spec)
+        await run_sync(v1.create_namespaced_service_account, project_namespace, sa_spec)
         logger.info(
             "service_account_created",
             project=project_name,
@@ -329,10 +595,19 @@ async def create_kpack_resources(
         builder="default",  # TODO: Make configurable
     )
 
+    # Let the build tracker find the Project and Registry for this Image
+    image_spec["metadata"]["labels"].update(
+        {
+            "kapsa-project.io/project": project_name,
+            "kapsa-project.io/project-namespace": owner_meta["namespace"],
+            "kapsa-project.io/registry": registry_name,
+        }
+    )
+
     # Add owner reference
     image_spec["metadata"]["ownerReferences"] = [
         {
-            "apiVersion": f"{owner_meta['apiVersion']}",
+            "apiVersion": "kapsa-project.io/v1alpha1",
             "kind": "Project",
             "name": owner_meta["name"],
             "uid": owner_meta["uid"],
@@ -343,8 +618,11 @@ async def create_kpack_resources(
 
     try:
         # Get kpack Image resource
-        kpack_api = dyn_client.resources.get(api_version="kpack.io/v1alpha2", kind="Image")
-        kpack_api.create(namespace=project_namespace, body=image_spec)
+        dyn_client = await get_dynamic_client()
+        kpack_api = await run_sync(
+            dyn_client.resources.get, api_version="kpack.io/v1alpha2", kind="Image"
+        )
+        await run_sync(kpack_api.create, namespace=project_namespace, body=image_spec)
         logger.info(
             "kpack_image_created",
             project=project_name,
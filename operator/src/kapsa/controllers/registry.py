@@ -1,21 +1,42 @@
 """Registry CRD controller."""
 
-from typing import Any, Dict
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 
 import kopf
 
+from kapsa import metrics
+from kapsa.config import get_settings
+from kapsa.events import get_event_recorder
 from kapsa.logging import get_logger
+from kapsa.models.registry import RegistryEndpoint
+from kapsa.registry import (
+    RegistryError,
+    discard_registry_client,
+    forget_registry,
+    get_manifest_cache,
+    get_registry_client,
+    load_registry,
+    resolve_registry,
+)
+from kapsa.startup import get_startup_timer
+from kapsa.status import get_status_manager
 
 logger = get_logger(__name__)
 
+# Registry name -> monotonic time of the last health check
+_last_checked: Dict[str, float] = {}
+
 
 @kopf.on.create("kapsa-project.io", "v1alpha1", "registries")
 async def registry_created(
     spec: Dict[str, Any],
     name: str,
     meta: kopf.Meta,
+    status: Dict[str, Any],
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle Registry creation."""
     logger.info(
         "registry_created",
@@ -24,20 +45,15 @@ async def registry_created(
         endpoint=spec.get("endpoint"),
     )
 
-    # TODO: Validate registry credentials secret exists
-    # TODO: Create image pull secret template if needed
-    # TODO: Verify connection to the registry
-
-    return {
-        "conditions": [
-            {
-                "type": "Ready",
-                "status": "True",
-                "reason": "RegistryConfigured",
-                "message": f"Registry {name} is configured and ready",
-            }
-        ],
-    }
+    endpoint = await load_registry(name, spec)
+    await verify_registry(
+        endpoint,
+        status,
+        meta.get("generation"),
+        ready_reason="RegistryConfigured",
+        uid=meta.get("uid"),
+    )
+    get_startup_timer().mark("first_reconcile")
 
 
 @kopf.on.update("kapsa-project.io", "v1alpha1", "registries")
@@ -46,8 +62,10 @@ async def registry_updated(
     name: str,
     old: Dict[str, Any],
     new: Dict[str, Any],
+    meta: kopf.Meta,
+    status: Dict[str, Any],
     **kwargs: object,
-) -> Dict[str, Any]:
+) -> None:
     """Handle Registry updates."""
     logger.info(
         "registry_updated",
@@ -57,16 +75,59 @@ async def registry_updated(
 
     # TODO: Update image pull secrets in project namespaces if changed
 
-    return {
-        "conditions": [
-            {
-                "type": "Ready",
-                "status": "True",
-                "reason": "RegistryUpdated",
-                "message": f"Registry {name} configuration updated",
-            }
-        ],
-    }
+    get_manifest_cache().invalidate(name)
+    endpoint = await load_registry(name, spec)
+    await verify_registry(
+        endpoint,
+        status,
+        meta.get("generation"),
+        ready_reason="RegistryUpdated",
+        uid=meta.get("uid"),
+    )
+
+
+@kopf.on.resume("kapsa-project.io", "v1alpha1", "registries")
+async def registry_resumed(
+    spec: Dict[str, Any],
+    name: str,
+    **kwargs: object,
+) -> None:
+    """Warm the endpoint cache for existing Registries on operator start."""
+    await load_registry(name, spec)
+    get_startup_timer().mark("first_reconcile")
+
+
+@kopf.timer("kapsa-project.io", "v1alpha1", "registries", interval=60, initial_delay=60)
+async def registry_health_check(
+    name: str,
+    status: Dict[str, Any],
+    meta: kopf.Meta,
+    **kwargs: object,
+) -> None:
+    """
+    Periodically verify registry connectivity.
+
+    The timer ticks every minute; each Registry is checked once per
+    ``registry_health_interval``, so the interval can change at runtime.
+    """
+    now = time.monotonic()
+    last = _last_checked.get(name)
+    if last is not None and now - last < get_settings().registry_health_interval - 1:
+        return
+    _last_checked[name] = now
+
+    endpoint = await resolve_registry(name)
+    if endpoint is None:
+        return
+
+    # Keep the reason from the last create/update while the registry stays healthy
+    ready: Dict[str, Any] = next(
+        (c for c in status.get("conditions", []) if c.get("type") == "Ready"), {}
+    )
+    reason = ready.get("reason") if ready.get("status") == "True" else None
+    await verify_registry(
+        endpoint, status, ready_reason=reason or "RegistryReachable", uid=meta.get("uid")
+    )
 
 
 @kopf.on.delete("kapsa-project.io", "v1alpha1", "registries")
@@ -78,5 +139,125 @@ async def registry_deleted(
     """Handle Registry deletion."""
     logger.info("registry_deleted", registry=name)
 
+    forget_registry(name)
+    _last_checked.pop(name, None)
+    get_manifest_cache().invalidate(name)
+    get_status_manager().forget("registries", name, None)
+    get_event_recorder().forget("Registry", name, None)
+    await discard_registry_client(name)
+
     # Note: We don't delete image pull secrets from project namespaces
     # as they might still be needed for existing deployments
+
+
+async def verify_registry(
+    endpoint: RegistryEndpoint,
+    status: Dict[str, Any],
+    generation: Optional[int] = None,
+    ready_reason: str = "RegistryReachable",
+    uid: Optional[str] = None,
+) -> None:
+    """
+    Ping the registry with its credentials and record the result in status.
+
+    Status is only written when the outcome or the Ready condition changes;
+    ``lastVerified`` and ``latencyMs`` record the check that changed it, and
+    the latency of every check goes to the health latency gauge.
+
+    Args:
+        endpoint: Resolved registry endpoint
+        status: Current Registry status
+        generation: Registry generation the check was made for
+        ready_reason: Condition reason to use when the registry is reachable
+        uid: Registry UID, for the Events
+    """
+    registry_client = get_registry_client(endpoint)
+
+    try:
+        latency = await registry_client.ping()
+    except RegistryError as e:
+        logger.warning(
+            "registry_verification_failed",
+            registry=endpoint.name,
+            endpoint=endpoint.base_url,
+            error=str(e),
+        )
+        metrics.registry_health_total.labels(registry=endpoint.name, status="failed").inc()
+        get_event_recorder().record(
+            "Registry",
+            endpoint.name,
+            None,
+            "RegistryUnreachable",
+            f"Registry {endpoint.name} verification failed: {e}",
+            type="Warning",
+            uid=uid,
+        )
+        _record_verification(
+            endpoint.name,
+            status,
+            generation,
+            verified=False,
+            condition={
+                "type": "Ready",
+                "status": "False",
+                "reason": "RegistryUnreachable",
+                "message": f"Registry {endpoint.name} verification failed: {e}",
+            },
+        )
+        return
+
+    latency_ms = int(latency * 1000)
+    logger.debug("registry_verified", registry=endpoint.name, latency_ms=latency_ms)
+    metrics.registry_health_total.labels(registry=endpoint.name, status="success").inc()
+    metrics.registry_health_latency.labels(registry=endpoint.name).set(latency)
+    if status.get("verified") is False:
+        get_event_recorder().record(
+            "Registry",
+            endpoint.name,
+            None,
+            "RegistryRecovered",
+            f"Registry {endpoint.name} is reachable again",
+            uid=uid,
+        )
+    _record_verification(
+        endpoint.name,
+        status,
+        generation,
+        verified=True,
+        condition={
+            "type": "Ready",
+            "status": "True",
+            "reason": ready_reason,
+            "message": f"Registry {endpoint.name} is configured and ready",
+        },
+        latencyMs=latency_ms,
+    )
+
+
+def _record_verification(
+    name: str,
+    status: Dict[str, Any],
+    generation: Optional[int],
+    verified: bool,
+    condition: Dict[str, Any],
+    **fields: Any,
+) -> None:
+    """Write a verification result, skipping checks that changed nothing."""
+    ready: Dict[str, Any] = next(
+        (c for c in status.get("conditions") or [] if c.get("type") == "Ready"), {}
+    )
+    changed = status.get("verified") is not verified or any(
+        ready.get(k) != condition[k] for k in ("status", "reason", "message")
+    )
+    if changed:
+        fields["lastVerified"] = datetime.now(timezone.utc).isoformat()
+    get_status_manager().update(
+        "registries",
+        name,
+        None,
+        status,
+        conditions=[condition],
+        generation=generation,
+        verified=verified,
+        **(fields if changed else {}),
+    )
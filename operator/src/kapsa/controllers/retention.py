@@ -0,0 +1,175 @@
+"""Image retention: periodically prunes each Project's image repository."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
+
+import kopf
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa.config import get_settings
+from kapsa.events import get_event_recorder
+from kapsa.logging import get_logger
+from kapsa.registry import RegistryError, RetentionPolicy, prune_repository, resolve_registry
+from kapsa.status import get_status_manager
+from kapsa.utils.images import parse_image_reference
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+
+@kopf.timer("kapsa-project.io", "v1alpha1", "projects", interval=300, idle=60)
+async def project_image_retention(
+    spec: Dict[str, Any],
+    status: Dict[str, Any],
+    name: str,
+    namespace: str,
+    meta: kopf.Meta,
+    **kwargs: object,
+) -> None:
+    """
+    Delete old builds from the Project's image repository.
+
+    Runs once per ``retention_interval``, measured from
+    ``status.retention.lastRun`` so that operator restarts do not trigger
+    extra runs. The policy comes from the Registry's ``spec.retention``
+    with the Project's ``spec.registry.retention`` overrides; see
+    :func:`kapsa.registry.retention.plan_retention` for what is kept.
+    """
+    registry_spec = spec.get("registry") or {}
+    registry_name = registry_spec.get("name")
+    if not registry_name:
+        return
+
+    now = datetime.now(timezone.utc)
+    last_run = _parse_time((status.get("retention") or {}).get("lastRun"))
+    if (
+        last_run is not None
+        and (now - last_run).total_seconds() < get_settings().retention_interval
+    ):
+        return
+
+    endpoint = await resolve_registry(registry_name)
+    if endpoint is None:
+        return
+    policy = RetentionPolicy.resolve(endpoint.retention, registry_spec.get("retention"))
+    if policy is None:
+        return
+
+    repository = registry_spec.get("imageRepository", name)
+    branch = spec.get("repository", {}).get("branch", "main")
+    try:
+        live_branches, in_use = await _project_references(
+            name, namespace, repository, branch, status
+        )
+    except ApiException as e:
+        # Without the deployed images nothing can be deleted safely
+        logger.warning("retention_skipped", project=name, namespace=namespace, error=str(e))
+        return
+
+    summary: Dict[str, Any] = {"lastRun": now.strftime("%Y-%m-%dT%H:%M:%SZ")}
+    try:
+        result = await prune_repository(endpoint, repository, policy, branch, live_branches, in_use)
+    except RegistryError as e:
+        logger.warning(
+            "retention_failed",
+            project=name,
+            namespace=namespace,
+            registry=registry_name,
+            repository=repository,
+            error=str(e),
+        )
+        get_event_recorder().record(
+            "Project",
+            name,
+            namespace,
+            "RetentionFailed",
+            f"Could not prune {repository}: {e}",
+            type="Warning",
+            uid=meta.get("uid"),
+        )
+        summary["error"] = str(e)
+        get_status_manager().update("projects", name, namespace, status, retention=summary)
+        return
+
+    summary.update(
+        images=result.images,
+        tags=result.tags,
+        kept=result.kept,
+        deleted=result.deleted,
+        failed=result.failed,
+        dryRun=result.dry_run,
+        candidates=result.candidates,
+        durationSeconds=result.seconds,
+        error=None,
+    )
+    get_status_manager().update("projects", name, namespace, status, retention=summary)
+
+    if result.deleted or result.failed:
+        get_event_recorder().record(
+            "Project",
+            name,
+            namespace,
+            "ImagesPruned" if not result.failed else "ImagePruneFailed",
+            f"Deleted {result.deleted} of {result.deleted + result.failed} old images "
+            f"from {repository}; kept {result.kept}",
+            type="Normal" if not result.failed else "Warning",
+            uid=meta.get("uid"),
+        )
+
+
+async def _project_references(
+    project_name: str,
+    namespace: str,
+    repository: str,
+    branch: str,
+    status: Dict[str, Any],
+) -> Tuple[Set[str], Set[str]]:
+    """
+    Return the branches the Project's Environments track and the digests they use.
+
+    A digest is in use if it is the Project's latest build, or an
+    Environment's current, rolling-out or last ready (rollback) image.
+    """
+    api = client.CustomObjectsApi()
+    environments = cast(
+        Dict[str, Any],
+        await run_sync(
+            api.list_namespaced_custom_object,
+            "kapsa-project.io",
+            "v1alpha1",
+            namespace,
+            "environments",
+        ),
+    )
+
+    live_branches = {branch}
+    images: List[Optional[str]] = [status.get("latestImage")]
+    for env in environments.get("items", []):
+        env_spec = env.get("spec", {})
+        if env_spec.get("projectRef", {}).get("name") != project_name:
+            continue
+        if env_spec.get("branch"):
+            live_branches.add(env_spec["branch"])
+        env_status = env.get("status", {})
+        rollout = env_status.get("rollout") or {}
+        images += [env_status.get("image"), rollout.get("image"), rollout.get("lastReadyImage")]
+
+    in_use = set()
+    for image in images:
+        if not image:
+            continue
+        ref = parse_image_reference(image)
+        if ref.digest is not None and ref.repository == repository:
+            in_use.add(ref.digest)
+    return live_branches, in_use
+
+
+def _parse_time(timestamp: Optional[str]) -> Optional[datetime]:
+    """Parse an RFC 3339 timestamp from status."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
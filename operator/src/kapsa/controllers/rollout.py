@@ -0,0 +1,341 @@
+"""Rollout tracker: follows Environment Deployments and reports their progress."""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple, cast
+
+import kopf
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa import metrics, tracing
+from kapsa.config import get_settings
+from kapsa.controllers.environment import deploy_environment
+from kapsa.events import get_event_recorder
+from kapsa.logging import get_logger
+from kapsa.status import fetch_status, get_status_manager
+from kapsa.utils.deployment import (
+    DEPLOY_STARTED_ANNOTATION,
+    MANAGED_LABELS,
+    get_replica_set_progress,
+    get_rollout_state,
+)
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+# Last rollout state seen per Deployment: (generation, state, reason, ready replicas)
+_observed: Dict[Tuple[str, str], Tuple[int, str, str, int]] = {}
+
+# Image whose failed rollout is being rolled back, per Deployment
+_rolled_back: Dict[Tuple[str, str], str] = {}
+
+# When the tracker first saw each Deployment's current generation (Unix time)
+_generation_seen: Dict[Tuple[str, str], float] = {}
+
+# Progress of the newest ReplicaSet seen per Deployment
+_replica_sets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+
+@kopf.on.event(
+    "apps",
+    "v1",
+    "deployments",
+    labels=MANAGED_LABELS,
+)
+async def deployment_event(
+    type: str,
+    body: kopf.Body,
+    name: str,
+    namespace: str,
+    **kwargs: object,
+) -> None:
+    """Mirror the rollout state of an Environment's Deployment into its status."""
+    key = (namespace, name)
+    if type == "DELETED":
+        _observed.pop(key, None)
+        _rolled_back.pop(key, None)
+        _generation_seen.pop(key, None)
+        _replica_sets.pop(key, None)
+        return
+
+    owner = _owner(body, "Environment", "kapsa-project.io/")
+    if owner is None:
+        return
+    env_name, env_uid = owner["name"], owner.get("uid")
+
+    rollout = get_rollout_state(body)
+    generation = body.get("metadata", {}).get("generation", 0)
+    marker = (generation, rollout.state, rollout.reason, rollout.ready_replicas)
+    previous = _observed.get(key)
+    if previous == marker:
+        return
+    _observed[key] = marker
+    if previous is None or previous[0] != generation:
+        _generation_seen[key] = time.time()
+
+    # Rollouts that finished before the tracker saw them (e.g. before an
+    # operator restart) are reported but not counted or rolled back.
+    finished = rollout.state in ("Ready", "Failed")
+    newly_finished = (
+        finished
+        and previous is not None
+        and (previous[0] != generation or previous[1] != rollout.state)
+    )
+
+    image = _container_image(body)
+    annotations = body.get("metadata", {}).get("annotations") or {}
+    started_at = annotations.get(DEPLOY_STARTED_ANNOTATION)
+    traceparent = annotations.get(tracing.TRACEPARENT_ANNOTATION)
+
+    fields: Dict[str, Any] = {}
+    summary: Dict[str, Any] = {
+        "state": rollout.state,
+        "reason": rollout.reason,
+        "message": rollout.message,
+        "image": image,
+        "generation": generation,
+        "replicas": rollout.replicas,
+        "updatedReplicas": rollout.updated_replicas,
+        "readyReplicas": rollout.ready_replicas,
+        "startedAt": started_at,
+    }
+    now = datetime.now(timezone.utc)
+    if newly_finished:
+        summary["completedAt"] = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        tracing.record_span(
+            "environment.rollout",
+            _generation_seen.get(key),
+            now.timestamp(),
+            parent=traceparent,
+            error=rollout.message if rollout.state == "Failed" else None,
+            environment=env_name,
+            namespace=namespace,
+            image=image,
+            replicas=rollout.replicas,
+        )
+
+    if rollout.state == "Ready":
+        summary["lastReadyImage"] = image
+        failed_image = _rolled_back.pop(key, None)
+        if newly_finished:
+            summary["rolledBackFrom"] = failed_image
+            duration = _seconds_since(started_at, now)
+            summary["durationSeconds"] = None
+            if duration is not None:
+                summary["durationSeconds"] = round(duration, 1)
+                metrics.environment_deploy_duration.observe(duration)
+            metrics.environment_rollout_total.labels(result="ready").inc()
+            logger.info(
+                "rollout_complete",
+                environment=env_name,
+                namespace=namespace,
+                image=image,
+                duration=summary["durationSeconds"],
+            )
+            if not failed_image:
+                get_event_recorder().record(
+                    "Environment",
+                    env_name,
+                    namespace,
+                    "RolloutComplete",
+                    f"Rolled out {image}",
+                    uid=env_uid,
+                )
+        fields["phase"] = "Running"
+        ready = {"status": "True", "reason": "RolloutComplete", "message": rollout.message}
+        if failed_image:
+            ready.update(reason="RolledBack", message=f"Rolled back from {failed_image}")
+
+    elif rollout.state == "Failed":
+        fields["phase"] = "Failed"
+        ready = {"status": "False", "reason": rollout.reason, "message": rollout.message}
+        if newly_finished:
+            logger.warning(
+                "rollout_failed",
+                environment=env_name,
+                namespace=namespace,
+                image=image,
+                reason=rollout.reason,
+            )
+            get_event_recorder().record(
+                "Environment",
+                env_name,
+                namespace,
+                "RolloutFailed",
+                f"Rollout of {image} failed: {rollout.message}",
+                type="Warning",
+                uid=env_uid,
+            )
+            restored = None
+            if get_settings().rollout_auto_rollback:
+                with tracing.child_span(
+                    "environment.rollback", parent=traceparent, environment=env_name
+                ):
+                    restored = await rollback_environment(env_name, namespace, image)
+            if restored:
+                _rolled_back[key] = image or ""
+                # Persisted so the build tracker does not redeploy it after a restart
+                summary["rolledBackFrom"] = image
+                fields["image"] = restored
+                ready = {
+                    "status": "False",
+                    "reason": "RolledBack",
+                    "message": f"{rollout.message}; rolled back to {restored}",
+                }
+                metrics.environment_rollout_total.labels(result="rolled_back").inc()
+                get_event_recorder().record(
+                    "Environment",
+                    env_name,
+                    namespace,
+                    "RolledBack",
+                    f"Rolling back from {image} to {restored}",
+                    type="Warning",
+                    uid=env_uid,
+                )
+            else:
+                metrics.environment_rollout_total.labels(result="failed").inc()
+
+    else:
+        # Clear the previous rollout's outcome (null removes it in a merge patch)
+        summary.update(completedAt=None, durationSeconds=None)
+        ready = {"status": "False", "reason": "RollingOut", "message": rollout.message}
+        if key in _rolled_back:
+            ready.update(
+                reason="RolledBack",
+                message=f"Rolling back after the rollout of {_rolled_back[key]} failed",
+            )
+
+    status = await fetch_status("environments", env_name, namespace)
+    if status is None:
+        return
+    get_status_manager().update(
+        "environments",
+        env_name,
+        namespace,
+        status,
+        conditions=[{"type": "Ready", **ready}],
+        rollout=summary,
+        **fields,
+    )
+
+
+@kopf.on.event(
+    "apps",
+    "v1",
+    "replicasets",
+    labels=MANAGED_LABELS,
+)
+async def replica_set_event(
+    type: str,
+    body: kopf.Body,
+    namespace: str,
+    labels: kopf.Labels,
+    **kwargs: object,
+) -> None:
+    """Mirror the progress of a Deployment's newest ReplicaSet into the Environment status."""
+    owner = _owner(body, "Deployment", "apps/")
+    env_name = labels.get("kapsa-project.io/environment")
+    if type == "DELETED" or owner is None or not env_name:
+        return
+
+    key = (namespace, owner["name"])
+    progress = get_replica_set_progress(body)
+    previous = _replica_sets.get(key, {})
+    # Old ReplicaSets only scale down; the Deployment's totals cover them
+    if progress["revision"] < previous.get("revision", 0) or progress == previous:
+        return
+    _replica_sets[key] = progress
+
+    if progress["failure"] and progress["failure"] != previous.get("failure"):
+        logger.warning(
+            "replica_set_failure",
+            environment=env_name,
+            namespace=namespace,
+            replica_set=progress["name"],
+            message=progress["failure"],
+        )
+
+    status = await fetch_status("environments", env_name, namespace)
+    if status is None:
+        return
+    get_status_manager().update(
+        "environments", env_name, namespace, status, rollout={"replicaSet": progress}
+    )
+
+
+async def rollback_environment(
+    env_name: str, namespace: str, failed_image: Optional[str]
+) -> Optional[str]:
+    """
+    Redeploy the last image that rolled out successfully.
+
+    Args:
+        env_name: Environment name
+        namespace: Environment namespace
+        failed_image: Image whose rollout failed
+
+    Returns:
+        The restored image, or None if there was nothing to roll back to
+    """
+    api = client.CustomObjectsApi()
+    try:
+        env = cast(
+            Dict[str, Any],
+            await run_sync(
+                api.get_namespaced_custom_object,
+                "kapsa-project.io",
+                "v1alpha1",
+                namespace,
+                "environments",
+                env_name,
+            ),
+        )
+    except ApiException as e:
+        if e.status == 404:
+            return None
+        raise
+
+    last_ready = env.get("status", {}).get("rollout", {}).get("lastReadyImage")
+    if not last_ready or last_ready == failed_image:
+        return None
+
+    await deploy_environment(env_name, namespace, env.get("spec", {}), last_ready, env["metadata"])
+    logger.info(
+        "rollout_rolled_back",
+        environment=env_name,
+        namespace=namespace,
+        failed_image=failed_image,
+        image=last_ready,
+    )
+    return str(last_ready)
+
+
+def _owner(body: kopf.Body, kind: str, api_group: str) -> Optional[Dict[str, Any]]:
+    """Owner reference of the given kind (``api_group`` ends with "/"), if any."""
+    for ref in body.get("metadata", {}).get("ownerReferences") or []:
+        if ref.get("kind") == kind and ref.get("apiVersion", "").startswith(api_group):
+            owner: Dict[str, Any] = ref
+            return owner
+    return None
+
+
+def _container_image(body: kopf.Body) -> Optional[str]:
+    """Image of the Deployment's app container."""
+    containers = body.get("spec", {}).get("template", {}).get("spec", {}).get("containers", [])
+    for container in containers:
+        if container.get("name") == "app":
+            image: str = container.get("image")
+            return image
+    return None
+
+
+def _seconds_since(timestamp: Optional[str], now: datetime) -> Optional[float]:
+    """Seconds from an RFC 3339 timestamp to ``now``."""
+    if not timestamp:
+        return None
+    try:
+        started = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max((now - started).total_seconds(), 0.0)
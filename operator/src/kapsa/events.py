@@ -0,0 +1,286 @@
+"""Aggregated, rate-limited Kubernetes Events for Kapsa objects."""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set, Tuple
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+API_VERSION = "kapsa-project.io/v1alpha1"
+COMPONENT = "kapsa-operator"
+
+# Event series remembered for aggregation; the least recently used are forgotten
+MAX_SERIES = 4096
+
+# Objects with throttling state before idle (refilled) buckets are dropped
+MAX_BUCKETS = 4096
+
+ObjectRef = Tuple[str, Optional[str], str]  # kind, namespace, name
+SeriesKey = Tuple[str, Optional[str], str, str, str]  # kind, namespace, name, type, reason
+
+
+@dataclass
+class _Series:
+    """Occurrences of one event (object, type, reason) and the Event recording them."""
+
+    uid: Optional[str]
+    message: str
+    count: int = 0
+    first: str = ""
+    last: str = ""
+    event_name: Optional[str] = None
+    written_count: int = 0
+    written_at: float = float("-inf")
+
+
+@dataclass
+class _TokenBucket:
+    """Allows ``burst`` writes at once and ``rate`` writes per second after that."""
+
+    burst: float
+    rate: float
+    tokens: float = field(init=False)
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        self.tokens = self.burst
+
+    def take(self) -> float:
+        """Take a token; return 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def idle(self, now: float) -> bool:
+        """Whether the bucket has refilled, so a new one would behave the same."""
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class EventRecorder:
+    """
+    Shared writer of Kubernetes Events for Kapsa objects.
+
+    Controllers record only meaningful transitions (build finished, rollout
+    failed, ...). Repeats of an event for the same object, type and reason
+    are aggregated into one Event whose ``count`` and ``lastTimestamp`` are
+    patched, as the kubelet's event correlator does, and a series is
+    written at most once per ``window`` seconds, so a flapping condition
+    costs one write per window however often it repeats. Writes are also
+    throttled per object with a token bucket (``burst`` writes, then
+    ``per_minute``); a throttled write is postponed, not lost, since the
+    series keeps counting. Buckets that have refilled are dropped once more
+    than ``MAX_BUCKETS`` objects have one.
+
+    Events of cluster-scoped objects (Registries) are written to the
+    operator's namespace.
+    """
+
+    def __init__(self, window: float = 10.0, burst: int = 5, per_minute: float = 1.0) -> None:
+        self.window = window
+        self.burst = burst
+        self.per_minute = per_minute
+        self._series: "OrderedDict[SeriesKey, _Series]" = OrderedDict()
+        self._buckets: Dict[ObjectRef, _TokenBucket] = {}
+        self._flushes: Dict[SeriesKey, "asyncio.Task[None]"] = {}
+        self._instance = os.environ.get("HOSTNAME", COMPONENT)
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        namespace: Optional[str],
+        reason: str,
+        message: str,
+        type: str = "Normal",
+        uid: Optional[str] = None,
+    ) -> None:
+        """
+        Record an event for a Kapsa object; the write happens in the background.
+
+        Args:
+            kind: Kapsa kind (e.g. "Project")
+            name: Object name
+            namespace: Object namespace, or None for cluster-scoped kinds
+            reason: Short CamelCase reason (e.g. "BuildFinished")
+            message: Human-readable message; the latest one is kept
+            type: "Normal" or "Warning"
+            uid: Object UID, so ``kubectl describe`` can match the Event
+        """
+        if not get_settings().events_enabled:
+            return
+
+        key: SeriesKey = (kind, namespace, name, type, reason)
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(uid=uid, message=message, first=now)
+            self._evict()
+        self._series.move_to_end(key)
+        series.count += 1
+        series.last = now
+        series.message = message
+        series.uid = uid or series.uid
+
+        if key in self._flushes:
+            metrics.events_total.labels(reason=reason, result="aggregated").inc()
+            return
+        delay = max(series.written_at + self.window - time.monotonic(), 0.0)
+        self._flushes[key] = asyncio.ensure_future(self._flush_later(key, delay))
+
+    def reset(self) -> None:
+        """Start every object over with a full token bucket (e.g. after the rate changed)."""
+        self._buckets.clear()
+
+    def forget(self, kind: str, name: str, namespace: Optional[str]) -> None:
+        """Drop series and throttling state of a deleted object."""
+        self._buckets.pop((kind, namespace, name), None)
+        for key in [k for k in self._series if k[:3] == (kind, namespace, name)]:
+            del self._series[key]
+            task = self._flushes.pop(key, None)
+            if task is not None:
+                task.cancel()
+
+    async def flush_all(self) -> None:
+        """Write every pending event now (used on shutdown)."""
+        pending = list(self._flushes)
+        for task in self._flushes.values():
+            task.cancel()
+        self._flushes.clear()
+        await asyncio.gather(*(self._write(key) for key in pending))
+
+    def _evict(self) -> None:
+        while len(self._series) > MAX_SERIES:
+            key = next(k for k in self._series)
+            del self._series[key]
+            task = self._flushes.pop(key, None)
+            if task is not None:
+                task.cancel()
+
+    def _drop_idle_buckets(self) -> None:
+        now = time.monotonic()
+        for ref in [r for r, bucket in self._buckets.items() if bucket.idle(now)]:
+            del self._buckets[ref]
+
+    async def _flush_later(self, key: SeriesKey, delay: float) -> None:
+        bucket = self._buckets.get(key[:3])
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._drop_idle_buckets()
+            bucket = self._buckets[key[:3]] = _TokenBucket(self.burst, self.per_minute / 60)
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            while (wait := bucket.take()) > 0:
+                metrics.events_total.labels(reason=key[4], result="throttled").inc()
+                await asyncio.sleep(wait)
+        finally:
+            if self._flushes.get(key) is asyncio.current_task():
+                del self._flushes[key]
+        await self._write(key)
+
+    async def _write(self, key: SeriesKey) -> None:
+        series = self._series.get(key)
+        if series is None or series.count == series.written_count:
+            return
+
+        kind, namespace, name, type, reason = key
+        event_namespace = namespace or get_settings().namespace
+        count = series.count
+        series.written_at = time.monotonic()
+        v1 = client.CoreV1Api()
+        try:
+            if series.event_name is not None:
+                try:
+                    await run_sync(
+                        v1.patch_namespaced_event,
+                        series.event_name,
+                        event_namespace,
+                        {"count": count, "lastTimestamp": series.last, "message": series.message},
+                    )
+                    series.written_count = count
+                    metrics.events_total.labels(reason=reason, result="patched").inc()
+                    return
+                except ApiException as e:
+                    if e.status != 404:  # Expired; start a new Event
+                        raise
+
+            event_name = f"{name}.{time.time_ns():x}"
+            body = {
+                "metadata": {"name": event_name, "namespace": event_namespace},
+                "involvedObject": {
+                    "apiVersion": API_VERSION,
+                    "kind": kind,
+                    "name": name,
+                    "namespace": namespace,
+                    "uid": series.uid,
+                },
+                "type": type,
+                "reason": reason,
+                "message": series.message,
+                "count": count - series.written_count,
+                "firstTimestamp": series.first,
+                "lastTimestamp": series.last,
+                "source": {"component": COMPONENT},
+                "reportingComponent": COMPONENT,
+                "reportingInstance": self._instance,
+            }
+            await run_sync(v1.create_namespaced_event, event_namespace, body)
+            series.event_name = event_name
+            series.written_count = count
+            metrics.events_total.labels(reason=reason, result="created").inc()
+        except ApiException as e:
+            logger.warning(
+                "event_post_failed",
+                kind=kind,
+                name=name,
+                namespace=namespace,
+                reason=reason,
+                error=str(e),
+            )
+            metrics.events_total.labels(reason=reason, result="failed").inc()
+
+
+_recorder: Optional[EventRecorder] = None
+
+
+def get_event_recorder() -> EventRecorder:
+    """Return the event recorder shared by all controllers."""
+    global _recorder
+    if _recorder is None:
+        settings = get_settings()
+        _recorder = EventRecorder(
+            window=settings.events_aggregation_window,
+            burst=settings.events_burst,
+            per_minute=settings.events_per_minute,
+        )
+    return _recorder
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    if _recorder is None:
+        return
+    _recorder.window = settings.events_aggregation_window
+    if changed & {"events_burst", "events_per_minute"}:
+        # Objects start over with a full bucket at the new rate
+        _recorder.burst = settings.events_burst
+        _recorder.per_minute = settings.events_per_minute
+        _recorder.reset()
+
+
+subscribe(_on_settings_changed)
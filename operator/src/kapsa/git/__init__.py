@@ -0,0 +1,13 @@
+"""Git repository access through a shared cache of bare mirrors."""
+
+from kapsa.git.credentials import credentials_env
+from kapsa.git.mirror import CommitInfo, GitError, Mirror, MirrorCache, get_mirror_cache
+
+__all__ = [
+    "CommitInfo",
+    "GitError",
+    "Mirror",
+    "MirrorCache",
+    "credentials_env",
+    "get_mirror_cache",
+]
@@ -0,0 +1,78 @@
+"""Git credentials from the Secret referenced by a Project's repository spec."""
+
+import base64
+from typing import Any, Dict, Mapping, Optional
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa.logging import get_logger
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+
+async def credentials_env(
+    credentials: Optional[Mapping[str, Any]], namespace: str
+) -> Dict[str, str]:
+    """
+    Build the git environment that authenticates HTTP(S) fetches.
+
+    The Secret may hold ``username`` and ``password`` keys, or a ``token``
+    (sent as the password of user ``git``, which GitHub, GitLab and Gitea
+    accept). Credentials are passed to git as an ``http.extraHeader`` through
+    ``GIT_CONFIG_*`` variables, so they never appear on a command line or in
+    the mirror's config on disk.
+
+    The Secret is always read from the Project's namespace. A
+    ``secretRef.namespace`` (rejected by the CRD, but possibly set on
+    Projects created before) is ignored, so a Project cannot make the
+    operator read Secrets from namespaces its owner has no access to.
+
+    Args:
+        credentials: Project ``spec.repository.credentials``
+        namespace: Project namespace, where the Secret lives
+
+    Returns:
+        Environment variables for git (empty without credentials)
+    """
+    secret_ref = (credentials or {}).get("secretRef") or {}
+    secret_name = secret_ref.get("name")
+    if not secret_name:
+        return {}
+
+    if secret_ref.get("namespace") not in (None, namespace):
+        logger.warning(
+            "git_secret_namespace_ignored",
+            secret=secret_name,
+            namespace=namespace,
+            requested_namespace=secret_ref["namespace"],
+        )
+
+    v1 = client.CoreV1Api()
+    try:
+        secret = await run_sync(v1.read_namespaced_secret, secret_name, namespace)
+    except ApiException as e:
+        if e.status == 404:
+            logger.warning(
+                "git_secret_not_found",
+                secret=secret_name,
+                namespace=namespace,
+            )
+            return {}
+        raise
+
+    data = {k: base64.b64decode(v).decode() for k, v in (secret.data or {}).items()}
+    if "token" in data:
+        username, password = data.get("username", "git"), data["token"]
+    elif "password" in data:
+        username, password = data.get("username", "git"), data["password"]
+    else:
+        return {}
+
+    basic = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {basic}",
+    }
@@ -0,0 +1,382 @@
+"""Shared on-disk cache of bare git mirrors, one per repository URL."""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Set
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+# Refs kept in a mirror; pull request and other provider refs are skipped
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class GitError(Exception):
+    """Raised when a git command fails or the mirror cache cannot be used."""
+
+
+@dataclass(frozen=True)
+class CommitInfo:
+    """Metadata of one commit."""
+
+    sha: str
+    author: str
+    email: str
+    committed_at: str  # ISO 8601
+    subject: str
+
+
+class Mirror:
+    """
+    A bare mirror of one repository.
+
+    Obtained from ``MirrorCache.open``, which holds the repository's lock for
+    as long as the mirror is in use. Mirrors are partial clones by default
+    (``blob:none``): commits and trees are fetched, file contents only when
+    read, so ref resolution, commit metadata, changed paths and file listings
+    cost no blob downloads.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        path: Path,
+        filter_spec: str = "",
+        depth: int = 0,
+        timeout: float = 120.0,
+    ) -> None:
+        self.url = url
+        self.path = path
+        self.filter_spec = filter_spec
+        self.depth = depth
+        self.timeout = timeout
+
+    @property
+    def exists(self) -> bool:
+        """Whether the mirror has been cloned."""
+        return (self.path / "HEAD").exists()
+
+    async def fetch(self, env: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Clone the repository, or fetch what changed since the last fetch.
+
+        Args:
+            env: Extra environment for git, e.g. credentials from
+                ``credentials_env``; never written to disk
+
+        Raises:
+            GitError: If the remote cannot be reached or the clone fails
+        """
+        started = time.monotonic()
+        options = []
+        if self.filter_spec:
+            options.append(f"--filter={self.filter_spec}")
+        if self.depth:
+            options.append(f"--depth={self.depth}")
+
+        if self.exists:
+            kind = "fetch"
+            await self._git("fetch", "--prune", "--no-tags", *options, "origin", env=env)
+        else:
+            kind = "clone"
+            await self._clone(options, env)
+        metrics.git_mirror_fetch_duration.labels(kind=kind).observe(time.monotonic() - started)
+
+    async def resolve(self, ref: str) -> Optional[str]:
+        """Return the commit a branch, tag or commit name points to, or None."""
+        for candidate in (f"refs/heads/{ref}", f"refs/tags/{ref}", ref):
+            try:
+                return await self._git(
+                    "rev-parse", "--verify", "--quiet", f"{candidate}^{{commit}}"
+                )
+            except GitError:
+                continue
+        return None
+
+    async def has_commit(self, sha: str) -> bool:
+        """Whether a commit is in the mirror (not after a force push, or beyond a shallow depth)."""
+        try:
+            await self._git("cat-file", "-e", f"{sha}^{{commit}}")
+        except GitError:
+            return False
+        return True
+
+    async def commit_info(self, sha: str) -> CommitInfo:
+        """Return author, date and subject of a commit."""
+        output = await self._git("log", "-1", "--format=%H%x00%an%x00%ae%x00%cI%x00%s", sha)
+        fields = output.split("\0")
+        return CommitInfo(*fields[:5])
+
+    async def changed_paths(self, old: str, new: str) -> Optional[List[str]]:
+        """
+        Return the paths changed between two commits.
+
+        Returns:
+            Changed paths, or None if ``old`` is not in the mirror
+        """
+        if not await self.has_commit(old):
+            return None
+        # Without rename detection the diff compares trees only; no blobs are fetched
+        output = await self._git("diff", "--name-only", "--no-renames", old, new)
+        return [line for line in output.splitlines() if line]
+
+    async def list_files(self, sha: str, directory: str = "") -> List[str]:
+        """Return the names of the entries in a directory of a commit."""
+        treeish = f"{sha}:{directory.strip('/')}" if directory.strip("./") else sha
+        try:
+            output = await self._git("ls-tree", "--name-only", treeish)
+        except GitError:
+            return []
+        return output.splitlines()
+
+    async def detect_build_strategy(
+        self, sha: str, context: str = ".", dockerfile: str = "Dockerfile"
+    ) -> str:
+        """
+        Tell whether a commit builds from a Dockerfile or with buildpacks.
+
+        Args:
+            sha: Commit to inspect
+            context: Build context directory
+            dockerfile: Dockerfile path, relative to the context
+
+        Returns:
+            ``dockerfile`` if the Dockerfile exists, otherwise ``buildpack``
+        """
+        path = os.path.normpath(os.path.join(context, dockerfile))
+        directory, name = os.path.split(path)
+        files = await self.list_files(sha, directory)
+        return "dockerfile" if name in files else "buildpack"
+
+    async def _clone(self, options: List[str], env: Optional[Mapping[str, str]]) -> None:
+        """Clone into a temporary directory and move it into place when complete."""
+        tmp = self.path.with_name(f".tmp-{self.path.name}-{os.getpid()}")
+        await run_sync(shutil.rmtree, tmp, True)
+        try:
+            await self._run(
+                "clone", "--bare", "--no-tags", *options, "--", self.url, str(tmp), env=env
+            )
+            # A bare clone has no fetch refspec; mirror branches and tags
+            for refspec in MIRROR_REFSPECS:
+                await self._run("config", "--add", "remote.origin.fetch", refspec, git_dir=tmp)
+            await self._run(
+                "fetch", "--prune", "--no-tags", *options, "origin", env=env, git_dir=tmp
+            )
+            await run_sync(shutil.rmtree, self.path, True)  # Anything left without a HEAD
+            await run_sync(os.replace, tmp, self.path)
+        except (GitError, OSError) as e:
+            await run_sync(shutil.rmtree, tmp, True)
+            if isinstance(e, OSError):
+                raise GitError(f"cannot create mirror of {self.url}: {e}") from e
+            raise
+
+    async def _git(self, *args: str, env: Optional[Mapping[str, str]] = None) -> str:
+        output = await self._run(*args, env=env)
+        return output.decode(errors="replace").strip()
+
+    async def _run(
+        self,
+        *args: str,
+        env: Optional[Mapping[str, str]] = None,
+        git_dir: Optional[Path] = None,
+    ) -> bytes:
+        """Run a git command in the mirror (or ``git_dir``) and return its stdout."""
+        command = ["git"]
+        if args[0] != "clone":
+            command += ["--git-dir", str(git_dir or self.path)]
+        command += list(args)
+        process_env = {
+            **os.environ,
+            "GIT_TERMINAL_PROMPT": "0",  # Fail instead of asking for credentials
+            "GIT_ASKPASS": "true",
+            **(env or {}),
+        }
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=process_env,
+            )
+        except OSError as e:
+            raise GitError(f"cannot run git: {e}") from e
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise GitError(f"git {args[0]} timed out after {self.timeout}s") from None
+
+        if process.returncode != 0:
+            lines = stderr.decode(errors="replace").strip().splitlines()
+            errors = [line for line in lines if line.startswith(("fatal:", "error:"))]
+            message = (errors or lines or [f"exit status {process.returncode}"])[0]
+            raise GitError(f"git {args[0]} failed: {message}")
+        return stdout
+
+
+class MirrorCache:
+    """
+    Bare mirrors of git repositories under one directory, shared by all Projects.
+
+    Each repository URL maps to one mirror, so Projects building from the
+    same repository share its objects and fetches. Access to a mirror is
+    serialized with a per-URL lock. After each use the mirror's size is
+    measured; when the cache exceeds ``budget_bytes``, the least recently
+    used mirrors not in use are deleted. Last use is kept as the mirror
+    directory's mtime, so the order survives restarts when the directory is
+    on a persistent volume.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        budget_bytes: int,
+        filter_spec: str = "blob:none",
+        depth: int = 0,
+        timeout: float = 120.0,
+    ) -> None:
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.filter_spec = filter_spec
+        self.depth = depth
+        self.timeout = timeout
+        self._locks: Dict[Path, asyncio.Lock] = {}
+        self._sizes: Optional[Dict[Path, int]] = None
+
+    def path_for(self, url: str) -> Path:
+        """Directory of the mirror for a repository URL."""
+        digest = hashlib.sha256(url.strip().rstrip("/").encode()).hexdigest()[:24]
+        return self.root / f"{digest}.git"
+
+    @asynccontextmanager
+    async def open(self, url: str) -> AsyncIterator[Mirror]:
+        """
+        Lock a repository's mirror for exclusive use.
+
+        The mirror may not be cloned yet; call ``Mirror.fetch`` first.
+
+        Raises:
+            GitError: If the cache directory cannot be used
+        """
+        if self._sizes is None:
+            self._sizes = await self._scan()
+
+        path = self.path_for(url)
+        lock = self._locks.setdefault(path, asyncio.Lock())
+        async with lock:
+            mirror = Mirror(url, path, self.filter_spec, self.depth, self.timeout)
+            try:
+                yield mirror
+            finally:
+                if mirror.exists:
+                    self._sizes[path] = await run_sync(_touch_and_measure, path)
+        await self._enforce_budget(keep=path)
+
+    def usage(self) -> int:
+        """Bytes used by all mirrors, as of their last use."""
+        return sum((self._sizes or {}).values())
+
+    async def _scan(self) -> Dict[Path, int]:
+        """Measure existing mirrors and remove interrupted clones."""
+        try:
+            await run_sync(self.root.mkdir, parents=True, exist_ok=True)
+            sizes = await run_sync(_scan_root, self.root)
+        except OSError as e:
+            raise GitError(f"cannot use git mirror directory {self.root}: {e}") from e
+        metrics.git_mirror_bytes.set(sum(sizes.values()))
+        return sizes
+
+    async def _enforce_budget(self, keep: Path) -> None:
+        """Delete least recently used mirrors, other than ``keep``, until the cache fits."""
+        assert self._sizes is not None
+        if self.usage() > self.budget_bytes:
+            for path in sorted(self._sizes, key=_mtime):
+                if self.usage() <= self.budget_bytes:
+                    break
+                lock = self._locks.setdefault(path, asyncio.Lock())
+                if path == keep or lock.locked():
+                    continue
+                async with lock:
+                    size = self._sizes.pop(path, 0)
+                    await run_sync(shutil.rmtree, path, True)
+                metrics.git_mirror_evictions_total.inc()
+                logger.info("git_mirror_evicted", mirror=path.name, bytes=size)
+        metrics.git_mirror_bytes.set(self.usage())
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _touch_and_measure(path: Path) -> int:
+    """Record a mirror's use and return its size."""
+    os.utime(path)
+    return _dir_size(path)
+
+
+def _scan_root(root: Path) -> Dict[Path, int]:
+    sizes = {}
+    for entry in root.iterdir():
+        if entry.name.startswith(".tmp-"):
+            shutil.rmtree(entry, ignore_errors=True)
+        elif entry.name.endswith(".git") and entry.is_dir():
+            sizes[entry] = _dir_size(entry)
+    return sizes
+
+
+_cache: Optional[MirrorCache] = None
+
+
+def get_mirror_cache() -> MirrorCache:
+    """Return the process-wide git mirror cache."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = MirrorCache(
+            root=Path(settings.git_mirror_dir),
+            budget_bytes=settings.git_mirror_budget_mb * 1024 * 1024,
+            filter_spec=settings.git_mirror_filter,
+            depth=settings.git_mirror_depth,
+            timeout=settings.git_timeout,
+        )
+    return _cache
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    if _cache is None:
+        return
+    # Applies from the next use; filter and depth from the next fetch
+    _cache.budget_bytes = settings.git_mirror_budget_mb * 1024 * 1024
+    _cache.filter_spec = settings.git_mirror_filter
+    _cache.depth = settings.git_mirror_depth
+    _cache.timeout = settings.git_timeout
+
+
+subscribe(_on_settings_changed)
@@ -1,57 +1,280 @@
 """Structured logging configuration for Kapsa operator."""
 
+import atexit
 import logging
+import queue
 import sys
-from typing import Any
+import threading
+import time
+from typing import IO, Any, Callable, Dict, List, Optional, Set, Union
 
+import orjson
 import structlog
 
-from kapsa.config import get_settings
+from kapsa.config import Settings, get_settings, subscribe
+
+_writer: Optional["QueueWriter"] = None
+_level_filter: Optional["LevelFilter"] = None
+_rate_limiter: Optional["EventRateLimiter"] = None
+
+
+class QueueWriter:
+    """
+    Hands log lines to a background thread through a bounded queue.
+
+    Logging call sites only serialize and enqueue; the blocking write to the
+    output stream happens off the event loop, in batches. When the queue is
+    full, lines are dropped rather than stalling the caller, and the number
+    of dropped lines is reported once there is room again.
+    """
+
+    def __init__(self, stream: IO[bytes], max_size: int = 10000) -> None:
+        self._stream = stream
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_size)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="kapsa-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Union[str, bytes]) -> None:
+        """Queue one log line (a trailing newline is added if missing)."""
+        line = message.encode() if isinstance(message, str) else message
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def flush(self) -> None:
+        """Lines are flushed by the writer thread; present for file-like callers."""
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain the queue and stop the writer thread."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[bytes] = []
+            stop = item is None
+            if item is not None:
+                batch.append(item)
+
+            while not stop and len(batch) < 512:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                batch.append(orjson.dumps({"event": "log_lines_dropped", "count": dropped}) + b"\n")
+
+            if batch:
+                try:
+                    self._stream.write(b"".join(batch))
+                    self._stream.flush()
+                except (OSError, ValueError):
+                    pass
+
+            if stop:
+                return
+
+
+class QueueLogger:
+    """structlog logger that writes rendered lines to a ``QueueWriter``."""
+
+    def __init__(self, writer: QueueWriter) -> None:
+        self._writer = writer
+
+    def msg(self, message: Union[str, bytes]) -> None:
+        self._writer.write(message)
+
+    log = debug = info = warn = warning = error = critical = exception = failure = fatal = msg
+
+
+class QueueLoggerFactory:
+    """Creates ``QueueLogger`` instances sharing one writer."""
+
+    def __init__(self, writer: QueueWriter) -> None:
+        self._writer = writer
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self._writer)
+
+
+class EventRateLimiter:
+    """
+    structlog processor that rate-limits log lines per event name.
+
+    Each configured event name gets a token bucket refilled at ``rate``
+    lines per second (burst of one second's worth). Lines beyond the budget
+    are dropped; the next line that gets through carries ``sampled_out``
+    with the number of lines suppressed since the previous one.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        self.rates = dict(rates)
+        self._tokens: Dict[str, float] = {}
+        self._updated: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        event = event_dict.get("event")
+        if not isinstance(event, str):
+            return event_dict
+        rate = self.rates.get(event)
+        if rate is None:
+            return event_dict
+
+        now = time.monotonic()
+        burst = max(rate, 1.0)
+        tokens = self._tokens.get(event, burst)
+        tokens = min(burst, tokens + (now - self._updated.get(event, now)) * rate)
+        self._updated[event] = now
+
+        if tokens < 1.0:
+            self._tokens[event] = tokens
+            self._suppressed[event] = self._suppressed.get(event, 0) + 1
+            raise structlog.DropEvent
+
+        self._tokens[event] = tokens - 1.0
+        suppressed = self._suppressed.pop(event, 0)
+        if suppressed:
+            event_dict["sampled_out"] = suppressed
+        return event_dict
+
+
+class LevelFilter:
+    """
+    structlog processor that drops lines below a level that can change at runtime.
+
+    Used instead of a level-filtering logger class when settings can be
+    reloaded, since loggers cache their class on first use.
+    """
+
+    def __init__(self, level: int) -> None:
+        self.level = level
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if _LEVELS.get(method_name, logging.INFO) < self.level:
+            raise structlog.DropEvent
+        return event_dict
+
+
+_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "warn": logging.WARNING,
+    "error": logging.ERROR,
+    "exception": logging.ERROR,
+    "critical": logging.CRITICAL,
+    "fatal": logging.CRITICAL,
+}
+
+
+def _orjson_dumps(obj: Any, default: Any = None, **_: Any) -> bytes:
+    return orjson.dumps(obj, default=default)
+
+
+def _orjson_dumps_text(obj: Any, default: Any = None, **_: Any) -> str:
+    return orjson.dumps(obj, default=default).decode()
 
 
 def configure_logging() -> None:
     """Configure structured logging for the operator."""
+    global _writer, _level_filter, _rate_limiter
     settings = get_settings()
 
     # Convert log level string to numeric level
     log_level_str = settings.log_level.upper()
     log_level = getattr(logging, log_level_str, logging.INFO)
 
-    # Determine processors based on log format
+    _rate_limiter = EventRateLimiter(settings.log_rate_limits)
+    processors: List[Any] = [
+        structlog.contextvars.merge_contextvars,
+        _rate_limiter,
+        structlog.processors.add_log_level,
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+    if settings.tracing_enabled:
+        # Imported here: kapsa.tracing logs through this module
+        from kapsa.tracing import add_trace_context
+
+        processors.insert(1, add_trace_context)
+
+    stream: Any = sys.stdout
+    logger_factory: Any = structlog.PrintLoggerFactory(file=sys.stdout)
+    binary_stdout = getattr(sys.stdout, "buffer", None)
+    if settings.log_async and binary_stdout is not None:
+        if _writer is None:
+            _writer = QueueWriter(binary_stdout, max_size=settings.log_queue_size)
+            atexit.register(_writer.close)
+        stream = _writer
+        logger_factory = QueueLoggerFactory(_writer)
+    elif settings.log_format == "json" and binary_stdout is not None:
+        logger_factory = structlog.BytesLoggerFactory(file=binary_stdout)
+
+    # Determine renderer based on log format; PrintLogger needs text
     if settings.log_format == "json":
-        processors = [
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer(),
-        ]
+        serializer: Callable[..., Union[str, bytes]] = _orjson_dumps
+        if binary_stdout is None:
+            serializer = _orjson_dumps_text
+        processors.append(structlog.processors.JSONRenderer(serializer=serializer))
     else:
-        processors = [
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer(),
-        ]
+        processors.append(structlog.dev.ConsoleRenderer())
+
+    # With live settings the level is checked per line so it can change;
+    # otherwise the logger class discards lines below it without any work.
+    wrapper_level = log_level
+    if settings.config_map:
+        _level_filter = LevelFilter(log_level)
+        processors.insert(0, _level_filter)
+        wrapper_level = logging.DEBUG
 
     # Configure structlog
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.make_filtering_bound_logger(log_level),
+        wrapper_class=structlog.make_filtering_bound_logger(wrapper_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(file=sys.stdout),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
     # Configure standard logging to use structlog
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
+        stream=stream,
         level=log_level,
+        force=True,
     )
 
 
 def get_logger(name: str) -> Any:
     """Get a logger instance."""
     return structlog.get_logger(name)
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    if "log_level" in changed and _level_filter is not None:
+        level = getattr(logging, settings.log_level.upper(), logging.INFO)
+        _level_filter.level = level
+        logging.getLogger().setLevel(level)
+    if "log_rate_limits" in changed and _rate_limiter is not None:
+        _rate_limiter.rates = dict(settings.log_rate_limits)
+
+
+subscribe(_on_settings_changed)
@@ -1,18 +1,38 @@
 """Main entry point for Kapsa operator."""
 
+import time
+from typing import TYPE_CHECKING, Optional
+
 import kopf
 
 from kapsa.config import get_settings
+from kapsa.events import get_event_recorder
 from kapsa.logging import configure_logging, get_logger
+from kapsa.metrics import start_metrics_server
+from kapsa.startup import get_startup_timer, warm_up_clients
+from kapsa.status import get_status_manager
+from kapsa.tracing import configure_tracing, shutdown_tracing
+from kapsa.utils.deployment import MANAGED_LABELS
+from kapsa.utils.kube import run_sync
 
 # Import controllers (registers handlers)
+from kapsa.controllers import build  # noqa: F401
 from kapsa.controllers import domainpool  # noqa: F401
 from kapsa.controllers import environment  # noqa: F401
 from kapsa.controllers import project  # noqa: F401
 from kapsa.controllers import registry  # noqa: F401
+from kapsa.controllers import retention  # noqa: F401
+from kapsa.controllers import rollout  # noqa: F401
+
+if TYPE_CHECKING:
+    from kapsa.settings_watcher import SettingsWatcher
+
+_imported_at = time.time()
 
 logger = get_logger(__name__)
 
+_settings_watcher: Optional["SettingsWatcher"] = None
+
 
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_: object) -> None:
@@ -21,19 +41,70 @@ def configure(settings: kopf.OperatorSettings, **_: object) -> None:
 
     # Configure logging
     configure_logging()
+    configure_tracing()
     logger.info("operator_starting", version="0.1.0")
+    timer = get_startup_timer()
+    timer.mark("import", at=_imported_at)
+    timer.start_reporting()
+
+    # Import API client modules in the background while kopf logs in and starts watching
+    warm_up_clients()
 
     # Configure kopf settings
-    settings.posting.enabled = True
+    # Events come from kapsa.events for meaningful transitions only, rather
+    # than one per handler log line
+    settings.posting.enabled = False
     settings.watching.server_timeout = 600
     settings.persistence.finalizer = "kapsa-project.io/finalizer"
+    # Have the API server filter the watches on workloads to the operator's
+    # own objects; handler label filters alone still stream every Deployment
+    # and ReplicaSet in the cluster to the operator
+    managed = ",".join(f"{k}={v}" for k, v in MANAGED_LABELS.items())
+    for group, plural in (("apps", "deployments"), ("apps", "replicasets"), ("kpack.io", "images")):
+        settings.watching.label_selectors[group, plural] = managed
+    timer.mark("config")
+
+    start_metrics_server()
+
+
+@kopf.on.startup()
+async def watch_settings(**_: object) -> None:
+    """Apply live overrides from the settings ConfigMap, if one is configured."""
+    global _settings_watcher
+    config = get_settings()
+    if not config.config_map:
+        return
+
+    from kapsa.settings_watcher import SettingsWatcher
+
+    _settings_watcher = SettingsWatcher(config.config_map, config.namespace)
+    await _settings_watcher.start()
+    logger.info("settings_watch_started", configmap=config.config_map)
+
+
+@kopf.on.event("kapsa-project.io", "v1alpha1", "projects")
+@kopf.on.event("kapsa-project.io", "v1alpha1", "environments")
+@kopf.on.event("kapsa-project.io", "v1alpha1", "domainpools")
+@kopf.on.event("kapsa-project.io", "v1alpha1", "registries")
+async def startup_first_event(**_: object) -> None:
+    """Record when the first watch event arrives."""
+    get_startup_timer().mark("first_watch")
 
 
 @kopf.on.cleanup()
 async def cleanup(**_: object) -> None:
     """Cleanup on operator shutdown."""
+    from kapsa.registry import close_registry_clients
+
     logger.info("operator_shutting_down")
 
+    if _settings_watcher is not None:
+        _settings_watcher.stop()
+    await get_status_manager().flush_all()
+    await get_event_recorder().flush_all()
+    await close_registry_clients()
+    await run_sync(shutdown_tracing)
+
 
 def main() -> None:
     """Run the operator."""
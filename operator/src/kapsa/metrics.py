@@ -1,12 +1,60 @@
 """Prometheus metrics for Kapsa operator."""
 
-from prometheus_client import Counter, Gauge, Histogram, start_http_server
+import threading
+from functools import partial
+from typing import Any
 
 from kapsa.config import get_settings
 from kapsa.logging import get_logger
 
 logger = get_logger(__name__)
 
+_lock = threading.Lock()
+
+
+class _Collector:
+    """
+    A Prometheus collector created on first use.
+
+    Every controller imports this module, so ``prometheus_client`` is only
+    loaded once a metric is recorded or the metrics server starts, keeping
+    it out of the operator's import time.
+    """
+
+    def __init__(self, kind: str, *args: Any, **kwargs: Any) -> None:
+        self._kind = kind
+        self._args = args
+        self._kwargs = kwargs
+        self._metric: Any = None
+
+    def get(self) -> Any:
+        """The underlying ``prometheus_client`` collector, registering it if needed."""
+        if self._metric is None:
+            with _lock:
+                if self._metric is None:
+                    import prometheus_client
+
+                    kind = getattr(prometheus_client, self._kind)
+                    self._metric = kind(*self._args, **self._kwargs)
+        return self._metric
+
+    def labels(self, *args: Any, **kwargs: Any) -> Any:
+        return self.get().labels(*args, **kwargs)
+
+    def inc(self, amount: float = 1) -> None:
+        self.get().inc(amount)
+
+    def set(self, value: float) -> None:
+        self.get().set(value)
+
+    def observe(self, amount: float) -> None:
+        self.get().observe(amount)
+
+
+Counter = partial(_Collector, "Counter")
+Gauge = partial(_Collector, "Gauge")
+Histogram = partial(_Collector, "Histogram")
+
 # Project metrics
 project_total = Counter(
     "kapsa_projects_total",
@@ -39,6 +87,44 @@ environment_reconcile_total = Counter(
     ["namespace", "environment", "status"],
 )
 
+environment_rollout_total = Counter(
+    "kapsa_environment_rollouts_total",
+    "Total number of finished Environment rollouts",
+    ["result"],
+)
+
+environment_deploy_duration = Histogram(
+    "kapsa_environment_deploy_duration_seconds",
+    "Time from a build (or deploy request) until all replicas are ready",
+    buckets=(5, 15, 30, 60, 120, 300, 600, 900, 1800),
+)
+
+project_teardown_duration = Histogram(
+    "kapsa_project_teardown_duration_seconds",
+    "Time from Project deletion until its namespaces are gone",
+    ["outcome"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 900, 1800),
+)
+
+namespace_teardown_stuck_total = Counter(
+    "kapsa_namespace_teardown_stuck_total",
+    "Namespaces still terminating after the teardown wait timeout",
+)
+
+# Status metrics
+status_patch_total = Counter(
+    "kapsa_status_patch_total",
+    "Status updates by outcome (written, skipped as no-op, coalesced, failed)",
+    ["kind", "result"],
+)
+
+# Event metrics
+events_total = Counter(
+    "kapsa_events_total",
+    "Kubernetes Events by reason and outcome (created, patched, aggregated, throttled, failed)",
+    ["reason", "result"],
+)
+
 # Build metrics
 build_total = Counter(
     "kapsa_builds_total",
@@ -65,6 +151,79 @@ git_poll_duration = Histogram(
     ["namespace", "project"],
 )
 
+git_mirror_fetch_duration = Histogram(
+    "kapsa_git_mirror_fetch_duration_seconds",
+    "Duration of git mirror clones and incremental fetches",
+    ["kind"],
+)
+
+git_mirror_bytes = Gauge(
+    "kapsa_git_mirror_bytes",
+    "Disk space used by the git mirror cache",
+)
+
+git_mirror_evictions_total = Counter(
+    "kapsa_git_mirror_evictions_total",
+    "Git mirrors deleted to stay within the disk budget",
+)
+
+# Image pre-pull metrics
+image_prepull_total = Counter(
+    "kapsa_image_prepull_total",
+    "Image pre-pulls by outcome (complete, timeout, skipped, failed)",
+    ["result"],
+)
+
+image_prepull_duration = Histogram(
+    "kapsa_image_prepull_duration_seconds",
+    "Time until the selected nodes had pulled a new image",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600),
+)
+
+# Registry metrics
+registry_health_latency = Gauge(
+    "kapsa_registry_health_latency_seconds",
+    "Latency of the last registry health check",
+    ["registry"],
+)
+
+registry_health_total = Counter(
+    "kapsa_registry_health_checks_total",
+    "Total number of registry health checks",
+    ["registry", "status"],
+)
+
+manifest_cache_total = Counter(
+    "kapsa_manifest_cache_lookups_total",
+    "Total number of manifest cache lookups",
+    ["registry", "result"],
+)
+
+retention_images_total = Counter(
+    "kapsa_retention_images_total",
+    "Images (manifests) handled by retention runs (kept, deleted, dry_run, failed)",
+    ["registry", "result"],
+)
+
+retention_duration = Histogram(
+    "kapsa_retention_duration_seconds",
+    "Time to list, plan and prune one Project's image repository",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+settings_reload_total = Counter(
+    "kapsa_settings_reloads_total",
+    "Total number of settings ConfigMap changes processed",
+    ["result"],
+)
+
+# Startup metrics
+startup_phase_seconds = Gauge(
+    "kapsa_startup_phase_seconds",
+    "Seconds from process start until each startup phase completed",
+    ["phase"],
+)
+
 
 def start_metrics_server() -> None:
     """Start the Prometheus metrics HTTP server."""
@@ -74,6 +233,13 @@ def start_metrics_server() -> None:
         logger.info("metrics_disabled")
         return
 
+    from prometheus_client import start_http_server
+
+    # Register every collector, so metrics not recorded yet are exported too
+    for collector in list(globals().values()):
+        if isinstance(collector, _Collector):
+            collector.get()
+
     try:
         start_http_server(settings.metrics_port)
         logger.info("metrics_server_started", port=settings.metrics_port)
@@ -0,0 +1,67 @@
+"""Resolved Registry CRD model."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass(frozen=True)
+class RegistryEndpoint:
+    """A Registry CRD resolved to everything needed to talk to it."""
+
+    name: str
+    type: str
+    base_url: str
+    host: str
+    username: Optional[str] = None
+    password: Optional[str] = field(default=None, repr=False)
+    pull_secret_name: Optional[str] = None
+    options: Dict[str, str] = field(default_factory=dict)
+    retention: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_spec(
+        cls,
+        name: str,
+        spec: Dict[str, Any],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+    ) -> "RegistryEndpoint":
+        """
+        Build an endpoint from a Registry spec.
+
+        Args:
+            name: Registry name
+            spec: Registry spec
+            username: Registry username from the auth secret
+            password: Registry password or token from the auth secret
+
+        Returns:
+            Resolved registry endpoint
+        """
+        options = {str(k): str(v) for k, v in (spec.get("options") or {}).items()}
+        endpoint = str(spec.get("endpoint", "")).rstrip("/")
+
+        if "://" not in endpoint:
+            insecure = options.get("insecure", "false").lower() == "true"
+            endpoint = f"{'http' if insecure else 'https'}://{endpoint}"
+
+        host = urlsplit(endpoint).netloc
+        pull_secret = (spec.get("imagePullSecret") or {}).get("name")
+        auth_secret = ((spec.get("auth") or {}).get("secretRef") or {}).get("name")
+
+        return cls(
+            name=name,
+            type=spec.get("type", "docker"),
+            base_url=endpoint,
+            host=host,
+            username=username,
+            password=password,
+            pull_secret_name=pull_secret or auth_secret,
+            options=options,
+            retention=dict(spec.get("retention") or {}),
+        )
+
+    def image_reference(self, repository: str, tag: str = "latest") -> str:
+        """Return a tag reference for an image repository in this registry."""
+        return f"{self.host}/{repository}:{tag}"
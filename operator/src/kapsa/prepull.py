@@ -0,0 +1,207 @@
+"""Image pre-pull: warm new images on nodes before Environments roll out."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.utils.deployment import create_prepull_daemonset_spec
+from kapsa.utils.images import parse_image_reference
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+# Seconds between reads of a pre-pull DaemonSet's status
+POLL_INTERVAL = 1.0
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+@dataclass
+class PrepullResult:
+    """Outcome of warming one image."""
+
+    result: str  # complete, timeout, skipped or failed
+    nodes: int = 0
+    pulled: int = 0
+    seconds: float = 0.0
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Operator-wide bound on images being warmed at once."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_settings().image_prepull_concurrency)
+    return _semaphore
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    global _semaphore
+    if "image_prepull_concurrency" in changed:
+        # Warm-ups already holding the old semaphore finish under the old limit
+        _semaphore = None
+
+
+subscribe(_on_settings_changed)
+
+
+async def prepull_image(
+    project: str,
+    namespace: str,
+    image: str,
+    owner_references: List[Dict[str, Any]],
+    placement: Optional[Dict[str, Any]] = None,
+) -> PrepullResult:
+    """
+    Pull an image onto the selected nodes and wait until they have it.
+
+    A DaemonSet named ``<project>-prepull`` runs the image as a no-op init
+    container on every node the Environments can run on (``placement``)
+    that also matches ``image_prepull_node_selector``. Once all of its pods
+    are Ready, or ``image_prepull_timeout`` passes, the DaemonSet is deleted
+    again: nothing keeps the image in use, so the kubelet's image garbage
+    collection can reclaim warmed images the Environments never started.
+    Only digest-pinned images are warmed, since those are the ones
+    Deployments run with ``imagePullPolicy: IfNotPresent``.
+
+    API errors are logged and counted rather than raised; the rollout then
+    goes ahead with cold pulls.
+
+    Args:
+        project: Project name
+        namespace: Namespace of the Project's Environments
+        image: Digest-pinned image reference
+        owner_references: Owner references for the DaemonSet (the Project)
+        placement: Node constraints shared by the Environments, from
+            :func:`~kapsa.utils.deployment.node_placement` (all nodes if None)
+
+    Returns:
+        How many nodes were selected and how many pulled the image
+    """
+    settings = get_settings()
+    if not parse_image_reference(image).pinned:
+        metrics.image_prepull_total.labels(result="skipped").inc()
+        return PrepullResult("skipped")
+
+    name = f"{project}-prepull"
+    daemonset = create_prepull_daemonset_spec(
+        name=name,
+        namespace=namespace,
+        image=image,
+        project=project,
+        command=settings.image_prepull_command,
+        pause_image=settings.image_prepull_pause_image,
+        node_selector=settings.image_prepull_node_selector,
+        placement=placement,
+    )
+    daemonset["metadata"]["ownerReferences"] = owner_references
+    apps_v1 = client.AppsV1Api()
+
+    async with _get_semaphore():
+        started = time.monotonic()
+        try:
+            try:
+                await run_sync(apps_v1.create_namespaced_daemon_set, namespace, daemonset)
+            except ApiException as e:
+                if e.status != 409:  # Left over from an interrupted warm-up
+                    raise
+                await run_sync(apps_v1.patch_namespaced_daemon_set, name, namespace, daemonset)
+            logger.info("image_prepull_started", project=project, namespace=namespace, image=image)
+
+            complete, pulled, nodes = await _wait_for_pull(
+                apps_v1, name, namespace, settings.image_prepull_timeout
+            )
+        except ApiException as e:
+            logger.warning(
+                "image_prepull_failed",
+                project=project,
+                namespace=namespace,
+                image=image,
+                error=str(e),
+            )
+            metrics.image_prepull_total.labels(result="failed").inc()
+            return PrepullResult("failed")
+        finally:
+            await _delete_daemonset(apps_v1, name, namespace)
+
+    seconds = round(time.monotonic() - started, 1)
+    if nodes == 0:
+        result = PrepullResult("skipped", seconds=seconds)
+    else:
+        result = PrepullResult("complete" if complete else "timeout", nodes, pulled, seconds)
+        metrics.image_prepull_duration.observe(seconds)
+
+    metrics.image_prepull_total.labels(result=result.result).inc()
+    log = logger.info if complete else logger.warning
+    log(
+        "image_prepulled",
+        project=project,
+        namespace=namespace,
+        image=image,
+        result=result.result,
+        nodes=nodes,
+        pulled=pulled,
+        seconds=seconds,
+    )
+    return result
+
+
+async def _wait_for_pull(
+    apps_v1: "client.AppsV1Api",
+    name: str,
+    namespace: str,
+    timeout: float,
+) -> Tuple[bool, int, int]:
+    """
+    Poll the DaemonSet until every scheduled pod is Ready, or the timeout.
+
+    Returns:
+        Whether all nodes pulled the image, how many did, and how many were selected
+    """
+    deadline = time.monotonic() + timeout
+    pulled = nodes = 0
+    while True:
+        try:
+            daemonset = await run_sync(apps_v1.read_namespaced_daemon_set, name, namespace)
+        except ApiException as e:
+            if e.status == 404:  # Deleted under us
+                return False, pulled, nodes
+            raise
+
+        status = daemonset.status
+        generation = daemonset.metadata.generation if daemonset.metadata else None
+        if status is not None and (status.observed_generation or 0) >= (generation or 0):
+            nodes = status.desired_number_scheduled or 0
+            pulled = min(status.number_ready or 0, status.updated_number_scheduled or 0)
+            if pulled >= nodes:
+                return True, pulled, nodes
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, pulled, nodes
+        await asyncio.sleep(min(POLL_INTERVAL, remaining))
+
+
+async def _delete_daemonset(apps_v1: "client.AppsV1Api", name: str, namespace: str) -> None:
+    """Remove a pre-pull DaemonSet and its pods."""
+    try:
+        await run_sync(
+            apps_v1.delete_namespaced_daemon_set,
+            name,
+            namespace,
+            propagation_policy="Background",
+        )
+    except ApiException as e:
+        if e.status != 404:
+            logger.warning(
+                "image_prepull_cleanup_failed",
+                daemonset=name,
+                namespace=namespace,
+                error=str(e),
+            )
@@ -0,0 +1,47 @@
+"""Container registry clients and Registry CRD resolution."""
+
+from kapsa.registry.client import (
+    ManifestInfo,
+    RegistryClient,
+    RegistryError,
+    close_registry_clients,
+    discard_registry_client,
+    get_registry_client,
+)
+from kapsa.registry.manifests import (
+    ManifestCache,
+    get_manifest_cache,
+    lookup_manifest,
+    pin_image,
+)
+from kapsa.registry.resolver import forget_registry, load_registry, resolve_registry
+from kapsa.registry.retention import (
+    RetentionPolicy,
+    RetentionResult,
+    build_tag,
+    plan_retention,
+    prune_repository,
+    tag_build,
+)
+
+__all__ = [
+    "ManifestCache",
+    "ManifestInfo",
+    "RegistryClient",
+    "RegistryError",
+    "RetentionPolicy",
+    "RetentionResult",
+    "build_tag",
+    "close_registry_clients",
+    "discard_registry_client",
+    "forget_registry",
+    "get_manifest_cache",
+    "get_registry_client",
+    "load_registry",
+    "lookup_manifest",
+    "pin_image",
+    "plan_retention",
+    "prune_repository",
+    "resolve_registry",
+    "tag_build",
+]
@@ -0,0 +1,404 @@
+"""OCI distribution API client with pooled connections and cached tokens."""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+import aiohttp
+
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.models.registry import RegistryEndpoint
+
+logger = get_logger(__name__)
+
+MANIFEST_ACCEPT = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+
+_CHALLENGE_PARAM = re.compile(r'(\w+)="([^"]*)"')
+_LINK_NEXT = re.compile(r'<([^>]+)>\s*;\s*rel="?next"?')
+
+
+class RegistryError(Exception):
+    """Raised when a registry request fails."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class ManifestInfo:
+    """Manifest metadata returned by a HEAD/GET on a manifest."""
+
+    digest: str
+    media_type: str
+    size: int
+
+
+class RegistryClient:
+    """
+    Client for a single registry endpoint.
+
+    Speaks the OCI distribution API, which Harbor, GitLab and the reference
+    ``registry:2`` implementation all serve. Authentication follows the
+    ``WWW-Authenticate`` challenge: bearer tokens are fetched from the
+    advertised realm and cached per scope until shortly before they expire;
+    basic-auth registries get credentials on every request.
+    """
+
+    def __init__(
+        self,
+        endpoint: RegistryEndpoint,
+        pool_size: int = 10,
+        timeout: float = 30.0,
+        token_leeway: int = 30,
+    ) -> None:
+        self.endpoint = endpoint
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._token_leeway = token_leeway
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._token_locks: Dict[str, asyncio.Lock] = {}
+        self._challenge: Optional[Dict[str, str]] = None
+        self._basic = False
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Pooled HTTP session, created lazily on the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_size,
+                limit_per_host=self._pool_size,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def ping(self) -> float:
+        """
+        Check connectivity and credentials against the ``/v2/`` base endpoint.
+
+        Returns:
+            Round-trip latency in seconds
+
+        Raises:
+            RegistryError: If the registry is unreachable or rejects the credentials
+        """
+        start = time.monotonic()
+        async with await self._request("GET", "/v2/", scope="") as resp:
+            if resp.status != 200:
+                raise RegistryError(f"registry returned HTTP {resp.status}", resp.status)
+        return time.monotonic() - start
+
+    async def head_manifest(self, repository: str, reference: str) -> Optional[ManifestInfo]:
+        """
+        Look up a manifest's digest without downloading it.
+
+        Args:
+            repository: Repository path within the registry
+            reference: Tag or digest
+
+        Returns:
+            Manifest metadata, or None if the manifest does not exist
+        """
+        async with await self._request(
+            "HEAD",
+            f"/v2/{repository}/manifests/{reference}",
+            scope=f"repository:{repository}:pull",
+            headers={"Accept": MANIFEST_ACCEPT},
+        ) as resp:
+            if resp.status == 404:
+                return None
+            if resp.status != 200:
+                raise RegistryError(
+                    f"manifest lookup for {repository}:{reference} returned HTTP {resp.status}",
+                    resp.status,
+                )
+            digest = resp.headers.get("Docker-Content-Digest", "")
+            if not digest:
+                raise RegistryError(f"registry did not return a digest for {repository}")
+            return ManifestInfo(
+                digest=digest,
+                media_type=resp.headers.get("Content-Type", ""),
+                size=int(resp.headers.get("Content-Length", 0) or 0),
+            )
+
+    async def get_manifest(self, repository: str, reference: str) -> Tuple[bytes, str]:
+        """
+        Download a manifest.
+
+        Args:
+            repository: Repository path within the registry
+            reference: Tag or digest
+
+        Returns:
+            The manifest bytes and their media type
+
+        Raises:
+            RegistryError: If the manifest does not exist or cannot be read
+        """
+        async with await self._request(
+            "GET",
+            f"/v2/{repository}/manifests/{reference}",
+            scope=f"repository:{repository}:pull",
+            headers={"Accept": MANIFEST_ACCEPT},
+        ) as resp:
+            if resp.status != 200:
+                raise RegistryError(
+                    f"manifest download for {repository}:{reference} returned HTTP {resp.status}",
+                    resp.status,
+                )
+            return await resp.read(), resp.headers.get("Content-Type", "")
+
+    async def put_manifest(
+        self, repository: str, reference: str, manifest: bytes, media_type: str
+    ) -> str:
+        """
+        Upload a manifest, e.g. to add a tag to an existing image.
+
+        Args:
+            repository: Repository path within the registry
+            reference: Tag to point at the manifest
+            manifest: Manifest bytes, exactly as downloaded
+            media_type: Manifest media type
+
+        Returns:
+            Digest of the manifest
+
+        Raises:
+            RegistryError: If the registry refuses the upload
+        """
+        async with await self._request(
+            "PUT",
+            f"/v2/{repository}/manifests/{reference}",
+            scope=f"repository:{repository}:pull,push",
+            headers={"Content-Type": media_type},
+            data=manifest,
+        ) as resp:
+            if resp.status not in (200, 201):
+                raise RegistryError(
+                    f"tagging {repository}:{reference} returned HTTP {resp.status}", resp.status
+                )
+            return resp.headers.get("Docker-Content-Digest", "")
+
+    async def list_tags(self, repository: str, page_size: int = 100) -> AsyncIterator[str]:
+        """
+        Iterate over all tags in a repository, following ``Link`` pagination.
+
+        Args:
+            repository: Repository path within the registry
+            page_size: Tags requested per page
+
+        Yields:
+            Tag names
+        """
+        path: Optional[str] = f"/v2/{repository}/tags/list?n={page_size}"
+        while path:
+            async with await self._request(
+                "GET", path, scope=f"repository:{repository}:pull"
+            ) as resp:
+                if resp.status == 404:
+                    return
+                if resp.status != 200:
+                    raise RegistryError(
+                        f"tag listing for {repository} returned HTTP {resp.status}", resp.status
+                    )
+                body = await resp.json(content_type=None)
+                match = _LINK_NEXT.search(resp.headers.get("Link", ""))
+                path = match.group(1) if match else None
+
+            for tag in body.get("tags") or []:
+                yield tag
+
+    async def delete_manifest(self, repository: str, digest: str) -> None:
+        """
+        Delete a manifest by digest.
+
+        Args:
+            repository: Repository path within the registry
+            digest: Manifest digest
+
+        Raises:
+            RegistryError: If the registry refuses the deletion
+        """
+        async with await self._request(
+            "DELETE",
+            f"/v2/{repository}/manifests/{digest}",
+            scope=f"repository:{repository}:delete,pull",
+        ) as resp:
+            if resp.status not in (200, 202, 404):
+                raise RegistryError(
+                    f"deleting {repository}@{digest} returned HTTP {resp.status}", resp.status
+                )
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        scope: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> aiohttp.ClientResponse:
+        """Send a request, answering at most one auth challenge."""
+        url = path if path.startswith("http") else f"{self.endpoint.base_url}{path}"
+        request_headers = dict(headers or {})
+
+        for attempt in range(2):
+            auth = await self._auth_kwargs(scope, request_headers)
+            try:
+                resp = await self.session.request(
+                    method, url, headers=request_headers, **auth, **kwargs
+                )
+            except aiohttp.ClientError as e:
+                raise RegistryError(f"{method} {url} failed: {e}") from e
+
+            if resp.status != 401 or attempt == 1:
+                return resp
+
+            challenge = resp.headers.get("WWW-Authenticate", "")
+            resp.release()
+            self._handle_challenge(challenge, scope)
+
+        raise AssertionError("unreachable")
+
+    async def _auth_kwargs(self, scope: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        """Return authentication for a request, fetching a token if needed."""
+        headers.pop("Authorization", None)
+
+        if self._basic and self.endpoint.username is not None:
+            return {"auth": aiohttp.BasicAuth(self.endpoint.username, self.endpoint.password or "")}
+
+        if self._challenge is not None:
+            headers["Authorization"] = f"Bearer {await self._token(scope)}"
+        return {}
+
+    def _handle_challenge(self, header: str, scope: str) -> None:
+        """Record how the registry wants to be authenticated."""
+        scheme, _, params = header.partition(" ")
+        if scheme.lower() == "basic":
+            if self.endpoint.username is None:
+                raise RegistryError("registry requires credentials but none are configured", 401)
+            self._basic = True
+            return
+
+        if scheme.lower() != "bearer":
+            raise RegistryError(f"unsupported auth challenge: {header!r}", 401)
+
+        self._challenge = dict(_CHALLENGE_PARAM.findall(params))
+        self._tokens.pop(scope, None)
+
+    async def _token(self, scope: str) -> str:
+        """Return a cached bearer token for ``scope``, fetching one if expired."""
+        cached = self._tokens.get(scope)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        lock = self._token_locks.setdefault(scope, asyncio.Lock())
+        async with lock:
+            cached = self._tokens.get(scope)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+
+            token, expires_in = await self._fetch_token(scope)
+            ttl = max(expires_in - self._token_leeway, 0)
+            self._tokens[scope] = (token, time.monotonic() + ttl)
+            return token
+
+    async def _fetch_token(self, scope: str) -> Tuple[str, int]:
+        """Exchange credentials for a bearer token at the challenge realm."""
+        assert self._challenge is not None
+        realm = self._challenge.get("realm")
+        if not realm:
+            raise RegistryError("bearer challenge did not include a realm", 401)
+
+        params = {"service": self._challenge.get("service", "")}
+        if scope:
+            params["scope"] = scope
+
+        auth = None
+        if self.endpoint.username is not None:
+            auth = aiohttp.BasicAuth(self.endpoint.username, self.endpoint.password or "")
+
+        try:
+            async with self.session.get(realm, params=params, auth=auth) as resp:
+                if resp.status != 200:
+                    raise RegistryError(f"token endpoint returned HTTP {resp.status}", resp.status)
+                body = await resp.json(content_type=None)
+        except aiohttp.ClientError as e:
+            raise RegistryError(f"token request to {realm} failed: {e}") from e
+
+        token = body.get("token") or body.get("access_token")
+        if not token:
+            raise RegistryError("token endpoint did not return a token", 401)
+        return token, int(body.get("expires_in", 60))
+
+
+_clients: Dict[str, RegistryClient] = {}
+
+
+def get_registry_client(endpoint: RegistryEndpoint) -> RegistryClient:
+    """
+    Return the pooled client for a registry endpoint.
+
+    Clients (and their connection pools and token caches) are shared by every
+    caller using the same Registry. A client is replaced when the Registry's
+    endpoint or credentials change.
+    """
+    client = _clients.get(endpoint.name)
+    if client is not None and client.endpoint == endpoint:
+        return client
+
+    if client is not None:
+        asyncio.ensure_future(client.close())
+
+    settings = get_settings()
+    client = RegistryClient(
+        endpoint,
+        pool_size=settings.registry_pool_size,
+        timeout=settings.registry_request_timeout,
+        token_leeway=settings.registry_token_leeway,
+    )
+    _clients[endpoint.name] = client
+    return client
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    if changed & {"registry_pool_size", "registry_request_timeout", "registry_token_leeway"}:
+        # Clients are rebuilt with the new settings on next use
+        for client in list(_clients.values()):
+            asyncio.ensure_future(client.close())
+        _clients.clear()
+
+
+subscribe(_on_settings_changed)
+
+
+async def discard_registry_client(name: str) -> None:
+    """Close and forget the pooled client for a registry."""
+    client = _clients.pop(name, None)
+    if client is not None:
+        await client.close()
+
+
+async def close_registry_clients() -> None:
+    """Close every pooled registry client."""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(c.close() for c in clients), return_exceptions=True)
@@ -0,0 +1,167 @@
+"""LRU cache of tag-to-digest lookups and digest pinning."""
+
+import time
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.models.registry import RegistryEndpoint
+from kapsa.registry.client import ManifestInfo, RegistryError, get_registry_client
+from kapsa.utils.images import parse_image_reference
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+class ManifestCache:
+    """
+    Bounded LRU cache of manifest metadata keyed by (registry, repository, reference).
+
+    Tag entries expire after ``ttl`` seconds because tags move; digest entries
+    never expire because digests are immutable.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[ManifestInfo, float]]" = OrderedDict()
+
+    def get(self, registry: str, repository: str, reference: str) -> Optional[ManifestInfo]:
+        """Return cached manifest metadata, or None on a miss or expired tag."""
+        key = (registry, repository, reference)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, registry: str, repository: str, reference: str, info: ManifestInfo) -> None:
+        """Cache manifest metadata for a tag and for its digest."""
+        now = time.monotonic()
+        self._store((registry, repository, reference), info, now + self.ttl)
+        self._store((registry, repository, info.digest), info, float("inf"))
+
+    def invalidate(self, registry: str, repository: Optional[str] = None) -> None:
+        """Drop every entry for a registry, or for one repository within it."""
+        for key in [k for k in self._entries if k[0] == registry]:
+            if repository is None or key[1] == repository:
+                del self._entries[key]
+
+    def resize(self, max_size: int) -> None:
+        """Change the maximum size, evicting least recently used entries."""
+        self.max_size = max_size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: CacheKey, info: ManifestInfo, expires_at: float) -> None:
+        self._entries[key] = (info, expires_at)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+_cache: Optional[ManifestCache] = None
+
+
+def get_manifest_cache() -> ManifestCache:
+    """Return the process-wide manifest cache."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = ManifestCache(
+            max_size=settings.manifest_cache_size,
+            ttl=settings.manifest_cache_ttl,
+        )
+    return _cache
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    if _cache is None:
+        return
+    if "manifest_cache_size" in changed:
+        _cache.resize(settings.manifest_cache_size)
+    if "manifest_cache_ttl" in changed:
+        _cache.ttl = settings.manifest_cache_ttl  # Applies to entries cached from now on
+
+
+subscribe(_on_settings_changed)
+
+
+async def lookup_manifest(
+    endpoint: RegistryEndpoint, repository: str, reference: str
+) -> Optional[ManifestInfo]:
+    """
+    Return manifest metadata, consulting the cache before issuing a HEAD request.
+
+    Args:
+        endpoint: Registry holding the image
+        repository: Repository path within the registry
+        reference: Tag or digest
+
+    Returns:
+        Manifest metadata, or None if the manifest does not exist
+    """
+    cache = get_manifest_cache()
+    info = cache.get(endpoint.name, repository, reference)
+    if info is not None:
+        metrics.manifest_cache_total.labels(registry=endpoint.name, result="hit").inc()
+        return info
+
+    metrics.manifest_cache_total.labels(registry=endpoint.name, result="miss").inc()
+
+    info = await get_registry_client(endpoint).head_manifest(repository, reference)
+    if info is not None:
+        cache.put(endpoint.name, repository, reference, info)
+    return info
+
+
+async def pin_image(endpoint: RegistryEndpoint, image: str) -> str:
+    """
+    Resolve an image reference to an immutable ``repository@digest`` reference.
+
+    References that already carry a digest are returned unchanged, so a kpack
+    ``latestImage`` costs no registry round-trip. If the digest's manifest
+    is cached, its tag is cached as pointing at it.
+
+    Args:
+        endpoint: Registry holding the image
+        image: Image reference, by tag or by digest
+
+    Returns:
+        Digest-pinned image reference
+
+    Raises:
+        RegistryError: If the tag does not exist in the registry
+    """
+    ref = parse_image_reference(image)
+    if ref.digest is not None:
+        cache = get_manifest_cache()
+        known = cache.get(endpoint.name, ref.repository, ref.digest)
+        if ref.tag is not None and known is not None:
+            cache.put(endpoint.name, ref.repository, ref.tag, known)
+        return ref.with_digest(ref.digest)
+
+    tag = ref.tag or "latest"
+    info = await lookup_manifest(endpoint, ref.repository, tag)
+    if info is None:
+        raise RegistryError(f"image {image} not found in registry {endpoint.name}", 404)
+
+    logger.debug(
+        "image_pinned",
+        registry=endpoint.name,
+        repository=ref.repository,
+        tag=tag,
+        digest=info.digest,
+    )
+    return ref.with_digest(info.digest)
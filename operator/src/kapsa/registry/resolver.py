@@ -0,0 +1,130 @@
+"""In-memory cache of resolved Registry CRDs."""
+
+import base64
+import json
+import time
+from typing import Any, Dict, Optional, Tuple, cast
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa.config import get_settings
+from kapsa.logging import get_logger
+from kapsa.models.registry import RegistryEndpoint
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+# name -> (endpoint, spec, monotonic time the credentials were read)
+_endpoints: Dict[str, Tuple[RegistryEndpoint, Dict[str, Any], float]] = {}
+
+
+async def load_registry(name: str, spec: Dict[str, Any]) -> RegistryEndpoint:
+    """
+    Resolve a Registry spec (including its auth secret) and cache the result.
+
+    Called by the Registry controller whenever a Registry is created, updated
+    or resumed, so Project reconciles normally hit the cache.
+
+    Args:
+        name: Registry name
+        spec: Registry spec
+
+    Returns:
+        Resolved registry endpoint
+    """
+    username, password = await _read_credentials(spec)
+    endpoint = RegistryEndpoint.from_spec(name, spec, username=username, password=password)
+    _endpoints[name] = (endpoint, spec, time.monotonic())
+    return endpoint
+
+
+async def resolve_registry(name: str) -> Optional[RegistryEndpoint]:
+    """
+    Return the resolved endpoint for a Registry, reading the CRD only on a cache miss.
+
+    The auth secret is read again once the cached credentials are older than
+    ``registry_credentials_ttl``, so rotated credentials are picked up.
+
+    Args:
+        name: Registry name
+
+    Returns:
+        Resolved registry endpoint, or None if the Registry does not exist
+    """
+    cached = _endpoints.get(name)
+    if cached is not None:
+        endpoint, spec, loaded_at = cached
+        if time.monotonic() - loaded_at < get_settings().registry_credentials_ttl:
+            return endpoint
+        return await load_registry(name, spec)
+
+    api = client.CustomObjectsApi()
+    try:
+        registry = cast(
+            Dict[str, Any],
+            await run_sync(
+                api.get_cluster_custom_object,
+                "kapsa-project.io",
+                "v1alpha1",
+                "registries",
+                name,
+            ),
+        )
+    except ApiException as e:
+        if e.status == 404:
+            logger.warning("registry_not_found", registry=name)
+            return None
+        raise
+
+    logger.debug("registry_cache_miss", registry=name)
+    return await load_registry(name, registry.get("spec", {}))
+
+
+def forget_registry(name: str) -> None:
+    """Drop a Registry from the cache."""
+    _endpoints.pop(name, None)
+
+
+async def _read_credentials(spec: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read registry credentials from the secret referenced by ``spec.auth.secretRef``.
+
+    Both ``kubernetes.io/dockerconfigjson`` secrets and plain secrets with
+    ``username``/``password`` keys are accepted.
+    """
+    secret_ref = (spec.get("auth") or {}).get("secretRef") or {}
+    secret_name = secret_ref.get("name")
+    if not secret_name:
+        return None, None
+
+    secret_namespace = secret_ref.get("namespace") or get_settings().namespace
+    v1 = client.CoreV1Api()
+    try:
+        secret = await run_sync(v1.read_namespaced_secret, secret_name, secret_namespace)
+    except ApiException as e:
+        if e.status == 404:
+            logger.warning(
+                "registry_secret_not_found",
+                secret=secret_name,
+                namespace=secret_namespace,
+            )
+            return None, None
+        raise
+
+    data = {k: base64.b64decode(v).decode() for k, v in (secret.data or {}).items()}
+
+    if "username" in data:
+        return data["username"], data.get("password")
+
+    if ".dockerconfigjson" in data:
+        auths = json.loads(data[".dockerconfigjson"]).get("auths", {})
+        host = RegistryEndpoint.from_spec("", spec).host
+        entry = auths.get(host) or next(iter(auths.values()), {})
+        if "username" in entry:
+            return entry["username"], entry.get("password")
+        if "auth" in entry:
+            username, _, password = base64.b64decode(entry["auth"]).decode().partition(":")
+            return username, password
+
+    return None, None
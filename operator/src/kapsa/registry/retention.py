@@ -0,0 +1,414 @@
+"""Image retention: prune old builds from a Project's image repository."""
+
+import asyncio
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.models.registry import RegistryEndpoint
+from kapsa.registry.client import RegistryError, get_registry_client
+from kapsa.registry.manifests import get_manifest_cache
+from kapsa.utils.images import parse_image_reference
+
+logger = get_logger(__name__)
+
+# Tag the operator adds to every build it rolls out:
+# build-<branch slug>-<branch hash>-<YYYYMMDDHHMMSS>
+BUILD_TAG = re.compile(r"^build-(?P<branch>[a-z0-9][a-z0-9_.-]*-[0-9a-f]{8})-(?P<built>\d{14})$")
+
+# Build-number tag kpack adds to every image it pushes: b<N>.<YYYYMMDD>.<HHMMSS>
+KPACK_BUILD_TAG = re.compile(r"^b\d+\.(?P<date>\d{8})\.(?P<time>\d{6})$")
+
+# Readable branch part of a build tag; tags are limited to 128 characters
+MAX_BRANCH_SLUG = 90
+
+# Tags of deletion candidates recorded in status
+MAX_CANDIDATES = 20
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Operator-wide bound on repositories being pruned at once."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_settings().retention_concurrency)
+    return _semaphore
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    global _semaphore
+    if "retention_concurrency" in changed:
+        # Runs already holding the old semaphore finish under the old limit
+        _semaphore = None
+
+
+subscribe(_on_settings_changed)
+
+
+def branch_slug(branch: str) -> str:
+    """Reduce a branch name to the characters a tag may contain."""
+    slug = re.sub(r"[^a-z0-9_.-]+", "-", branch.lower()).strip("-._")
+    return slug[:MAX_BRANCH_SLUG] or "unknown"
+
+
+def branch_key(branch: str) -> str:
+    """
+    Identify a branch within build tags.
+
+    The slug keeps tags readable; the hash of the full name keeps branches
+    apart whose slugs are the same (``feature/a`` and ``feature-a``).
+    """
+    digest = hashlib.sha256(branch.encode()).hexdigest()[:8]
+    return f"{branch_slug(branch)}-{digest}"
+
+
+def build_tag(branch: str, built_at: datetime) -> str:
+    """Return the tag that records which branch a build came from, and when."""
+    return f"build-{branch_key(branch)}-{built_at.strftime('%Y%m%d%H%M%S')}"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Retention settings in effect for one Project."""
+
+    keep_last: int = 10
+    dry_run: bool = False
+
+    @classmethod
+    def resolve(
+        cls, registry: Dict[str, Any], project: Optional[Dict[str, Any]] = None
+    ) -> Optional["RetentionPolicy"]:
+        """
+        Combine a Registry's ``spec.retention`` with a Project's overrides.
+
+        Retention is enabled per Registry; a Project can change ``keepLast``
+        and ``dryRun`` or opt out with ``enabled: false``.
+
+        Args:
+            registry: Registry ``spec.retention``
+            project: Project ``spec.registry.retention``
+
+        Returns:
+            The policy, or None if retention is disabled for the Project
+        """
+        project = project or {}
+        if not registry.get("enabled") or project.get("enabled") is False:
+            return None
+        merged = {**registry, **project}
+        return cls(
+            keep_last=max(int(merged.get("keepLast", 10)), 1),
+            dry_run=bool(merged.get("dryRun")) or get_settings().retention_dry_run,
+        )
+
+
+@dataclass
+class ImageVersion:
+    """One manifest in a repository and the tags pointing at it."""
+
+    digest: str
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RetentionPlan:
+    """Images to keep, with the reason, and images to delete."""
+
+    keep: Dict[str, str]  # digest -> in_use, tagged or recent
+    delete: List[ImageVersion]
+
+
+@dataclass
+class RetentionResult:
+    """Outcome of one retention run."""
+
+    images: int
+    tags: int
+    kept: int
+    deleted: int = 0
+    failed: int = 0
+    dry_run: bool = False
+    candidates: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def plan_retention(
+    versions: Iterable[ImageVersion],
+    policy: RetentionPolicy,
+    default_branch: str,
+    live_branches: Set[str],
+    in_use: Set[str],
+) -> RetentionPlan:
+    """
+    Decide which images of a repository to keep.
+
+    Builds are grouped by branch: the branch in the operator's build tag,
+    or ``default_branch`` for images that only carry kpack build-number tags
+    (builds from before build tagging). An image is kept if:
+
+    - it is among the newest ``keep_last`` builds of a branch in
+      ``live_branches``,
+    - its digest is in use (deployed, or kept for rollback), or
+    - any of its tags is not a build tag (``latest``, release tags, tags
+      pushed by hand).
+
+    Builds of branches nothing builds or tracks any more, such as those of
+    reaped preview environments, are deleted unless in use.
+
+    Args:
+        versions: Images in the repository
+        policy: Retention policy
+        default_branch: Branch the Project builds
+        live_branches: Branches still built or tracked by an Environment
+        in_use: Digests that must not be deleted
+
+    Returns:
+        The plan
+    """
+    keep: Dict[str, str] = {}
+    builds: Dict[str, List[Tuple[str, ImageVersion]]] = {}
+    for version in versions:
+        branch: Optional[str] = None
+        built = ""
+        for tag in version.tags:
+            if match := BUILD_TAG.match(tag):
+                branch = match["branch"]
+                built = max(built, match["built"])
+            elif match := KPACK_BUILD_TAG.match(tag):
+                built = max(built, match["date"] + match["time"])
+            else:
+                keep[version.digest] = "tagged"
+        if version.digest in in_use:
+            keep[version.digest] = "in_use"
+        if built:
+            group = branch or branch_key(default_branch)
+            builds.setdefault(group, []).append((built, version))
+
+    live = {branch_key(b) for b in live_branches}
+    delete: List[ImageVersion] = []
+    for branch, entries in builds.items():
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+        limit = policy.keep_last if branch in live else 0
+        for index, (_, version) in enumerate(entries):
+            if index < limit:
+                keep.setdefault(version.digest, "recent")
+            elif version.digest not in keep:
+                delete.append(version)
+    return RetentionPlan(keep=keep, delete=delete)
+
+
+async def list_versions(
+    endpoint: RegistryEndpoint, repository: str, page_size: int = 100, concurrency: int = 8
+) -> List[ImageVersion]:
+    """
+    List the images in a repository, grouping tags by the digest they point at.
+
+    Tags are listed page by page and resolved with HEAD requests over the
+    Registry's pooled client, ``concurrency`` at a time. The manifest cache
+    is bypassed: ``latest`` and other moving tags must be current before
+    deciding what is unreferenced.
+
+    Args:
+        endpoint: Registry holding the repository
+        repository: Repository path within the registry
+        page_size: Tags requested per listing page
+        concurrency: Manifest lookups in flight
+
+    Returns:
+        One entry per digest
+    """
+    registry_client = get_registry_client(endpoint)
+    tags = [tag async for tag in registry_client.list_tags(repository, page_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(tag: str) -> Tuple[str, Optional[str]]:
+        async with semaphore:
+            info = await registry_client.head_manifest(repository, tag)
+        return tag, info.digest if info is not None else None
+
+    versions: Dict[str, ImageVersion] = {}
+    for tag, digest in await asyncio.gather(*(lookup(tag) for tag in tags)):
+        if digest is not None:  # None: deleted since the listing
+            versions.setdefault(digest, ImageVersion(digest)).tags.append(tag)
+    return list(versions.values())
+
+
+async def prune_repository(
+    endpoint: RegistryEndpoint,
+    repository: str,
+    policy: RetentionPolicy,
+    default_branch: str,
+    live_branches: Set[str],
+    in_use: Set[str],
+) -> RetentionResult:
+    """
+    Apply a retention policy to an image repository.
+
+    Deletion is by digest, which removes every tag of the image, so the
+    plan works on images rather than tags. Deletions are sent in batches of
+    ``retention_delete_batch``; if the registry has deletion disabled
+    (HTTP 405, e.g. ``registry:2`` without ``REGISTRY_STORAGE_DELETE_ENABLED``)
+    the run stops after the first batch. Blobs are only freed by the
+    registry's own garbage collection.
+
+    Args:
+        endpoint: Registry holding the repository
+        repository: Repository path within the registry
+        policy: Retention policy
+        default_branch: Branch the Project builds
+        live_branches: Branches still built or tracked by an Environment
+        in_use: Digests that must not be deleted
+
+    Returns:
+        Counts of images kept, deleted and failed
+
+    Raises:
+        RegistryError: If the repository cannot be listed
+    """
+    settings = get_settings()
+    async with _get_semaphore():
+        started = time.monotonic()
+        versions = await list_versions(
+            endpoint,
+            repository,
+            settings.retention_page_size,
+            settings.retention_lookup_concurrency,
+        )
+        plan = plan_retention(versions, policy, default_branch, live_branches, in_use)
+        result = RetentionResult(
+            images=len(versions),
+            tags=sum(len(v.tags) for v in versions),
+            kept=len(plan.keep),
+            dry_run=policy.dry_run,
+            candidates=sorted(t for v in plan.delete for t in v.tags)[:MAX_CANDIDATES],
+        )
+
+        if not policy.dry_run:
+            await _delete(
+                endpoint, repository, plan.delete, settings.retention_delete_batch, result
+            )
+        result.seconds = round(time.monotonic() - started, 3)
+
+    metrics.retention_duration.observe(result.seconds)
+    metrics.retention_images_total.labels(registry=endpoint.name, result="kept").inc(result.kept)
+    if policy.dry_run:
+        metrics.retention_images_total.labels(registry=endpoint.name, result="dry_run").inc(
+            len(plan.delete)
+        )
+    else:
+        metrics.retention_images_total.labels(registry=endpoint.name, result="deleted").inc(
+            result.deleted
+        )
+        metrics.retention_images_total.labels(registry=endpoint.name, result="failed").inc(
+            result.failed
+        )
+
+    logger.info(
+        "retention_applied",
+        registry=endpoint.name,
+        repository=repository,
+        images=result.images,
+        kept=result.kept,
+        candidates=len(plan.delete),
+        deleted=result.deleted,
+        failed=result.failed,
+        dry_run=policy.dry_run,
+        seconds=result.seconds,
+    )
+    return result
+
+
+async def _delete(
+    endpoint: RegistryEndpoint,
+    repository: str,
+    versions: List[ImageVersion],
+    batch_size: int,
+    result: RetentionResult,
+) -> None:
+    """Delete images by digest in bounded batches, counting into ``result``."""
+    registry_client = get_registry_client(endpoint)
+    batch_size = max(batch_size, 1)
+    for start in range(0, len(versions), batch_size):
+        batch = versions[start : start + batch_size]
+        outcomes = await asyncio.gather(
+            *(registry_client.delete_manifest(repository, v.digest) for v in batch),
+            return_exceptions=True,
+        )
+        unsupported = False
+        for version, outcome in zip(batch, outcomes, strict=True):
+            if isinstance(outcome, RegistryError):
+                result.failed += 1
+                unsupported = unsupported or outcome.status == 405
+                logger.warning(
+                    "image_delete_failed",
+                    registry=endpoint.name,
+                    repository=repository,
+                    digest=version.digest,
+                    tags=version.tags,
+                    error=str(outcome),
+                )
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                result.deleted += 1
+        if unsupported:
+            result.failed += len(versions) - start - len(batch)
+            break
+
+    if result.deleted:
+        get_manifest_cache().invalidate(endpoint.name, repository)
+
+
+async def tag_build(
+    endpoint: RegistryEndpoint, image: str, branch: str, built_at: Optional[str] = None
+) -> Optional[str]:
+    """
+    Tag a digest-pinned build with its branch and build time.
+
+    The tag lets retention keep the newest builds per branch and drop the
+    builds of branches that are gone. Failures are logged, not raised: an
+    untagged build is attributed to the Project's branch.
+
+    Args:
+        endpoint: Registry holding the image
+        image: Digest-pinned image reference
+        branch: Git branch the image was built from
+        built_at: When the build finished (RFC 3339); defaults to now
+
+    Returns:
+        The tag, or None if the image could not be tagged
+    """
+    ref = parse_image_reference(image)
+    if ref.digest is None:
+        return None
+
+    when = datetime.now(timezone.utc)
+    if built_at:
+        try:
+            when = datetime.fromisoformat(built_at.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    tag = build_tag(branch, when)
+
+    registry_client = get_registry_client(endpoint)
+    try:
+        manifest, media_type = await registry_client.get_manifest(ref.repository, ref.digest)
+        await registry_client.put_manifest(ref.repository, tag, manifest, media_type)
+    except RegistryError as e:
+        logger.warning(
+            "build_tag_failed",
+            registry=endpoint.name,
+            image=image,
+            tag=tag,
+            error=str(e),
+        )
+        return None
+
+    logger.debug("build_tagged", registry=endpoint.name, image=image, tag=tag)
+    return tag
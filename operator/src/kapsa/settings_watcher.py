@@ -0,0 +1,123 @@
+"""Live settings overrides from a ConfigMap."""
+
+import asyncio
+import threading
+from typing import Mapping, Optional
+
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
+
+from kapsa import metrics
+from kapsa.config import RESTART_REQUIRED, apply_overrides, parse_overrides
+from kapsa.logging import get_logger
+from kapsa.utils.kube import load_client_config, run_sync
+
+logger = get_logger(__name__)
+
+
+class SettingsWatcher:
+    """
+    Applies the operator ConfigMap to the live settings.
+
+    The ConfigMap is read once on start, then watched from a background
+    thread (one object, selected by name, so the watch is cheap). Changes
+    are applied on the event loop, where settings subscribers run. Deleting
+    the ConfigMap reverts every setting to its environment value.
+    """
+
+    def __init__(self, name: str, namespace: str, timeout: int = 300) -> None:
+        self.name = name
+        self.namespace = namespace
+        self._timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stream: Optional[watch.Watch] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[Mapping[str, str]] = None
+
+    async def start(self) -> None:
+        """Apply the current ConfigMap and start watching it."""
+        self._loop = asyncio.get_running_loop()
+        await run_sync(load_client_config)
+        v1 = client.CoreV1Api()
+        resource_version = None
+        try:
+            config_map = await run_sync(v1.read_namespaced_config_map, self.name, self.namespace)
+            if config_map.metadata is not None:
+                resource_version = config_map.metadata.resource_version
+            self.apply(config_map.data or {})
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            logger.info("settings_configmap_missing", name=self.name, namespace=self.namespace)
+
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(resource_version,),
+            name="kapsa-settings-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stopped.set()
+        if self._stream is not None:
+            self._stream.stop()
+
+    def apply(self, data: Mapping[str, str]) -> None:
+        """Apply ConfigMap data, keeping the current settings if it is invalid."""
+        if data == self._last:
+            return
+        self._last = dict(data)
+
+        try:
+            restart = set(parse_overrides(data)) & RESTART_REQUIRED
+            changed = apply_overrides(data)
+        except ValueError as e:
+            logger.error("settings_reload_failed", configmap=self.name, error=str(e))
+            metrics.settings_reload_total.labels(result="invalid").inc()
+            return
+
+        if restart:
+            logger.warning("settings_require_restart", settings=sorted(restart))
+        if changed:
+            logger.info("settings_reloaded", changed=sorted(changed))
+        metrics.settings_reload_total.labels(result="applied").inc()
+
+    def _watch(self, resource_version: Optional[str]) -> None:
+        """Watch loop run in the background thread."""
+        v1 = client.CoreV1Api()
+        while not self._stopped.is_set():
+            self._stream = watch.Watch()
+            try:
+                for event in self._stream.stream(
+                    v1.list_namespaced_config_map,
+                    self.namespace,
+                    field_selector=f"metadata.name={self.name}",
+                    resource_version=resource_version,
+                    timeout_seconds=self._timeout,
+                ):
+                    if event["type"] == "ERROR":  # Expired resource version, re-list
+                        resource_version = None
+                        break
+                    obj = event["object"]
+                    resource_version = obj.metadata.resource_version
+                    data = {} if event["type"] == "DELETED" else obj.data or {}
+                    self._dispatch(data)
+            except ApiException as e:
+                if e.status == 410:  # Gone: resource version too old, re-list
+                    resource_version = None
+                    continue
+                self._retry_later(e)
+            except Exception as e:  # Connection errors; keep watching
+                self._retry_later(e)
+
+    def _retry_later(self, error: Exception) -> None:
+        if not self._stopped.is_set():
+            logger.warning("settings_watch_failed", error=str(error))
+            self._stopped.wait(10)
+
+    def _dispatch(self, data: Mapping[str, str]) -> None:
+        if self._loop is not None and not self._stopped.is_set():
+            self._loop.call_soon_threadsafe(self.apply, data)
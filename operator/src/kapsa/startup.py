@@ -0,0 +1,128 @@
+"""Startup phase timing and background warm-up of heavy client modules."""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from kapsa import metrics
+from kapsa.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Phases in the order they normally complete
+PHASES = ("import", "config", "client_init", "first_watch", "first_reconcile")
+
+
+def process_start_time() -> float:
+    """
+    Wall-clock time the operator process started.
+
+    Read from ``/proc`` so interpreter start-up and kopf's own imports are
+    included; falls back to the first import of this module elsewhere.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rpartition(")")[2].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class StartupTimer:
+    """
+    Records when each startup phase completes, relative to process start.
+
+    Each phase is recorded once, as a gauge and a ``startup_phase`` log line;
+    when the last phase completes, a ``startup_complete`` line carries the
+    full breakdown. Phases recorded before logging is configured are logged
+    by ``start_reporting``.
+    """
+
+    def __init__(self, started: Optional[float] = None) -> None:
+        self.started = started if started is not None else process_start_time()
+        self.phases: Dict[str, float] = {}
+        self._reporting = False
+        self._lock = threading.Lock()
+
+    def start_reporting(self) -> None:
+        """Log the phases recorded so far, and each later one as it completes."""
+        with self._lock:
+            self._reporting = True
+            recorded = dict(self.phases)
+        for phase, elapsed in recorded.items():
+            self._report(phase, elapsed)
+
+    def mark(self, phase: str, at: Optional[float] = None) -> None:
+        """
+        Record that ``phase`` has completed (later calls are ignored).
+
+        Args:
+            phase: Phase name
+            at: Wall-clock completion time, if not now
+        """
+        if phase in self.phases:
+            return
+        with self._lock:
+            if phase in self.phases:
+                return
+            elapsed = round((at if at is not None else time.time()) - self.started, 3)
+            self.phases[phase] = elapsed
+            if not self._reporting:
+                return
+
+        self._report(phase, elapsed)
+
+    def _report(self, phase: str, elapsed: float) -> None:
+        metrics.startup_phase_seconds.labels(phase=phase).set(elapsed)
+        logger.info("startup_phase", phase=phase, seconds=elapsed)
+        if phase == PHASES[-1]:
+            logger.info(
+                "startup_complete",
+                **{f"{name}_seconds": self.phases.get(name) for name in PHASES},
+            )
+
+    def done(self, phase: str) -> bool:
+        """Whether ``phase`` has been recorded."""
+        return phase in self.phases
+
+
+_timer = StartupTimer()
+
+
+def get_startup_timer() -> StartupTimer:
+    """Return the process-wide startup timer."""
+    return _timer
+
+
+def warm_up_clients() -> threading.Thread:
+    """
+    Load client configuration and import the Kubernetes API modules in the background.
+
+    ``kubernetes.client`` builds its API classes and models on first use,
+    which takes most of a second for ``CoreV1Api`` alone. Started from the
+    operator's startup handler (once logging is configured), the work
+    overlaps with kopf logging in and establishing its watches instead of
+    delaying either. Marks the ``client_init`` phase when done.
+    """
+
+    def run() -> None:
+        from kubernetes import client
+
+        from kapsa.utils.kube import get_dynamic_client_sync, load_client_config
+
+        try:
+            load_client_config()
+            client.CoreV1Api()
+            client.AppsV1Api()
+            client.CustomObjectsApi()
+            get_dynamic_client_sync()
+        except Exception as e:  # Handlers will load what they need themselves
+            logger.warning("client_warm_up_failed", error=str(e))
+        _timer.mark("client_init")
+
+    thread = threading.Thread(target=run, name="kapsa-client-warm-up", daemon=True)
+    thread.start()
+    return thread
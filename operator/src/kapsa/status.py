@@ -0,0 +1,277 @@
+"""Coalesced status writes for Kapsa CRDs."""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple, cast
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+GROUP = "kapsa-project.io"
+VERSION = "v1alpha1"
+
+ObjectKey = Tuple[str, Optional[str], str]
+
+# Failed writes worth retrying on their own; others wait for the next update
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def merge_conditions(
+    existing: List[Dict[str, Any]],
+    updates: List[Dict[str, Any]],
+    now: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Merge conditions by type.
+
+    ``lastTransitionTime`` is only set when a condition's status changes (or
+    the condition is new); a new reason or message alone keeps the previous
+    transition time. Conditions not mentioned in ``updates`` are kept.
+
+    Args:
+        existing: Conditions currently in status
+        updates: Conditions to apply
+        now: Transition timestamp to use (defaults to the current time)
+
+    Returns:
+        Merged conditions
+    """
+    now = now or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    merged = {c["type"]: dict(c) for c in existing}
+    order = [c["type"] for c in existing]
+
+    for update in updates:
+        current = merged.get(update["type"])
+        new = dict(update)
+        if current is not None and current.get("status") == new.get("status"):
+            new["lastTransitionTime"] = current.get("lastTransitionTime", now)
+        else:
+            new["lastTransitionTime"] = now
+        if current is None:
+            order.append(update["type"])
+        merged[update["type"]] = new
+
+    return [merged[t] for t in order]
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply a JSON merge patch (RFC 7386) to a copy of ``target``.
+
+    Mirrors what the API server does with a status patch: nested objects are
+    merged, ``None`` removes a key, anything else replaces the value.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    merged = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = merge_patch(merged.get(key), value)
+    return merged
+
+
+def combine_patches(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two merge patches into one that applies both, ``second`` last."""
+    combined = dict(first)
+    for key, value in second.items():
+        if isinstance(value, dict) and isinstance(combined.get(key), dict):
+            combined[key] = combine_patches(combined[key], value)
+        else:
+            combined[key] = value
+    return combined
+
+
+class StatusManager:
+    """
+    Shared writer for the status of Kapsa objects.
+
+    Updates that would not change the object's status are dropped. The rest
+    are merged per object and flushed as a single status patch ``debounce``
+    seconds after the first pending update, so bursts of events produce one
+    write (and one resulting watch event) instead of many. Nested fields are
+    merge-patched like the API server does, so an update that only sets part
+    of e.g. ``rollout`` neither rewrites nor drops the rest of it.
+    """
+
+    def __init__(self, debounce: float = 1.0) -> None:
+        self.debounce = debounce
+        self._known: Dict[ObjectKey, Dict[str, Any]] = {}
+        self._pending: Dict[ObjectKey, Dict[str, Any]] = {}
+        self._flushes: Dict[ObjectKey, "asyncio.Task[None]"] = {}
+
+    def update(
+        self,
+        plural: str,
+        name: str,
+        namespace: Optional[str],
+        current: Mapping[str, Any],
+        conditions: Optional[List[Dict[str, Any]]] = None,
+        generation: Optional[int] = None,
+        **fields: Any,
+    ) -> bool:
+        """
+        Queue a status change for an object.
+
+        Args:
+            plural: Kapsa resource plural (e.g. "projects")
+            name: Object name
+            namespace: Object namespace, or None for cluster-scoped kinds
+            current: The object's status as last seen by the caller; it takes
+                precedence over what the manager last wrote
+            conditions: Conditions to merge by type
+            generation: ``metadata.generation`` the status reflects
+            **fields: Other top-level status fields to set
+
+        Returns:
+            True if a write was queued, False if the update was a no-op
+        """
+        key: ObjectKey = (plural, namespace, name)
+        known = merge_patch(
+            {**self._known.get(key, {}), **dict(current)}, self._pending.get(key, {})
+        )
+
+        patch: Dict[str, Any] = {
+            k: v for k, v in fields.items() if merge_patch(known.get(k), v) != known.get(k)
+        }
+        if conditions:
+            merged = merge_conditions(known.get("conditions") or [], conditions)
+            if merged != known.get("conditions"):
+                patch["conditions"] = merged
+        if generation is not None and known.get("observedGeneration") != generation:
+            patch["observedGeneration"] = generation
+
+        if not patch:
+            metrics.status_patch_total.labels(kind=plural, result="skipped").inc()
+            return False
+
+        if key in self._pending:
+            metrics.status_patch_total.labels(kind=plural, result="coalesced").inc()
+        self._pending[key] = combine_patches(self._pending.get(key, {}), patch)
+
+        if key not in self._flushes:
+            self._flushes[key] = asyncio.ensure_future(self._flush_later(key))
+        return True
+
+    def forget(self, plural: str, name: str, namespace: Optional[str]) -> None:
+        """Drop cached and pending status for a deleted object."""
+        key: ObjectKey = (plural, namespace, name)
+        self._known.pop(key, None)
+        self._pending.pop(key, None)
+        task = self._flushes.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    async def flush_all(self) -> None:
+        """Write every pending update now (used on shutdown)."""
+        for task in list(self._flushes.values()):
+            task.cancel()
+        self._flushes.clear()
+        await asyncio.gather(*(self._write(key) for key in list(self._pending)))
+
+    async def _flush_later(self, key: ObjectKey) -> None:
+        try:
+            await asyncio.sleep(self.debounce)
+        finally:
+            self._flushes.pop(key, None)
+        await self._write(key)
+
+    async def _write(self, key: ObjectKey) -> None:
+        patch = self._pending.pop(key, None)
+        if not patch:
+            return
+
+        plural, namespace, name = key
+        api = client.CustomObjectsApi()
+        try:
+            if namespace is None:
+                await run_sync(
+                    api.patch_cluster_custom_object_status,
+                    GROUP,
+                    VERSION,
+                    plural,
+                    name,
+                    {"status": patch},
+                )
+            else:
+                await run_sync(
+                    api.patch_namespaced_custom_object_status,
+                    GROUP,
+                    VERSION,
+                    namespace,
+                    plural,
+                    name,
+                    {"status": patch},
+                )
+        except ApiException as e:
+            if e.status == 404:  # Deleted in the meantime
+                self._known.pop(key, None)
+                return
+            logger.error(
+                "status_patch_failed",
+                kind=plural,
+                name=name,
+                namespace=namespace,
+                error=str(e),
+            )
+            metrics.status_patch_total.labels(kind=plural, result="failed").inc()
+            # Keep the fields for the next flush; updates queued meanwhile win
+            self._pending[key] = combine_patches(patch, self._pending.get(key, {}))
+            if e.status in RETRY_STATUSES and key not in self._flushes:
+                self._flushes[key] = asyncio.ensure_future(self._flush_later(key))
+            return
+
+        self._known[key] = merge_patch(self._known.get(key, {}), patch)
+        metrics.status_patch_total.labels(kind=plural, result="written").inc()
+
+
+async def fetch_status(
+    plural: str, name: str, namespace: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Read an object's current status, for callers that only hold a related object.
+
+    Returns:
+        The status (empty if unset), or None if the object does not exist
+    """
+    api = client.CustomObjectsApi()
+    try:
+        if namespace is None:
+            obj = await run_sync(api.get_cluster_custom_object, GROUP, VERSION, plural, name)
+        else:
+            obj = await run_sync(
+                api.get_namespaced_custom_object, GROUP, VERSION, namespace, plural, name
+            )
+    except ApiException as e:
+        if e.status == 404:
+            return None
+        raise
+    status: Dict[str, Any] = cast(Dict[str, Any], obj).get("status") or {}
+    return status
+
+
+_manager: Optional[StatusManager] = None
+
+
+def get_status_manager() -> StatusManager:
+    """Return the status manager shared by all controllers."""
+    global _manager
+    if _manager is None:
+        _manager = StatusManager(debounce=get_settings().status_debounce)
+    return _manager
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    if _manager is not None and "status_debounce" in changed:
+        _manager.debounce = settings.status_debounce
+
+
+subscribe(_on_settings_changed)
@@ -0,0 +1,175 @@
+"""Bounded, concurrent namespace teardown with progress tracking."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa import metrics
+from kapsa.config import Settings, get_settings, subscribe
+from kapsa.logging import get_logger
+from kapsa.utils.kube import run_sync
+
+logger = get_logger(__name__)
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+@dataclass
+class TeardownResult:
+    """Outcome of one teardown pass."""
+
+    deleted: List[str] = field(default_factory=list)
+    pending: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        """Whether every namespace is gone."""
+        return not self.pending
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Operator-wide bound on namespace deletions issued at once."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_settings().teardown_concurrency)
+    return _semaphore
+
+
+def _on_settings_changed(settings: Settings, changed: Set[str]) -> None:
+    global _semaphore
+    if "teardown_concurrency" in changed:
+        # Teardowns already holding the old semaphore finish under the old limit
+        _semaphore = None
+
+
+subscribe(_on_settings_changed)
+
+
+async def teardown_namespaces(
+    names: Iterable[str],
+    wait_timeout: Optional[float] = None,
+    **log_context: str,
+) -> TeardownResult:
+    """
+    Delete namespaces concurrently and wait until they are actually gone.
+
+    Deletions use background propagation: the API call returns at once and
+    the namespace controller removes the contents. Each namespace is then
+    polled until it is gone or ``wait_timeout`` passes, in which case
+    whatever is still blocking it (finalizers, remaining content) is
+    reported in ``TeardownResult.pending``. Waiting holds no worker thread
+    and no slot of the deletion semaphore.
+
+    Args:
+        names: Namespaces to delete
+        wait_timeout: Seconds to wait for each namespace to disappear
+        **log_context: Extra fields for log lines (e.g. project)
+
+    Returns:
+        Which namespaces are gone and which are still terminating
+    """
+    timeout = wait_timeout if wait_timeout is not None else get_settings().teardown_wait_timeout
+    names = list(names)
+    outcomes = await asyncio.gather(
+        *(_teardown_namespace(name, timeout, log_context) for name in names)
+    )
+
+    result = TeardownResult()
+    for name, blockers in zip(names, outcomes, strict=True):
+        if blockers is None:
+            result.deleted.append(name)
+        else:
+            result.pending[name] = blockers
+    return result
+
+
+async def _teardown_namespace(
+    name: str, timeout: float, log_context: Dict[str, str]
+) -> Optional[List[str]]:
+    """Delete one namespace and wait for it; return blockers if it is still there."""
+    v1 = client.CoreV1Api()
+
+    async with _get_semaphore():
+        try:
+            await run_sync(v1.delete_namespace, name, propagation_policy="Background")
+            logger.info("namespace_deleting", namespace=name, **log_context)
+        except ApiException as e:
+            if e.status == 404:  # Not found
+                return None
+            if e.status != 409:  # Already terminating
+                logger.error(
+                    "namespace_deletion_failed",
+                    namespace=name,
+                    error=str(e),
+                    **log_context,
+                )
+                return [f"delete failed: {e.reason}"]
+
+    try:
+        namespace = await _wait_for_deletion(v1, name, timeout)
+    except ApiException as e:
+        return [f"unable to read namespace: {e.reason}"]
+    if namespace is None:
+        logger.info("namespace_deleted", namespace=name, **log_context)
+        return None
+
+    blockers = _describe_blockers(namespace)
+    metrics.namespace_teardown_stuck_total.inc()
+    logger.warning(
+        "namespace_teardown_stuck",
+        namespace=name,
+        blockers=blockers,
+        **log_context,
+    )
+    return blockers
+
+
+async def _wait_for_deletion(
+    v1: "client.CoreV1Api", name: str, timeout: float
+) -> Optional["client.V1Namespace"]:
+    """Poll until the namespace is gone; return it if it is still there at the timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            namespace = await run_sync(v1.read_namespace, name)
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            raise
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return namespace
+        await asyncio.sleep(min(get_settings().teardown_poll_interval, remaining))
+
+
+def _describe_blockers(namespace: "client.V1Namespace") -> List[str]:
+    """Explain why a terminating namespace has not gone away."""
+    spec = namespace.spec or client.V1NamespaceSpec()
+    status = namespace.status or client.V1NamespaceStatus()
+    blockers = [f"finalizer {f}" for f in (spec.finalizers or [])]
+    blockers.extend(
+        f"{c.type}: {c.message}" for c in (status.conditions or []) if c.status == "True"
+    )
+    return blockers or [f"phase {status.phase}"]
+
+
+async def list_project_namespaces(project_name: str, parent_namespace: str) -> List[str]:
+    """Return every namespace owned by a Project (its own and its previews')."""
+    v1 = client.CoreV1Api()
+    namespaces = await run_sync(
+        v1.list_namespace,
+        label_selector=f"kapsa-project.io/project={project_name}",
+    )
+    return [
+        ns.metadata.name
+        for ns in namespaces.items
+        if ns.metadata is not None
+        and ns.metadata.name is not None
+        and (ns.metadata.annotations or {}).get("kapsa-project.io/parent-namespace")
+        in (None, parent_namespace)
+    ]
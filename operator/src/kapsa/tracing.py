@@ -0,0 +1,266 @@
+"""
+OpenTelemetry tracing of source changes, from detection to rollout.
+
+A trace starts when a git poll detects a new commit. Later steps of the
+same change run in other handlers (the build tracker, the rollout tracker),
+so the trace is handed on in a W3C ``traceparent`` annotation on the object
+each of them watches: the kpack Image and the Environment's Deployment.
+Steps the operator only observes (the kpack build, a Deployment rolling
+out) are recorded afterwards from their start and end times.
+
+Tracing is optional. Without the ``opentelemetry`` packages
+(``pip install kapsa-operator[tracing]``) or with ``tracing_enabled`` off,
+every helper here is a no-op.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from kapsa import __version__
+from kapsa.config import Settings, get_settings
+from kapsa.logging import get_logger
+
+logger = get_logger(__name__)
+
+TRACEPARENT_ANNOTATION = "kapsa-project.io/traceparent"
+
+_tracer: Optional[Any] = None
+_provider: Optional[Any] = None
+_file: Optional[TextIO] = None  # Written by the file exporter
+
+
+def configure_tracing() -> None:
+    """Set up the tracer provider and exporter if tracing is enabled."""
+    global _tracer, _provider
+    settings = get_settings()
+    if not settings.tracing_enabled or _provider is not None:
+        return
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+        exporter = _create_exporter(settings)
+    except ImportError as e:
+        logger.warning("tracing_unavailable", error=str(e))
+        return
+
+    # Continued traces follow the sampling decision carried in traceparent
+    provider = TracerProvider(
+        resource=Resource.create(
+            {"service.name": "kapsa-operator", "service.version": __version__}
+        ),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    # Spans are exported in batches from a background thread
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    _tracer = provider.get_tracer("kapsa", __version__)
+    logger.info(
+        "tracing_enabled",
+        exporter=settings.tracing_exporter,
+        endpoint=settings.tracing_endpoint,
+        sample_ratio=settings.tracing_sample_ratio,
+    )
+
+
+def _create_exporter(settings: Settings) -> Any:
+    global _file
+    if settings.tracing_exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        _file = open(settings.tracing_file, "a", buffering=1)
+        return ConsoleSpanExporter(
+            out=_file, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    # Without an endpoint the OTEL_EXPORTER_OTLP_* variables apply
+    return OTLPSpanExporter(endpoint=settings.tracing_endpoint)
+
+
+def tracing_active() -> bool:
+    """Whether spans are being recorded, for skipping span bookkeeping on hot paths."""
+    return _tracer is not None
+
+
+def shutdown_tracing() -> None:
+    """Export the spans still buffered and close the trace file (used on shutdown)."""
+    global _file
+    if _provider is not None:
+        _provider.shutdown()
+    if _file is not None:
+        _file.close()
+        _file = None
+
+
+@contextmanager
+def span(
+    name: str,
+    parent: Optional[str] = None,
+    start_time: Optional[float] = None,
+    **attributes: Any,
+) -> Iterator[Optional[Any]]:
+    """
+    Run a block in a span.
+
+    Args:
+        name: Span name
+        parent: ``traceparent`` of the trace to continue; the current span's
+            trace if not given, or a new trace if there is none
+        start_time: When the span started (Unix time), if before the block
+        **attributes: Span attributes; None values are left out
+
+    Yields:
+        The span, or None if tracing is disabled
+    """
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(
+        name,
+        context=_extract(parent) if parent else None,
+        start_time=_nanoseconds(start_time),
+        attributes=_attributes(attributes),
+    ) as current:
+        yield current
+
+
+@contextmanager
+def child_span(
+    name: str, parent: Optional[str] = None, **attributes: Any
+) -> Iterator[Optional[Any]]:
+    """
+    Like :func:`span`, but only within an existing trace.
+
+    The span continues the trace ``parent`` names, or the current span's;
+    without either, the block runs untraced.
+    """
+    context = _parent_context(parent)
+    if _tracer is None or context is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(
+        name, context=context, attributes=_attributes(attributes)
+    ) as current:
+        yield current
+
+
+def record_span(
+    name: str,
+    start_time: Optional[float],
+    end_time: Optional[float] = None,
+    parent: Optional[str] = None,
+    error: Optional[str] = None,
+    **attributes: Any,
+) -> None:
+    """
+    Record a span for something that already happened.
+
+    Like :func:`child_span`, the span only belongs to an existing trace.
+
+    Args:
+        name: Span name
+        start_time: When it started (Unix time); nothing is recorded if unknown
+        end_time: When it ended (Unix time), now if not given
+        parent: ``traceparent`` of the trace it belongs to; the current span's
+            trace if not given
+        error: Error description, marking the span as failed
+        **attributes: Span attributes; None values are left out
+    """
+    context = _parent_context(parent)
+    if _tracer is None or context is None or start_time is None:
+        return
+
+    from opentelemetry.trace import Status, StatusCode
+
+    if end_time is None:
+        end_time = time.time()
+    recorded = _tracer.start_span(
+        name,
+        context=context,
+        start_time=_nanoseconds(start_time),
+        attributes=_attributes(attributes),
+    )
+    if error is not None:
+        recorded.set_status(Status(StatusCode.ERROR, error))
+    recorded.end(end_time=_nanoseconds(max(end_time, start_time)))
+
+
+def current_traceparent() -> Optional[str]:
+    """
+    ``traceparent`` of the current span, for handing the trace on.
+
+    Returns None if tracing is disabled and an empty string outside a
+    trace, so that an annotation carrying it can be cleared.
+    """
+    if _tracer is None:
+        return None
+
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+    carrier: Dict[str, str] = {}
+    TraceContextTextMapPropagator().inject(carrier)
+    return carrier.get("traceparent", "")
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[float]:
+    """
+    Unix time of an RFC 3339 timestamp from an object.
+
+    E.g. a condition's ``lastTransitionTime``; None if missing or malformed.
+    """
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def add_trace_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """structlog processor that adds the current trace and span IDs to log lines."""
+    if _tracer is None:
+        return event_dict
+
+    from opentelemetry import trace
+
+    context = trace.get_current_span().get_span_context()
+    if context.is_valid:
+        event_dict["trace_id"] = format(context.trace_id, "032x")
+        event_dict["span_id"] = format(context.span_id, "016x")
+    return event_dict
+
+
+def _parent_context(traceparent: Optional[str]) -> Optional[Any]:
+    """Context of the trace to continue, or None if there is none."""
+    if _tracer is None:
+        return None
+
+    from opentelemetry import context, trace
+
+    parent = _extract(traceparent) if traceparent else context.get_current()
+    if not trace.get_current_span(parent).get_span_context().is_valid:
+        return None
+    return parent
+
+
+def _extract(traceparent: str) -> Any:
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+    return TraceContextTextMapPropagator().extract({"traceparent": traceparent})
+
+
+def _nanoseconds(timestamp: Optional[float]) -> Optional[int]:
+    return int(timestamp * 1e9) if timestamp is not None else None
+
+
+def _attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {f"kapsa.{k}": v for k, v in attributes.items() if v is not None}
@@ -0,0 +1,307 @@
+"""Utility functions for Environment workloads."""
+
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from kapsa.tracing import TRACEPARENT_ANNOTATION
+from kapsa.utils.images import parse_image_reference
+
+DEPLOY_STARTED_ANNOTATION = "kapsa-project.io/deploy-started-at"
+
+# Set by the Deployment controller on a Deployment and its ReplicaSets
+REVISION_ANNOTATION = "deployment.kubernetes.io/revision"
+
+# Labels on every workload the operator creates, and on their ReplicaSets and pods
+MANAGED_LABELS = {"app.kubernetes.io/managed-by": "kapsa"}
+
+# Resources of each pre-pull container; the image itself never does real work
+PREPULL_RESOURCES = {
+    "requests": {"cpu": "1m", "memory": "8Mi"},
+    "limits": {"cpu": "50m", "memory": "32Mi"},
+}
+
+
+def create_deployment_spec(
+    name: str,
+    namespace: str,
+    image: str,
+    project: str,
+    runtime: Dict[str, Any],
+    env: List[Dict[str, Any]],
+    progress_deadline: int = 600,
+    started_at: Optional[str] = None,
+    traceparent: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Create a Deployment specification for an Environment.
+
+    Digest-pinned images use ``imagePullPolicy: IfNotPresent``: the reference
+    can never point at different content, so nodes that already have the
+    image skip the pull and every replica runs the same build.
+
+    Args:
+        name: Environment name (also used for the Deployment)
+        namespace: Namespace of the Environment
+        image: Container image reference, preferably ``repository@digest``
+        project: Owning Project name
+        runtime: Environment ``spec.runtime``
+        env: Environment ``spec.env``, passed through as container env entries
+        progress_deadline: Seconds before a stalled rollout is reported as failed
+        started_at: When the deploy started (e.g. when the image was built), recorded
+            as an annotation so the rollout tracker can measure deploy duration
+        traceparent: Trace the rollout belongs to, recorded as an annotation so
+            the rollout tracker can add its span (empty for none)
+
+    Returns:
+        Deployment resource dict
+    """
+    labels = {
+        "app.kubernetes.io/name": name,
+        "app.kubernetes.io/managed-by": "kapsa",
+        "kapsa-project.io/project": project,
+        "kapsa-project.io/environment": name,
+    }
+    annotations = {}
+    if started_at:
+        annotations[DEPLOY_STARTED_ANNOTATION] = started_at
+    if traceparent is not None:
+        annotations[TRACEPARENT_ANNOTATION] = traceparent
+    pull_policy = "IfNotPresent" if parse_image_reference(image).pinned else "Always"
+
+    container: Dict[str, Any] = {
+        "name": "app",
+        "image": image,
+        "imagePullPolicy": pull_policy,
+        "env": [dict(e) for e in env],
+    }
+    if runtime.get("ports"):
+        container["ports"] = runtime["ports"]
+    if runtime.get("resources"):
+        container["resources"] = runtime["resources"]
+
+    pod_spec: Dict[str, Any] = {"containers": [container]}
+    for field in ("nodeSelector", "affinity", "tolerations"):
+        if runtime.get(field):
+            pod_spec[field] = runtime[field]
+
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "labels": labels,
+            "annotations": annotations,
+        },
+        "spec": {
+            "replicas": runtime.get("replicas", 1),
+            "progressDeadlineSeconds": progress_deadline,
+            "selector": {"matchLabels": {"kapsa-project.io/environment": name}},
+            "template": {
+                "metadata": {"labels": labels},
+                "spec": pod_spec,
+            },
+        },
+    }
+
+
+def create_prepull_daemonset_spec(
+    name: str,
+    namespace: str,
+    image: str,
+    project: str,
+    command: List[str],
+    pause_image: str,
+    node_selector: Optional[Dict[str, str]] = None,
+    placement: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Create a DaemonSet specification that pulls an image onto nodes.
+
+    The image runs as an init container whose ``command`` exits at once, so
+    every selected node pulls it without running the application. A pause
+    container then keeps the pod Ready, which lets the DaemonSet status
+    report how many nodes have the image.
+
+    Args:
+        name: DaemonSet name
+        namespace: Namespace of the Project's Environments
+        image: Image reference to pull, pinned by digest
+        project: Owning Project name
+        command: Command that exits successfully in ``image``
+        pause_image: Image for the container that keeps the pod alive
+        node_selector: Nodes to pull onto (all schedulable nodes if empty)
+        placement: Where the Environments run, from :func:`node_placement`; the
+            DaemonSet only warms nodes their pods can be scheduled on
+
+    Returns:
+        DaemonSet resource dict
+    """
+    labels = {
+        "app.kubernetes.io/name": name,
+        "app.kubernetes.io/managed-by": "kapsa",
+        "app.kubernetes.io/component": "prepull",
+        "kapsa-project.io/project": project,
+    }
+
+    pod_spec: Dict[str, Any] = {
+        "initContainers": [
+            {
+                "name": "pull",
+                "image": image,
+                "imagePullPolicy": "IfNotPresent",
+                "command": command,
+                "resources": PREPULL_RESOURCES,
+            }
+        ],
+        "containers": [
+            {
+                "name": "pause",
+                "image": pause_image,
+                "imagePullPolicy": "IfNotPresent",
+                "resources": PREPULL_RESOURCES,
+            }
+        ],
+        "automountServiceAccountToken": False,
+        "enableServiceLinks": False,
+        "terminationGracePeriodSeconds": 0,
+    }
+    pod_spec.update(placement or {})
+    if node_selector:
+        pod_spec["nodeSelector"] = {**pod_spec.get("nodeSelector", {}), **node_selector}
+
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "DaemonSet",
+        "metadata": {"name": name, "namespace": namespace, "labels": labels},
+        "spec": {
+            "selector": {"matchLabels": {"app.kubernetes.io/name": name}},
+            # Replace every node's pod at once when a newer image is warmed
+            "updateStrategy": {
+                "type": "RollingUpdate",
+                "rollingUpdate": {"maxUnavailable": "100%"},
+            },
+            "template": {"metadata": {"labels": labels}, "spec": pod_spec},
+        },
+    }
+
+
+def node_placement(runtime: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    The node constraints of an Environment's pods, as pod spec fields.
+
+    Only what decides which nodes a pod can land on is kept: the node
+    selector, node affinity and tolerations (pod affinity depends on other
+    pods and cannot be applied to a DaemonSet).
+
+    Args:
+        runtime: Environment ``spec.runtime``
+
+    Returns:
+        ``nodeSelector``, ``affinity`` and ``tolerations``, where set
+    """
+    placement: Dict[str, Any] = {}
+    if runtime.get("nodeSelector"):
+        placement["nodeSelector"] = dict(runtime["nodeSelector"])
+    node_affinity = (runtime.get("affinity") or {}).get("nodeAffinity")
+    if node_affinity:
+        placement["affinity"] = {"nodeAffinity": node_affinity}
+    if runtime.get("tolerations"):
+        placement["tolerations"] = list(runtime["tolerations"])
+    return placement
+
+
+class RolloutState(NamedTuple):
+    """Progress of a Deployment rollout, derived from its status."""
+
+    state: str  # Rolling, Ready or Failed
+    reason: str
+    message: str
+    replicas: int
+    updated_replicas: int
+    ready_replicas: int
+
+
+def get_rollout_state(deployment: Mapping[str, Any]) -> RolloutState:
+    """
+    Work out where a Deployment's rollout stands, as ``kubectl rollout status`` does.
+
+    A rollout is Ready once the controller has observed the latest spec and
+    every desired replica is updated and available with no old replicas
+    left. It has Failed when the ``Progressing`` condition reports
+    ``ProgressDeadlineExceeded``. Anything else is still Rolling.
+
+    Args:
+        deployment: Deployment resource dict
+
+    Returns:
+        The rollout state
+    """
+    metadata = deployment.get("metadata", {})
+    spec = deployment.get("spec", {})
+    status = deployment.get("status") or {}
+
+    desired = spec.get("replicas", 1)
+    replicas = status.get("replicas", 0)
+    updated = status.get("updatedReplicas", 0)
+    ready = status.get("readyReplicas", 0)
+    available = status.get("availableReplicas", 0)
+
+    def result(state: str, reason: str, message: str) -> RolloutState:
+        return RolloutState(state, reason, message, desired, updated, ready)
+
+    if status.get("observedGeneration", 0) < metadata.get("generation", 0):
+        return result("Rolling", "Pending", "Waiting for the Deployment spec to be observed")
+
+    conditions = {c.get("type"): c for c in status.get("conditions", [])}
+    progressing = conditions.get("Progressing", {})
+    if progressing.get("reason") == "ProgressDeadlineExceeded":
+        return result(
+            "Failed",
+            "ProgressDeadlineExceeded",
+            progressing.get("message") or "Rollout did not make progress in time",
+        )
+
+    if updated < desired:
+        return result("Rolling", "Updating", f"{updated} of {desired} replicas updated")
+    if replicas > updated:
+        return result(
+            "Rolling", "Terminating", f"{replicas - updated} old replicas pending termination"
+        )
+    if available < updated:
+        return result("Rolling", "Starting", f"{available} of {updated} updated replicas available")
+    return result("Ready", "RolloutComplete", f"{desired} replicas available")
+
+
+def get_replica_set_progress(replica_set: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize a ReplicaSet of an Environment's Deployment.
+
+    The Deployment only reports totals across its old and new ReplicaSets;
+    the newest ReplicaSet says how many replicas of the new image are ready,
+    and a ``ReplicaFailure`` condition says why pods could not be created
+    (e.g. an exceeded quota) long before the progress deadline passes.
+
+    Args:
+        replica_set: ReplicaSet resource dict
+
+    Returns:
+        Progress for ``status.rollout.replicaSet``
+    """
+    metadata = replica_set.get("metadata", {})
+    status = replica_set.get("status") or {}
+    failure = next(
+        (
+            c.get("message") or c.get("reason")
+            for c in status.get("conditions") or []
+            if c.get("type") == "ReplicaFailure" and c.get("status") == "True"
+        ),
+        None,
+    )
+    return {
+        "name": metadata.get("name"),
+        "revision": int((metadata.get("annotations") or {}).get(REVISION_ANNOTATION, 0)),
+        "replicas": replica_set.get("spec", {}).get("replicas", 0),
+        "readyReplicas": status.get("readyReplicas", 0),
+        "availableReplicas": status.get("availableReplicas", 0),
+        "failure": failure,
+    }
@@ -0,0 +1,44 @@
+"""Utility functions for container image references."""
+
+from typing import NamedTuple, Optional
+
+
+class ImageReference(NamedTuple):
+    """A parsed ``host/repository[:tag][@digest]`` image reference."""
+
+    host: str
+    repository: str
+    tag: Optional[str]
+    digest: Optional[str]
+
+    @property
+    def pinned(self) -> bool:
+        """Whether the reference names an immutable digest."""
+        return self.digest is not None
+
+    def with_digest(self, digest: str) -> str:
+        """Return a ``host/repository@digest`` reference."""
+        return f"{self.host}/{self.repository}@{digest}"
+
+
+def parse_image_reference(reference: str) -> ImageReference:
+    """
+    Split an image reference into its parts.
+
+    Args:
+        reference: Image reference (e.g., registry.io/org/app:latest or
+            registry.io/org/app@sha256:...)
+
+    Returns:
+        Parsed image reference
+    """
+    name, _, digest = reference.partition("@")
+    host, _, path = name.partition("/")
+
+    tag: Optional[str] = None
+    last_slash = path.rfind("/")
+    colon = path.rfind(":")
+    if colon > last_slash:
+        path, tag = path[:colon], path[colon + 1 :]
+
+    return ImageReference(host=host, repository=path, tag=tag, digest=digest or None)
@@ -2,6 +2,9 @@
 
 from typing import Any, Dict
 
+# When the git poll detected the commit the Image's next build is for
+SOURCE_DETECTED_ANNOTATION = "kapsa-project.io/source-detected-at"
+
 
 def create_kpack_image_spec(
     name: str,
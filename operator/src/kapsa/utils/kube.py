@@ -0,0 +1,74 @@
+"""Helpers for calling the Kubernetes API from async handlers."""
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
+
+from kubernetes import client, config
+
+from kapsa import tracing
+
+if TYPE_CHECKING:
+    from kubernetes.dynamic import DynamicClient
+
+T = TypeVar("T")
+
+_dynamic_client: Optional["DynamicClient"] = None
+_dynamic_client_lock = threading.Lock()
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking Kubernetes client call in a worker thread.
+
+    The kubernetes client is synchronous; calling it directly from a kopf
+    handler stalls the event loop (and every other handler) for the whole
+    round-trip. Within a trace, each call gets its own span.
+
+    Args:
+        func: Bound client method, e.g. ``client.CoreV1Api().read_namespace``
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        Whatever ``func`` returns
+    """
+    if not tracing.tracing_active():
+        return await asyncio.to_thread(func, *args, **kwargs)
+    with tracing.child_span(f"k8s.{getattr(func, '__name__', 'call')}"):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def load_client_config() -> None:
+    """
+    Load credentials for the kubernetes client.
+
+    kopf logs in after the startup handlers have run, so handlers that talk
+    to the API during startup load the configuration themselves: in-cluster
+    service account first, then the local kubeconfig.
+    """
+    try:
+        config.load_incluster_config()
+    except config.ConfigException:
+        config.load_kube_config()
+
+
+def get_dynamic_client_sync() -> "DynamicClient":
+    """
+    Return the shared dynamic client, creating it on first use.
+
+    Creating a ``DynamicClient`` imports ``kubernetes.dynamic`` and runs API
+    discovery, so it is done once and never on the event loop.
+    """
+    global _dynamic_client
+    with _dynamic_client_lock:
+        if _dynamic_client is None:
+            from kubernetes.dynamic import DynamicClient
+
+            _dynamic_client = DynamicClient(client.ApiClient())
+        return _dynamic_client
+
+
+async def get_dynamic_client() -> "DynamicClient":
+    """Async wrapper for ``get_dynamic_client_sync``."""
+    return await run_sync(get_dynamic_client_sync)
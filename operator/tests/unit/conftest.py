@@ -0,0 +1,168 @@
+"""Shared fixtures: live settings and a local stand-in registry."""
+
+import base64
+import hashlib
+import json
+from collections.abc import AsyncIterator, Callable, Iterator
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from kapsa.config import apply_overrides
+from kapsa.models.registry import RegistryEndpoint
+from kapsa.registry import close_registry_clients
+
+MANIFEST_TYPE = "application/vnd.oci.image.manifest.v1+json"
+
+
+@pytest.fixture
+def settings() -> Iterator[Callable[..., None]]:
+    """Apply setting overrides for one test, as a ConfigMap would."""
+
+    def override(**values: object) -> None:
+        apply_overrides(
+            {k: json.dumps(v) if isinstance(v, dict) else str(v) for k, v in values.items()}
+        )
+
+    yield override
+    apply_overrides({})
+
+
+class FakeRegistry:
+    """
+    OCI distribution API stand-in.
+
+    Serves manifests, paginated tag lists and deletes, authenticated with
+    bearer tokens from a ``/token`` realm (or basic auth). Token and
+    manifest requests are recorded so tests can assert on caching.
+    """
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.auth = "bearer"
+        self.username = "user"
+        self.password = "secret"
+        self.token_ttl = 300
+        self.delete_enabled = True
+        self.token_requests: list[str] = []
+        self.tokens: set[str] = set()
+        self.tags: dict[str, dict[str, str]] = {}
+        self.manifests: dict[str, bytes] = {}
+        self.deleted: list[str] = []
+        self.manifest_requests: list[str] = []
+
+    def push(self, repository: str, tag: str, content: str = "") -> str:
+        """Add an image with a unique manifest and return its digest."""
+        manifest = json.dumps({"repository": repository, "tag": tag, "content": content}).encode()
+        digest = "sha256:" + hashlib.sha256(manifest).hexdigest()
+        self.manifests[digest] = manifest
+        self.tags.setdefault(repository, {})[tag] = digest
+        return digest
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/token", self._token)
+        app.router.add_get("/v2/", self._base)
+        app.router.add_get("/v2/{repository:.+}/tags/list", self._tags)
+        app.router.add_route("*", "/v2/{repository:.+}/manifests/{reference}", self._manifest)
+        return app
+
+    def _credentials_valid(self, request: web.Request) -> bool:
+        expected = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
+        return request.headers.get("Authorization") == f"Basic {expected}"
+
+    def _challenge(self, scope: str) -> web.Response:
+        if self.auth == "basic":
+            header = 'Basic realm="fake"'
+        else:
+            header = f'Bearer realm="{self.url}/token",service="fake",scope="{scope}"'
+        return web.Response(status=401, headers={"WWW-Authenticate": header})
+
+    def _authorized(self, request: web.Request) -> bool:
+        if self.auth == "none":
+            return True
+        if self.auth == "basic":
+            return self._credentials_valid(request)
+        header = request.headers.get("Authorization", "")
+        return header.startswith("Bearer ") and header[len("Bearer ") :] in self.tokens
+
+    async def _token(self, request: web.Request) -> web.Response:
+        if not self._credentials_valid(request):
+            return web.Response(status=401)
+        scope = request.query.get("scope", "")
+        self.token_requests.append(scope)
+        token = f"token-{len(self.token_requests)}"
+        self.tokens.add(token)
+        return web.json_response({"token": token, "expires_in": self.token_ttl})
+
+    async def _base(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return self._challenge("")
+        return web.json_response({})
+
+    async def _tags(self, request: web.Request) -> web.Response:
+        repository = request.match_info["repository"]
+        if not self._authorized(request):
+            return self._challenge(f"repository:{repository}:pull")
+        if repository not in self.tags:
+            return web.Response(status=404)
+
+        tags = sorted(self.tags[repository])
+        size = int(request.query.get("n", 100))
+        last = request.query.get("last")
+        if last:
+            tags = [t for t in tags if t > last]
+        page, rest = tags[:size], tags[size:]
+        headers = {}
+        if rest:
+            headers["Link"] = f'</v2/{repository}/tags/list?n={size}&last={page[-1]}>; rel="next"'
+        return web.json_response({"name": repository, "tags": page}, headers=headers)
+
+    async def _manifest(self, request: web.Request) -> web.Response:
+        repository = request.match_info["repository"]
+        reference = request.match_info["reference"]
+        action = "delete,pull" if request.method == "DELETE" else "pull"
+        if not self._authorized(request):
+            return self._challenge(f"repository:{repository}:{action}")
+
+        self.manifest_requests.append(f"{request.method} {repository}:{reference}")
+        tags = self.tags.get(repository, {})
+        if request.method == "DELETE":
+            if not self.delete_enabled:
+                return web.Response(status=405)
+            if reference not in tags.values():
+                return web.Response(status=404)
+            self.deleted.append(reference)
+            self.tags[repository] = {t: d for t, d in tags.items() if d != reference}
+            return web.Response(status=202)
+
+        digest = reference if reference.startswith("sha256:") else tags.get(reference)
+        if digest is None or digest not in self.manifests:
+            return web.Response(status=404)
+        headers = {"Docker-Content-Digest": digest, "Content-Type": MANIFEST_TYPE}
+        body = self.manifests[digest]
+        if request.method == "HEAD":
+            return web.Response(headers={**headers, "Content-Length": str(len(body))})
+        return web.Response(body=body, headers=headers)
+
+
+@pytest.fixture
+async def registry() -> AsyncIterator[FakeRegistry]:
+    fake = FakeRegistry()
+    server = TestServer(fake.app())
+    await server.start_server()
+    fake.url = str(server.make_url("")).rstrip("/")
+    yield fake
+    await close_registry_clients()
+    await server.close()
+
+
+@pytest.fixture
+def endpoint(registry: FakeRegistry) -> RegistryEndpoint:
+    return RegistryEndpoint.from_spec(
+        "local",
+        {"endpoint": registry.url},
+        username=registry.username,
+        password=registry.password,
+    )
@@ -0,0 +1,43 @@
+"""Rolling new builds out to a Project's Environments."""
+
+from kapsa.controllers import build
+
+FAILED = "registry.example.com/app@sha256:" + "f" * 64
+READY = "registry.example.com/app@sha256:" + "a" * 64
+
+
+def environment(name: str, **status: object) -> dict:
+    return {
+        "metadata": {"name": name},
+        "spec": {"projectRef": {"name": "app"}, "branch": "main"},
+        "status": status,
+    }
+
+
+async def test_failed_and_rolled_back_images_are_not_redeployed(monkeypatch) -> None:
+    environments = [
+        environment("rolled-back", image=READY, rollout={"rolledBackFrom": FAILED}),
+        environment("failed", image=FAILED, rollout={"state": "Failed", "image": FAILED}),
+        environment("stale", image=READY, rollout={"state": "Ready", "image": READY}),
+    ]
+    deployed: list[str] = []
+
+    class CustomObjects:
+        def list_namespaced_custom_object(self, *args: str) -> dict:
+            return {"items": environments}
+
+    class StatusManager:
+        def update(self, plural, name, namespace, current, **fields) -> bool:
+            return True
+
+    async def deploy_environment(name, namespace, spec, image, metadata, **kwargs) -> None:
+        deployed.append(name)
+
+    monkeypatch.setattr(build.client, "CustomObjectsApi", CustomObjects)
+    monkeypatch.setattr(build, "get_status_manager", StatusManager)
+    monkeypatch.setattr(build, "deploy_environment", deploy_environment)
+
+    # As after an operator restart, with nothing handled in memory
+    await build.rollout_image("app", "team", FAILED, "main")
+
+    assert deployed == ["stale"]
@@ -0,0 +1,112 @@
+"""Deployment specs built for Environments."""
+
+from kapsa.controllers.environment import _deployment_changed
+from kapsa.utils.deployment import (
+    create_deployment_spec,
+    create_prepull_daemonset_spec,
+    get_replica_set_progress,
+    node_placement,
+)
+
+DIGEST = "sha256:" + "a" * 64
+
+
+def container(deployment):
+    return deployment["spec"]["template"]["spec"]["containers"][0]
+
+
+def test_env_entries_are_passed_through() -> None:
+    env = [
+        {"name": "MODE", "value": "production"},
+        {
+            "name": "DATABASE_URL",
+            "valueFrom": {"secretKeyRef": {"name": "db", "key": "url"}},
+        },
+    ]
+    deployment = create_deployment_spec(
+        "web", "team", f"registry.local/team/app@{DIGEST}", "app", {}, env
+    )
+
+    assert container(deployment)["env"] == env
+
+
+def test_pull_policy_follows_pinning() -> None:
+    pinned = create_deployment_spec("web", "team", f"registry.local/app@{DIGEST}", "app", {}, [])
+    tagged = create_deployment_spec("web", "team", "registry.local/app:main", "app", {}, [])
+
+    assert container(pinned)["imagePullPolicy"] == "IfNotPresent"
+    assert container(tagged)["imagePullPolicy"] == "Always"
+
+
+def test_only_deployment_fields_trigger_a_redeploy() -> None:
+    spec = {"projectRef": {"name": "app"}, "env": [], "runtime": {"replicas": 1}}
+    old = {"metadata": {"labels": {}}, "spec": spec}
+
+    relabelled = {"metadata": {"labels": {"team": "a"}}, "spec": dict(spec)}
+    renamed = {"metadata": {}, "spec": {**spec, "domain": "app.example.com"}}
+    scaled = {"metadata": {}, "spec": {**spec, "runtime": {"replicas": 3}}}
+
+    assert not _deployment_changed(old, relabelled)
+    assert not _deployment_changed(old, renamed)
+    assert _deployment_changed(old, scaled)
+
+
+def test_replica_set_progress_reports_creation_failures() -> None:
+    replica_set = {
+        "metadata": {
+            "name": "web-5d8f",
+            "annotations": {"deployment.kubernetes.io/revision": "3"},
+        },
+        "spec": {"replicas": 4},
+        "status": {
+            "replicas": 2,
+            "readyReplicas": 1,
+            "conditions": [
+                {
+                    "type": "ReplicaFailure",
+                    "status": "True",
+                    "reason": "FailedCreate",
+                    "message": "exceeded quota: compute",
+                }
+            ],
+        },
+    }
+
+    assert get_replica_set_progress(replica_set) == {
+        "name": "web-5d8f",
+        "revision": 3,
+        "replicas": 4,
+        "readyReplicas": 1,
+        "availableReplicas": 0,
+        "failure": "exceeded quota: compute",
+    }
+
+
+def test_prepull_follows_the_environment_nodes() -> None:
+    runtime = {
+        "nodeSelector": {"pool": "apps"},
+        "affinity": {
+            "nodeAffinity": {"preferredDuringSchedulingIgnoredDuringExecution": []},
+            "podAntiAffinity": {"requiredDuringSchedulingIgnoredDuringExecution": []},
+        },
+        "tolerations": [{"key": "dedicated", "operator": "Exists"}],
+    }
+    deployment = create_deployment_spec(
+        "web", "team", "registry.local/app:main", "app", runtime, []
+    )
+    daemonset = create_prepull_daemonset_spec(
+        "app-prepull",
+        "team",
+        f"registry.local/app@{DIGEST}",
+        "app",
+        ["true"],
+        "pause",
+        node_selector={"zone": "a"},
+        placement=node_placement(runtime),
+    )
+
+    pod_spec = daemonset["spec"]["template"]["spec"]
+    assert pod_spec["nodeSelector"] == {"pool": "apps", "zone": "a"}
+    assert pod_spec["affinity"] == {"nodeAffinity": runtime["affinity"]["nodeAffinity"]}
+    assert pod_spec["tolerations"] == runtime["tolerations"]
+    assert deployment["spec"]["template"]["spec"]["affinity"] == runtime["affinity"]
@@ -0,0 +1,82 @@
+"""Event aggregation, throttling state and cluster-scoped objects."""
+
+import pytest
+
+from kapsa import events
+
+
+class FakeCoreV1:
+    """Records created and patched Events."""
+
+    def __init__(self) -> None:
+        self.created: list[dict] = []
+        self.patched: list[dict] = []
+
+    def create_namespaced_event(self, namespace: str, body: dict) -> dict:
+        self.created.append({"namespace": namespace, **body})
+        return body
+
+    def patch_namespaced_event(self, name: str, namespace: str, body: dict) -> dict:
+        self.patched.append(body)
+        return body
+
+
+@pytest.fixture
+def core_v1(monkeypatch) -> FakeCoreV1:
+    fake = FakeCoreV1()
+    monkeypatch.setattr(events.client, "CoreV1Api", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def recorder() -> events.EventRecorder:
+    return events.EventRecorder(window=0, burst=5, per_minute=60)
+
+
+async def test_repeats_are_aggregated_into_one_event(core_v1, recorder) -> None:
+    for attempt in range(3):
+        recorder.record("Project", "app", "team", "GitPollFailed", f"attempt {attempt}")
+    await recorder.flush_all()
+
+    recorder.record("Project", "app", "team", "GitPollFailed", "attempt 3")
+    await recorder.flush_all()
+
+    assert [e["count"] for e in core_v1.created] == [3]
+    assert core_v1.patched == [
+        {"count": 4, "lastTimestamp": core_v1.patched[0]["lastTimestamp"], "message": "attempt 3"}
+    ]
+
+
+async def test_cluster_scoped_events_go_to_the_operator_namespace(core_v1, recorder) -> None:
+    recorder.record(
+        "Registry", "local", None, "RegistryUnreachable", "down", type="Warning", uid="1234"
+    )
+    await recorder.flush_all()
+
+    event = core_v1.created[0]
+    assert event["namespace"] == event["metadata"]["namespace"] == "kapsa-system"
+    assert event["involvedObject"]["uid"] == "1234"
+
+
+async def test_idle_buckets_are_dropped(monkeypatch, core_v1, recorder) -> None:
+    monkeypatch.setattr(events, "MAX_BUCKETS", 2)
+
+    async def post(name: str) -> None:
+        recorder.record("Project", name, "team", "BuildStarted", "started")
+        await recorder._flushes[("Project", "team", name, "Normal", "BuildStarted")]
+
+    for name in ("a", "b", "c"):
+        await post(name)
+    # Every bucket spent a token just now, so none is idle yet
+    assert len(recorder._buckets) == 3
+
+    recorder._buckets[("Project", "team", "a")].tokens = recorder.burst
+    await post("d")
+    assert {name for _, _, name in recorder._buckets} == {"b", "c", "d"}
+    assert len(core_v1.created) == 4
+
+
+def test_reset_clears_throttling(recorder) -> None:
+    recorder._buckets[("Project", "team", "app")] = events._TokenBucket(1, 0)
+    recorder.reset()
+    assert recorder._buckets == {}
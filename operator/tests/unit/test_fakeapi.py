@@ -0,0 +1,137 @@
+"""Smoke tests for the benchmark harness: fake API server, fake registry, operator runs."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import aiohttp
+import pytest
+from fakeapi import FakeKubeAPI
+from harness import OperatorProcess, ReadinessTracker, create_workload, seed_cluster, wait_for
+
+PROJECTS = "/apis/kapsa-project.io/v1alpha1/namespaces/team/projects"
+
+
+@pytest.fixture
+async def api() -> AsyncIterator[FakeKubeAPI]:
+    fake = FakeKubeAPI(build_delay=0, deployment_ready_delay=0)
+    await fake.start()
+    yield fake
+    await fake.stop()
+
+
+@pytest.fixture
+async def http(api: FakeKubeAPI) -> AsyncIterator[aiohttp.ClientSession]:
+    async with aiohttp.ClientSession(f"http://127.0.0.1:{api.port}") as session:
+        yield session
+
+
+def project(name: str) -> dict:
+    return {
+        "apiVersion": "kapsa-project.io/v1alpha1",
+        "kind": "Project",
+        "metadata": {"name": name, "namespace": "team"},
+        "spec": {"repository": {"url": "https://git.example.com/app.git"}},
+    }
+
+
+async def test_create_list_and_watch(api: FakeKubeAPI, http: aiohttp.ClientSession) -> None:
+    async with http.post(PROJECTS, json=project("app")) as response:
+        assert response.status == 201
+    async with http.get(PROJECTS) as response:
+        listing = await response.json()
+    assert [p["metadata"]["name"] for p in listing["items"]] == ["app"]
+
+    since = listing["metadata"]["resourceVersion"]
+    async with http.get(PROJECTS, params={"watch": "true", "resourceVersion": since}) as watch:
+        api.patch("kapsa-project.io", "projects", "app", {"spec": {"build": {}}}, "team")
+        event = json.loads(await asyncio.wait_for(watch.content.readline(), 5))
+
+    assert event["type"] == "MODIFIED"
+    assert event["object"]["metadata"]["generation"] == 2
+    assert api.requests["watch kapsa-project.io/projects"] == 1
+
+
+async def test_status_is_only_written_through_the_subresource(
+    api: FakeKubeAPI, http: aiohttp.ClientSession
+) -> None:
+    api.create("kapsa-project.io", "projects", project("app"))
+    merge = {"Content-Type": "application/merge-patch+json"}
+
+    async with http.patch(
+        f"{PROJECTS}/app", json={"status": {"phase": "Ready"}}, headers=merge
+    ) as response:
+        assert "status" not in await response.json()
+    async with http.patch(
+        f"{PROJECTS}/app/status", json={"status": {"phase": "Ready"}}, headers=merge
+    ) as response:
+        assert (await response.json())["status"] == {"phase": "Ready"}
+
+
+async def test_finalizers_hold_deletion(api: FakeKubeAPI, http: aiohttp.ClientSession) -> None:
+    body = project("app")
+    body["metadata"]["finalizers"] = ["kopf.zalando.org/KopfFinalizerMarker"]
+    api.create("kapsa-project.io", "projects", body)
+
+    async with http.delete(f"{PROJECTS}/app") as response:
+        assert response.status == 200
+    held = api.get("kapsa-project.io", "projects", "app", "team")
+    assert held is not None and held["metadata"]["deletionTimestamp"]
+
+    api.patch("kapsa-project.io", "projects", "app", {"metadata": {"finalizers": []}}, "team")
+    assert api.get("kapsa-project.io", "projects", "app", "team") is None
+
+
+async def test_kpack_builds_are_pushed_to_the_registry(api: FakeKubeAPI) -> None:
+    api.create(
+        "kpack.io",
+        "images",
+        {
+            "metadata": {"name": "app", "namespace": "team"},
+            "spec": {"tag": f"127.0.0.1:{api.port}/team/app:main"},
+        },
+    )
+
+    def built() -> bool:
+        image = api.get("kpack.io", "images", "app", "team")
+        return bool(image and image.get("status", {}).get("latestImage"))
+
+    assert await wait_for(built, 5) is not None
+    image = api.get("kpack.io", "images", "app", "team")
+    digest = image["status"]["latestImage"].rpartition("@")[2]
+    assert api.registry.tags["team/app"]["main"] == digest
+
+
+async def test_registry_pages_tags_and_refuses_deletes(
+    api: FakeKubeAPI, http: aiohttp.ClientSession
+) -> None:
+    digest = api.registry.push("team/app", ["a", "b", "c"])
+
+    async with http.get("/v2/team/app/tags/list", params={"n": "2"}) as response:
+        first = await response.json()
+        next_page = response.links["next"]["url"]
+    async with http.get(next_page) as response:
+        second = await response.json()
+    assert first["tags"] + second["tags"] == ["a", "b", "c"]
+
+    api.registry.delete_enabled = False
+    async with http.delete(f"/v2/team/app/manifests/{digest}") as response:
+        assert response.status == 405
+    assert api.registry.images() == 1
+
+
+async def test_operator_reconciles_against_the_fake() -> None:
+    api = FakeKubeAPI(build_delay=0.1, deployment_ready_delay=0.1)
+    tracker = ReadinessTracker()
+    api.write_hooks.append(tracker.observe)
+    await api.start()
+    try:
+        pools = seed_cluster(api, 1)
+        async with OperatorProcess(api) as operator:
+            create_workload(api, tracker, projects=1, environments=1, pools=pools)
+            await asyncio.wait_for(tracker.all_ready.wait(), 60)
+    finally:
+        await api.stop()
+
+    assert len(tracker.ready) == len(tracker.created) == 3
+    assert operator.stats["peak_rss_kb"] > 0
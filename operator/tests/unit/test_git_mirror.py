@@ -0,0 +1,173 @@
+"""Git mirror cache against local file:// repositories, and git credentials."""
+
+import asyncio
+import base64
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+from kubernetes import client
+
+from kapsa.controllers import project
+from kapsa.git import credentials_env
+from kapsa.git import mirror as git_mirror
+from kapsa.git.mirror import MirrorCache
+
+GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "Dev",
+    "GIT_AUTHOR_EMAIL": "dev@example.com",
+    "GIT_COMMITTER_NAME": "Dev",
+    "GIT_COMMITTER_EMAIL": "dev@example.com",
+}
+
+
+class Repository:
+    """A working repository on disk, cloned through its file:// URL."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.url = path.as_uri()
+        path.mkdir()
+        self.git("init", "--quiet", "--initial-branch=main")
+
+    def git(self, *args: str) -> str:
+        result = subprocess.run(
+            ["git", "-C", str(self.path), *args],
+            env=GIT_ENV,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout.strip()
+
+    def commit(self, files: dict[str, str], message: str = "Change") -> str:
+        for name, content in files.items():
+            (self.path / name).write_text(content)
+        self.git("add", "--all")
+        self.git("commit", "--quiet", "--message", message)
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Repository:
+    return Repository(tmp_path / "app")
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> MirrorCache:
+    return MirrorCache(tmp_path / "mirrors", budget_bytes=1 << 30)
+
+
+async def test_clone_then_fetch_new_commits(repository: Repository, cache: MirrorCache) -> None:
+    first = repository.commit({"app.py": "print(1)\n"}, "Initial commit")
+
+    async with cache.open(repository.url) as mirror:
+        await mirror.fetch()
+        assert await mirror.resolve("main") == first
+        assert await mirror.detect_build_strategy(first) == "buildpack"
+
+    second = repository.commit({"app.py": "print(2)\n", "Dockerfile": "FROM scratch\n"})
+
+    async with cache.open(repository.url) as mirror:
+        await mirror.fetch()
+        assert await mirror.resolve("main") == second
+        assert await mirror.changed_paths(first, second) == ["Dockerfile", "app.py"]
+        assert await mirror.detect_build_strategy(second) == "dockerfile"
+        assert (await mirror.commit_info(second)).author == "Dev"
+
+    assert cache.usage() > 0
+
+
+async def test_mirrors_are_locked_per_repository(cache: MirrorCache) -> None:
+    entered: list[str] = []
+    release = asyncio.Event()
+
+    async def use(url: str) -> None:
+        async with cache.open(url):
+            entered.append(url)
+            await release.wait()
+
+    tasks = [asyncio.ensure_future(use(url)) for url in ("file:///a", "file:///a", "file:///b")]
+    await asyncio.sleep(0.05)
+    assert entered == ["file:///a", "file:///b"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert entered == ["file:///a", "file:///b", "file:///a"]
+
+
+async def test_least_recently_used_mirrors_are_evicted(tmp_path: Path, cache: MirrorCache) -> None:
+    urls = {}
+    for name in ("a", "b", "c"):
+        repository = Repository(tmp_path / name)
+        repository.commit({"README": name})
+        urls[name] = repository.url
+        async with cache.open(repository.url) as mirror:
+            await mirror.fetch()
+
+    paths = {name: cache.path_for(url) for name, url in urls.items()}
+    for name, last_used in (("a", 300), ("b", 100), ("c", 200)):
+        os.utime(paths[name], (last_used, last_used))
+
+    # Over budget by one mirror: the oldest goes, the one in use stays
+    cache.budget_bytes = cache.usage() - 1
+    async with cache.open(urls["a"]):
+        pass
+
+    assert not paths["b"].exists()
+    assert paths["a"].exists() and paths["c"].exists()
+
+
+async def test_poll_records_the_latest_commit(
+    monkeypatch, repository: Repository, cache: MirrorCache
+) -> None:
+    updates: list[dict] = []
+
+    class StatusManager:
+        def update(self, plural, name, namespace, current, **fields) -> bool:
+            updates.append(fields)
+            return True
+
+    monkeypatch.setattr(git_mirror, "_cache", cache)
+    monkeypatch.setattr(project, "get_status_manager", StatusManager)
+    head = repository.commit({"app.py": "print(1)\n"})
+    spec = {"repository": {"url": repository.url, "branch": "main"}}
+
+    async def poll(status: dict) -> None:
+        project._last_polled.clear()
+        await project.project_poll_git(
+            spec=spec, status=status, name="app", namespace="team", meta={}
+        )
+
+    await poll({})
+    assert updates[0]["latestCommit"] == head
+    assert updates[0]["source"]["buildStrategy"] == "buildpack"
+    assert updates[0]["source"]["changedPaths"] is None
+
+    await poll({"latestCommit": head})
+    assert len(updates) == 1
+
+    newer = repository.commit({"Dockerfile": "FROM scratch\n"})
+    await poll({"latestCommit": head})
+    assert updates[1]["latestCommit"] == newer
+    assert updates[1]["source"]["changedPaths"] == ["Dockerfile"]
+
+
+async def test_credentials_come_from_the_project_namespace(monkeypatch) -> None:
+    reads: list[tuple[str, str]] = []
+
+    class CoreV1:
+        def read_namespaced_secret(self, name: str, namespace: str) -> client.V1Secret:
+            reads.append((namespace, name))
+            return client.V1Secret(data={"token": base64.b64encode(b"t0ken").decode()})
+
+    monkeypatch.setattr(client, "CoreV1Api", CoreV1)
+    credentials = {"secretRef": {"name": "git", "namespace": "kapsa-system"}}
+
+    env = await credentials_env(credentials, "team")
+
+    assert reads == [("team", "git")]
+    expected = base64.b64encode(b"git:t0ken").decode()
+    assert env["GIT_CONFIG_VALUE_0"] == f"Authorization: Basic {expected}"
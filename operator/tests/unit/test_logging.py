@@ -0,0 +1,73 @@
+"""Log rate limiting, the queued writer and plain-text output."""
+
+import io
+import json
+import threading
+
+import pytest
+import structlog
+
+from kapsa import logging as kapsa_logging
+
+
+def test_rate_limiter_passes_non_string_events() -> None:
+    limiter = kapsa_logging.EventRateLimiter({"noisy": 1})
+
+    assert limiter(None, "info", {"event": None}) == {"event": None}
+    assert limiter(None, "info", {}) == {}
+
+
+def test_rate_limiter_reports_suppressed_lines() -> None:
+    limiter = kapsa_logging.EventRateLimiter({"noisy": 1})
+    limiter(None, "info", {"event": "noisy"})
+    with pytest.raises(structlog.DropEvent):
+        limiter(None, "info", {"event": "noisy"})
+
+    limiter._updated["noisy"] -= 1  # One second later
+    assert limiter(None, "info", {"event": "noisy"})["sampled_out"] == 1
+
+
+class BlockingStream(io.BytesIO):
+    """Holds the first write until released, so the writer's queue fills up."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data) -> int:
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(data)
+
+
+def test_queue_writer_reports_dropped_lines() -> None:
+    stream = BlockingStream()
+    writer = kapsa_logging.QueueWriter(stream, max_size=1)
+    writer.write("first")
+    assert stream.writing.wait(5)
+
+    writer.write("queued")
+    writer.write("dropped")
+    writer.write("dropped")
+    stream.release.set()
+    writer.close()
+
+    lines = [
+        json.loads(line) if line.startswith(b"{") else line
+        for line in stream.getvalue().splitlines()
+    ]
+    assert lines == [b"first", b"queued", {"event": "log_lines_dropped", "count": 2}]
+
+
+def test_json_lines_are_text_without_a_binary_stdout(monkeypatch) -> None:
+    stdout = io.StringIO()
+    monkeypatch.setattr("sys.stdout", stdout)
+    try:
+        kapsa_logging.configure_logging()
+        kapsa_logging.get_logger("test").info("hello", answer=42)
+    finally:
+        structlog.reset_defaults()
+
+    record = json.loads(stdout.getvalue())
+    assert record["event"] == "hello" and record["answer"] == 42
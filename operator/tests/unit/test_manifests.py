@@ -0,0 +1,109 @@
+"""ManifestCache expiry and eviction, and digest pinning."""
+
+import types
+
+import pytest
+
+from kapsa.registry import ManifestInfo, manifests, pin_image
+from kapsa.registry.manifests import ManifestCache
+
+
+def info(n: int) -> ManifestInfo:
+    return ManifestInfo(digest=f"sha256:{n:064x}", media_type="", size=0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(manifests, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_tag_entries_expire_after_ttl(clock) -> None:
+    cache = ManifestCache(ttl=300)
+    cache.put("local", "team/app", "latest", info(1))
+
+    clock[0] += 299
+    assert cache.get("local", "team/app", "latest") == info(1)
+    clock[0] += 2
+    assert cache.get("local", "team/app", "latest") is None
+
+
+def test_digest_entries_never_expire(clock) -> None:
+    cache = ManifestCache(ttl=300)
+    cache.put("local", "team/app", "latest", info(1))
+
+    clock[0] += 10**6
+    assert cache.get("local", "team/app", info(1).digest) == info(1)
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache = ManifestCache(max_size=4)
+    cache.put("local", "team/app", "a", info(1))
+    cache.put("local", "team/app", "b", info(2))
+    cache.get("local", "team/app", "a")
+    cache.put("local", "team/app", "c", info(3))
+
+    assert len(cache) == 4
+    assert cache.get("local", "team/app", "b") is None
+    assert cache.get("local", "team/app", "a") == info(1)
+    assert cache.get("local", "team/app", "c") == info(3)
+
+
+def test_resize_evicts_down_to_the_new_size() -> None:
+    cache = ManifestCache(max_size=10)
+    for n in range(5):
+        cache.put("local", "team/app", f"v{n}", info(n))
+
+    cache.resize(2)
+    assert len(cache) == 2
+    assert cache.get("local", "team/app", "v4") == info(4)
+
+
+def test_invalidate_by_registry_and_repository() -> None:
+    cache = ManifestCache()
+    cache.put("local", "team/app", "v1", info(1))
+    cache.put("local", "team/other", "v1", info(2))
+    cache.put("remote", "team/app", "v1", info(3))
+
+    cache.invalidate("local", "team/app")
+    assert cache.get("local", "team/app", "v1") is None
+    assert cache.get("local", "team/other", "v1") == info(2)
+
+    cache.invalidate("local")
+    assert cache.get("local", "team/other", "v1") is None
+    assert cache.get("remote", "team/app", "v1") == info(3)
+
+
+async def test_pin_image_looks_up_each_tag_once(monkeypatch, registry, endpoint) -> None:
+    monkeypatch.setattr(manifests, "_cache", ManifestCache())
+    digest = registry.push("team/app", "main")
+    image = f"{endpoint.host}/team/app:main"
+
+    pinned = [await pin_image(endpoint, image) for _ in range(3)]
+
+    assert pinned == [f"{endpoint.host}/team/app@{digest}"] * 3
+    assert registry.manifest_requests == ["HEAD team/app:main"]
+
+
+async def test_pin_image_keeps_digest_references(monkeypatch, endpoint) -> None:
+    monkeypatch.setattr(manifests, "_cache", ManifestCache())
+    image = f"{endpoint.host}/team/app:main@{info(7).digest}"
+
+    assert await pin_image(endpoint, image) == f"{endpoint.host}/team/app@{info(7).digest}"
+    # Nothing is known about the manifest, so nothing is cached
+    assert len(manifests.get_manifest_cache()) == 0
+
+
+async def test_pin_image_keeps_cached_manifest_metadata(monkeypatch, endpoint) -> None:
+    monkeypatch.setattr(manifests, "_cache", ManifestCache())
+    known = ManifestInfo(
+        digest=info(7).digest, media_type="application/vnd.oci.image.manifest.v1+json", size=512
+    )
+    manifests.get_manifest_cache().put("local", "team/app", "v1", known)
+
+    await pin_image(endpoint, f"{endpoint.host}/team/app:main@{known.digest}")
+
+    cache = manifests.get_manifest_cache()
+    assert cache.get("local", "team/app", known.digest) == known
+    assert cache.get("local", "team/app", "main") == known
@@ -0,0 +1,157 @@
+"""RegistryClient against the local stand-in registry."""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+from kapsa.models.registry import RegistryEndpoint
+from kapsa.registry import RegistryClient, RegistryError, get_registry_client, resolver
+
+
+async def test_bearer_tokens_are_cached_per_scope(registry, endpoint) -> None:
+    registry.push("team/app", "v1")
+    registry.push("team/other", "v1")
+    client = RegistryClient(endpoint)
+    try:
+        for _ in range(3):
+            assert await client.head_manifest("team/app", "v1") is not None
+        await client.head_manifest("team/other", "v1")
+    finally:
+        await client.close()
+
+    assert registry.token_requests == [
+        "repository:team/app:pull",
+        "repository:team/other:pull",
+    ]
+
+
+async def test_concurrent_requests_share_one_token(registry, endpoint) -> None:
+    registry.push("team/app", "v1")
+    client = RegistryClient(endpoint)
+    try:
+        # The first request learns the challenge; the rest reuse its token
+        await client.head_manifest("team/app", "v1")
+        registry.token_requests.clear()
+        client._tokens.clear()
+        await asyncio.gather(*(client.head_manifest("team/app", "v1") for _ in range(10)))
+    finally:
+        await client.close()
+
+    assert registry.token_requests == ["repository:team/app:pull"]
+
+
+async def test_token_is_refreshed_before_expiry(registry, endpoint) -> None:
+    registry.push("team/app", "v1")
+    registry.token_ttl = 20
+    client = RegistryClient(endpoint, token_leeway=30)
+    try:
+        await client.head_manifest("team/app", "v1")
+        await client.head_manifest("team/app", "v1")
+    finally:
+        await client.close()
+
+    assert len(registry.token_requests) == 2
+
+
+async def test_rejected_token_is_replaced(registry, endpoint) -> None:
+    registry.push("team/app", "v1")
+    client = RegistryClient(endpoint)
+    try:
+        await client.head_manifest("team/app", "v1")
+        registry.tokens.clear()
+        assert await client.head_manifest("team/app", "v1") is not None
+    finally:
+        await client.close()
+
+    assert len(registry.token_requests) == 2
+
+
+async def test_basic_challenge_sends_credentials(registry, endpoint) -> None:
+    registry.auth = "basic"
+    registry.push("team/app", "v1")
+    client = RegistryClient(endpoint)
+    try:
+        await client.ping()
+        assert await client.head_manifest("team/app", "v1") is not None
+    finally:
+        await client.close()
+
+    assert registry.token_requests == []
+
+
+async def test_basic_challenge_without_credentials_fails(registry) -> None:
+    registry.auth = "basic"
+    client = RegistryClient(RegistryEndpoint.from_spec("local", {"endpoint": registry.url}))
+    try:
+        with pytest.raises(RegistryError) as excinfo:
+            await client.ping()
+    finally:
+        await client.close()
+
+    assert excinfo.value.status == 401
+
+
+async def test_wrong_credentials_fail_at_the_token_realm(registry, endpoint) -> None:
+    client = RegistryClient(dataclasses.replace(endpoint, password="wrong"))
+    try:
+        with pytest.raises(RegistryError) as excinfo:
+            await client.ping()
+    finally:
+        await client.close()
+
+    assert excinfo.value.status == 401
+
+
+async def test_list_tags_follows_pagination(registry, endpoint) -> None:
+    for i in range(25):
+        registry.push("team/app", f"v{i:02d}")
+    client = RegistryClient(endpoint)
+    try:
+        tags = [tag async for tag in client.list_tags("team/app", page_size=10)]
+    finally:
+        await client.close()
+
+    assert tags == [f"v{i:02d}" for i in range(25)]
+
+
+async def test_delete_refused_by_registry(registry, endpoint) -> None:
+    digest = registry.push("team/app", "v1")
+    registry.delete_enabled = False
+    client = RegistryClient(endpoint)
+    try:
+        with pytest.raises(RegistryError) as excinfo:
+            await client.delete_manifest("team/app", digest)
+    finally:
+        await client.close()
+
+    assert excinfo.value.status == 405
+
+
+async def test_client_is_shared_until_the_endpoint_changes(registry, endpoint) -> None:
+    client = get_registry_client(endpoint)
+    assert get_registry_client(dataclasses.replace(endpoint)) is client
+
+    rotated = get_registry_client(dataclasses.replace(endpoint, password="rotated"))
+    assert rotated is not client
+    assert rotated.endpoint.password == "rotated"
+    assert get_registry_client(rotated.endpoint) is rotated
+
+
+async def test_credentials_are_reread_after_ttl(monkeypatch, settings) -> None:
+    passwords = iter(["first", "second"])
+
+    async def read_credentials(spec):
+        return "user", next(passwords)
+
+    monkeypatch.setattr(resolver, "_read_credentials", read_credentials)
+    monkeypatch.setattr(resolver, "_endpoints", {})
+    spec = {"endpoint": "registry.example.com"}
+    await resolver.load_registry("example", spec)
+
+    cached = await resolver.resolve_registry("example")
+    assert cached is not None and cached.password == "first"
+
+    settings(registry_credentials_ttl=0)
+    refreshed = await resolver.resolve_registry("example")
+    assert refreshed is not None and refreshed.password == "second"
@@ -0,0 +1,83 @@
+"""Retention planning and pruning against the stand-in registry."""
+
+from datetime import UTC, datetime, timedelta
+
+from kapsa.registry import RetentionPolicy, build_tag, plan_retention, prune_repository
+from kapsa.registry.retention import ImageVersion
+
+BUILT = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def builds(branch: str, count: int) -> list[ImageVersion]:
+    """``count`` builds of a branch, oldest first."""
+    return [
+        ImageVersion(f"sha256:{branch}-{i}", [build_tag(branch, BUILT + timedelta(hours=i))])
+        for i in range(count)
+    ]
+
+
+def deleted(plan) -> set[str]:
+    return {version.digest for version in plan.delete}
+
+
+def test_newest_builds_of_live_branches_are_kept() -> None:
+    main, preview = builds("main", 4), builds("preview", 2)
+    plan = plan_retention(main + preview, RetentionPolicy(keep_last=2), "main", {"main"}, set())
+
+    assert deleted(plan) == {
+        "sha256:main-0",
+        "sha256:main-1",
+        "sha256:preview-0",
+        "sha256:preview-1",
+    }
+    assert plan.keep == {"sha256:main-2": "recent", "sha256:main-3": "recent"}
+
+
+def test_branches_with_the_same_slug_are_kept_apart() -> None:
+    slashed, dashed = builds("feature/a", 2), builds("feature-a", 2)
+    assert slashed[0].tags[0] != dashed[0].tags[0]
+
+    plan = plan_retention(
+        slashed + dashed, RetentionPolicy(keep_last=1), "main", {"feature/a"}, set()
+    )
+    assert deleted(plan) == {"sha256:feature/a-0", "sha256:feature-a-0", "sha256:feature-a-1"}
+
+
+def test_in_use_and_foreign_tags_are_kept() -> None:
+    main = builds("main", 3)
+    main[0].tags.append("latest")
+    released = ImageVersion("sha256:release", ["v1.2.0"])
+    plan = plan_retention(
+        main + [released], RetentionPolicy(keep_last=1), "main", {"main"}, {"sha256:main-1"}
+    )
+
+    assert plan.delete == []
+    assert plan.keep == {
+        "sha256:main-0": "tagged",
+        "sha256:main-1": "in_use",
+        "sha256:main-2": "recent",
+        "sha256:release": "tagged",
+    }
+
+
+def test_kpack_only_builds_count_toward_the_default_branch() -> None:
+    versions = [ImageVersion(f"sha256:old-{i}", [f"b{i}.20250101.00000{i}"]) for i in range(3)]
+    plan = plan_retention(versions, RetentionPolicy(keep_last=2), "main", {"main"}, set())
+
+    assert deleted(plan) == {"sha256:old-0"}
+
+
+async def test_pruning_stops_when_deletes_are_unsupported(registry, endpoint, settings) -> None:
+    settings(retention_delete_batch=2)
+    for i in range(6):
+        tag = build_tag("gone", BUILT + timedelta(hours=i))
+        registry.push("team/app", tag, content=str(i))
+    registry.delete_enabled = False
+
+    result = await prune_repository(
+        endpoint, "team/app", RetentionPolicy(keep_last=1), "main", {"main"}, set()
+    )
+
+    assert (result.images, result.deleted, result.failed) == (6, 0, 6)
+    deletes = [r for r in registry.manifest_requests if r.startswith("DELETE")]
+    assert len(deletes) == 2
@@ -0,0 +1,112 @@
+"""StatusManager no-op detection, coalescing and failed writes."""
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from kapsa import status
+
+
+class FakeCustomObjects:
+    """Records status patches; fails the next ``failures`` of them with ``status``."""
+
+    def __init__(self) -> None:
+        self.patches: list[dict] = []
+        self.failures: list[int] = []
+
+    def patch_namespaced_custom_object_status(
+        self, group: str, version: str, namespace: str, plural: str, name: str, body: dict
+    ) -> dict:
+        if self.failures:
+            raise ApiException(status=self.failures.pop(0), reason="Failed")
+        self.patches.append(body["status"])
+        return body
+
+
+@pytest.fixture
+def api(monkeypatch) -> FakeCustomObjects:
+    fake = FakeCustomObjects()
+    monkeypatch.setattr(status.client, "CustomObjectsApi", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def manager() -> status.StatusManager:
+    return status.StatusManager(debounce=0)
+
+
+async def test_updates_matching_current_status_are_skipped(api, manager) -> None:
+    assert not manager.update("projects", "app", "team", {"phase": "Ready"}, phase="Ready")
+    assert manager.update("projects", "app", "team", {"phase": "Pending"}, phase="Ready")
+
+    await manager.flush_all()
+    assert api.patches == [{"phase": "Ready"}]
+
+
+async def test_current_status_wins_over_what_was_written(api, manager) -> None:
+    manager.update("projects", "app", "team", {}, phase="Ready")
+    await manager.flush_all()
+
+    # Changed out of band (or the object was recreated) since the last write
+    assert manager.update("projects", "app", "team", {"phase": "Failed"}, phase="Ready")
+    await manager.flush_all()
+    assert api.patches == [{"phase": "Ready"}, {"phase": "Ready"}]
+
+
+async def test_updates_are_coalesced(api, manager) -> None:
+    manager.update("projects", "app", "team", {}, phase="Building")
+    manager.update("projects", "app", "team", {}, phase="Ready", latestImage="app@sha256:1")
+
+    await manager.flush_all()
+    assert api.patches == [{"phase": "Ready", "latestImage": "app@sha256:1"}]
+
+
+async def test_failed_writes_are_kept_for_the_next_flush(api, manager) -> None:
+    api.failures = [422]
+    manager.update("projects", "app", "team", {}, phase="Ready")
+    await manager.flush_all()
+    assert api.patches == []
+
+    manager.update("projects", "app", "team", {}, latestImage="app@sha256:1")
+    await manager.flush_all()
+    assert api.patches == [{"phase": "Ready", "latestImage": "app@sha256:1"}]
+
+
+async def test_transient_failures_are_retried(api, manager) -> None:
+    api.failures = [503]
+    manager.update("projects", "app", "team", {}, phase="Ready")
+
+    await manager._flushes[("projects", "team", "app")]
+    await manager._flushes[("projects", "team", "app")]
+    assert api.patches == [{"phase": "Ready"}]
+
+
+async def test_conditions_keep_their_transition_time(api, manager) -> None:
+    current = {
+        "conditions": [
+            {
+                "type": "Ready",
+                "status": "True",
+                "reason": "Deployed",
+                "lastTransitionTime": "2026-01-01T00:00:00Z",
+            }
+        ]
+    }
+    ready = [{"type": "Ready", "status": "True", "reason": "Deployed"}]
+    assert not manager.update("environments", "web", "team", current, conditions=ready)
+
+    moved = [{"type": "Ready", "status": "True", "reason": "RolloutComplete"}]
+    manager.update("environments", "web", "team", current, conditions=moved)
+    await manager.flush_all()
+    written = api.patches[0]["conditions"][0]
+    assert written["reason"] == "RolloutComplete"
+    assert written["lastTransitionTime"] == "2026-01-01T00:00:00Z"
+
+
+async def test_nested_fields_are_merge_patched(api, manager) -> None:
+    current = {"rollout": {"state": "Ready", "completedAt": "2026-01-01T00:00:00Z"}}
+    assert not manager.update("environments", "web", "team", current, rollout={"state": "Ready"})
+
+    manager.update("environments", "web", "team", current, rollout={"state": "Rolling"})
+    manager.update("environments", "web", "team", current, rollout={"completedAt": None})
+    await manager.flush_all()
+    assert api.patches == [{"rollout": {"state": "Rolling", "completedAt": None}}]
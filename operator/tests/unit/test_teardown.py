@@ -0,0 +1,81 @@
+"""Namespace teardown: bounded deletes, polling and blocker reports."""
+
+import time
+
+import pytest
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from kapsa import teardown
+
+
+class FakeCoreV1:
+    """Namespaces that disappear after a number of reads, or never."""
+
+    def __init__(self, reads_until_gone: dict[str, int | None]) -> None:
+        self.reads_until_gone = dict(reads_until_gone)
+        self.deleted: list[str] = []
+        self.deleted_at: dict[str, float] = {}
+
+    def delete_namespace(self, name: str, propagation_policy: str) -> None:
+        self.deleted.append(name)
+        self.deleted_at[name] = time.monotonic()
+
+    def read_namespace(self, name: str) -> client.V1Namespace:
+        remaining = self.reads_until_gone.get(name)
+        if remaining is not None:
+            if remaining <= 0:
+                raise ApiException(status=404, reason="Not Found")
+            self.reads_until_gone[name] = remaining - 1
+        return client.V1Namespace(
+            metadata=client.V1ObjectMeta(name=name),
+            spec=client.V1NamespaceSpec(finalizers=["example.com/cleanup"]),
+            status=client.V1NamespaceStatus(phase="Terminating"),
+        )
+
+
+@pytest.fixture
+def core_v1(monkeypatch, settings):
+    settings(teardown_concurrency=1, teardown_poll_interval=0.01)
+
+    def install(reads_until_gone):
+        fake = FakeCoreV1(reads_until_gone)
+        monkeypatch.setattr(teardown.client, "CoreV1Api", lambda: fake)
+        return fake
+
+    return install
+
+
+async def test_deleted_namespaces_are_reported(core_v1) -> None:
+    fake = core_v1({"app-main": 2, "app-pr-1": 0})
+
+    result = await teardown.teardown_namespaces(["app-main", "app-pr-1"], wait_timeout=5)
+
+    assert result.complete
+    assert sorted(result.deleted) == ["app-main", "app-pr-1"]
+    assert sorted(fake.deleted) == ["app-main", "app-pr-1"]
+
+
+async def test_waiting_does_not_hold_the_delete_slot(core_v1) -> None:
+    # With one slot, the second delete is issued while the first namespace is stuck
+    fake = core_v1({"stuck": None, "quick": 1})
+
+    result = await teardown.teardown_namespaces(["stuck", "quick"], wait_timeout=0.5)
+
+    assert fake.deleted == ["stuck", "quick"]
+    assert fake.deleted_at["quick"] - fake.deleted_at["stuck"] < 0.25
+    assert result.deleted == ["quick"]
+    assert result.pending == {"stuck": ["finalizer example.com/cleanup"]}
+
+
+async def test_missing_namespace_counts_as_deleted(core_v1, monkeypatch) -> None:
+    fake = core_v1({"gone": 0})
+
+    def not_found(name, propagation_policy):
+        raise ApiException(status=404, reason="Not Found")
+
+    monkeypatch.setattr(fake, "delete_namespace", not_found)
+
+    result = await teardown.teardown_namespaces(["gone"], wait_timeout=1)
+
+    assert result.deleted == ["gone"]